@@ -1,10 +1,16 @@
+import os
 import secrets
+import subprocess
+import sys
 import threading
 import asyncio
+import heapq
 import json
+import math
+import time
 from hmac import compare_digest
 from time import struct_time
-from typing import Dict
+from typing import Dict, Optional, List, Callable, Any, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -12,17 +18,101 @@ import uvicorn
 import yaml
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 
+from core import telemetry
+from core.events import events, SERVER_CRASHED, SERVER_REGISTERED, SERVER_UNREGISTERED, SERVER_STATE_CHANGED
 from core.console import pInfo, pWarning, pDebug, pError
-from core.server_manager import ServerManager, ServerState
+from core.console_stream import LogFilter
+from core.metrics_history import parse_range
+from core.server_manager import ServerManager, ServerState, Server, Software, SORT_KEYS
+from api.data_ops import DataOperations, DataRequestError
+from api.heartbeat import HeartbeatScheduler
+from api.messages import (MessageDispatcher, MessageError, HeartbeatResponse, ShutdownNotification, RpcResponse,
+                          DataRequest, UnknownMessage, decode)
+from api.outbound import ClientSender
+from api.redis_data import RedisDataService, REQUEST_TYPES
+from api.rpc import RpcManager, RpcError, RpcTimeout
+from api.workers import (FleetStateStore, make_worker_id, apply_runtime, server_from_dict, supports_workers,
+                         CHANNEL_RUNTIME, CHANNEL_WORKER)
 from utils.certgen import generate_self_signed_cert
+from utils.prometheus import REGISTRY, CONTENT_TYPE
+from utils.ratelimit import RateLimiter, StorageQuota
+from utils.timerwheel import TimerWheel
 from fastapi import Request
 import redis.asyncio as aioredis
 
 from utils.storagemanager import StorageManager
 
 
+# Feld-Name -> Getter(api, server). Reihenfolge entspricht der Standardausgabe von /api/servers
+SERVER_FIELDS: Dict[str, Callable[['APIManager', Server], Any]] = {
+    "server_id": lambda api, s: s.server_id,
+    "name": lambda api, s: s.name,
+    "ip": lambda api, s: s.ip,
+    "port": lambda api, s: s.port,
+    "server_type": lambda api, s: s.server_type,
+    "software": lambda api, s: s.software.value,
+    "software_version": lambda api, s: s.software_version,
+    "server_state": lambda api, s: s.server_state.value,
+    "is_running": lambda api, s: s.is_running,
+    "start_time": lambda api, s: s.start_time.isoformat() if s.start_time else None,
+    "tps": lambda api, s: s.tps,
+    "cpu_usage": lambda api, s: s.cpu_usage,
+    "ram_usage_mb": lambda api, s: s.ram_usage_mb,
+    "players_online": lambda api, s: s.players_online,
+    "max_players": lambda api, s: s.max_players,
+    "uptime": lambda api, s: s.get_uptime(),
+    "java_memory": lambda api, s: s.java_memory,
+    "connected": lambda api, s: api.is_connected(s.server_id),
+    "player_count": lambda api, s: len(s.players_online),
+    "plugins": lambda api, s: s.plugins,
+    "last_output_lines": lambda api, s: list(s.last_output_lines),
+    "last_seen": lambda api, s: s.last_seen.isoformat() if s.last_seen else None,
+    "crash_looping": lambda api, s: s.crash_looping,
+    "process": lambda api, s: s.process_stats,
+}
+
+# Felder, die /api/servers ohne fields= liefert (wie bisher)
+DEFAULT_LIST_FIELDS: List[str] = [
+    "server_id", "name", "ip", "port", "server_type", "software", "software_version", "server_state",
+    "is_running", "start_time", "tps", "cpu_usage", "ram_usage_mb", "players_online", "max_players",
+    "uptime", "java_memory", "connected"
+]
+
+DETAIL_FIELDS: List[str] = [
+    "server_id", "name", "ip", "port", "server_type", "software", "software_version", "server_state",
+    "is_running", "start_time", "tps", "cpu_usage", "ram_usage_mb", "players_online", "max_players",
+    "plugins", "uptime", "java_memory", "connected", "last_output_lines", "last_seen"
+]
+
+# Maximale Anzahl Spieler pro /api/players/.../lookup
+MAX_PLAYER_LOOKUP = 1000
+
+# /api/console: gepufferte Zeilen pro Client (ältere werden bei langsamen Clients verworfen) und Keepalive-Intervall
+CONSOLE_QUEUE_SIZE = 1000
+CONSOLE_KEEPALIVE = 15.0
+
+
+def _parse_enum_list(raw: Optional[str], enum_cls, param: str) -> Optional[list]:
+    """Wandelt 'Online,STARTING' in Enum-Werte um (Wert oder Name, ohne Groß-/Kleinschreibung)"""
+    if not raw:
+        return None
+    lookup = {}
+    for member in enum_cls:
+        lookup[member.value.lower()] = member
+        lookup[member.name.lower()] = member
+    result = []
+    for part in raw.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part not in lookup:
+            raise HTTPException(status_code=400, detail=f"Ungültiger Wert '{part}' für '{param}'")
+        result.append(lookup[part])
+    return result
+
+
 class APIManager:
     def __init__(self,
                  server_manager: ServerManager,
@@ -34,12 +124,27 @@ class APIManager:
                  key_file_path: Path = "./config/key.pem",
                  cert_duration_days: int = 365,
                  heartbeat_delay: int = 10,
+                 heartbeat_missed_limit: int = 3,
+                 heartbeat_min_delay: float = 2.0,
+                 heartbeat_max_delay: float = 30.0,
+                 metrics_persist_interval: int = 300,
                  autocert: bool = True,
                  use_https: bool = True,
                  communication_type: str = "websocket",
                  redis_channel: str = "echocloud:all",
                  redis_password: str = "passwort",
-                 redis_user: str = "default"):
+                 redis_user: str = "default",
+                 redis_host: str = "127.0.0.1",
+                 redis_port: int = 6379,
+                 redis_data_workers: int = 4,
+                 redis_data_batch_size: int = 50,
+                 api_workers: int = 1,
+                 worker_mode: bool = False,
+                 rpc_timeout: float = 10.0,
+                 outbound_queue_size: int = 256,
+                 outbound_max_lag: float = 30.0,
+                 outbound_send_timeout: float = 10.0,
+                 ratelimit_config: Optional[Dict[str, Any]] = None):
         self.cert_file_path: Path = cert_file_path
         self.key_file_path: Path = key_file_path
         self.autocert: bool = autocert
@@ -49,11 +154,25 @@ class APIManager:
         self.port: int = port
         self.cert_duration_days = cert_duration_days
         self.clients: Dict[str, WebSocket] = {}
+        self.senders: Dict[str, ClientSender] = {}
+        self.outbound_queue_size: int = outbound_queue_size
+        self.outbound_max_lag: float = outbound_max_lag
+        self.outbound_send_timeout: float = outbound_send_timeout
         self.thread = None
         self.server = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.heartbeat_delay: int = heartbeat_delay
         self.heartbeat_task = None
         self.heartbeat_running: bool = False
+        # Adaptive Intervalle pro Server zwischen heartbeat_min_delay und heartbeat_max_delay
+        self.heartbeat_scheduler: HeartbeatScheduler = HeartbeatScheduler(heartbeat_delay, heartbeat_min_delay,
+                                                                          heartbeat_max_delay)
+        self.heartbeat_wakeup: asyncio.Event = asyncio.Event()
+        # Liveness: Deadline pro Server, wird bei jeder Heartbeat-Antwort verschoben
+        self.heartbeat_missed_limit: int = max(1, heartbeat_missed_limit)
+        self.liveness: TimerWheel = TimerWheel(tick=1.0, slots=512, start=time.monotonic())
+        self.metrics_persist_interval: int = metrics_persist_interval
+        self.background_tasks: List[asyncio.Task] = []
         self.storage_manager: StorageManager = storage_manager
         self.communication_type: str = communication_type.lower()
         self.redis = None
@@ -64,7 +183,46 @@ class APIManager:
         self.redis_user: str = redis_user
         self.should_stop: bool = False
 
-        self.auth_tokens: Dict[str, str] = self.load_auth_tokens(auth_config_path)
+        # Multi-Worker Modus (nur WebSocket): N uvicorn-Prozesse teilen sich den Zustand über Redis
+        self.redis_host: str = redis_host
+        self.redis_port: int = redis_port
+        self.api_workers: int = max(1, api_workers)
+        self.worker_mode: bool = worker_mode
+        self.multi_worker: bool = self.communication_type == "websocket" and (worker_mode or self.api_workers > 1)
+        if self.multi_worker and not worker_mode and not supports_workers(storage_manager.db_type.value):
+            # Jeder Worker öffnet die Datenbank selbst: mit H2 klappt das nur für den ersten Prozess
+            pError(f"api_workers: {self.api_workers} braucht MySQL, MariaDB oder PostgreSQL "
+                   f"(storage_type ist '{storage_manager.db_type.value}'). Starte mit einem Worker.")
+            self.api_workers = 1
+            self.multi_worker = False
+        self.worker_id: str = make_worker_id()
+        self.worker_process: Optional[subprocess.Popen] = None
+        self.fleet_redis = None
+        self.fleet_state: Optional[FleetStateStore] = None
+        self.connection_directory: Dict[str, str] = {}  # server_id -> worker_id (alle Worker)
+
+        # RPC über die Server-Verbindung (Korrelation über Request-ID)
+        self.rpc: RpcManager = RpcManager(self.send_payload, default_timeout=rpc_timeout)
+        self.rpc_forwards: Dict[str, Tuple[str, str]] = {}  # Request-ID -> (Worker, der auf die Antwort wartet, server_id)
+        self._rpc_forward_expiry: List[Tuple[float, str]] = []  # (Deadline, Request-ID), abgelaufene werden verworfen
+
+        self.auth_config_path: str = auth_config_path
+        self._auth_lock = threading.Lock()
+        # auth_tokens.yaml schreibt nur der Hauptprozess, Worker lesen sie nur
+        self.auth_tokens: Dict[str, str] = self.load_auth_tokens(auth_config_path, write=not worker_mode)
+
+        # Rate-Limits pro Server/Endpoint und Speicher-Quota pro server:{id}: Namespace
+        ratelimit_config = ratelimit_config or {}
+        self.rate_limiter: RateLimiter = RateLimiter(ratelimit_config)
+        self.storage_quota: StorageQuota = StorageQuota(storage_manager,
+                                                        int(ratelimit_config.get("storage_quota_bytes", 0) or 0))
+
+        # Storage-/Log-Operationen (HTTP direkt, im Redis-Modus gebündelt über einen Worker-Pool)
+        self.data_ops: DataOperations = DataOperations(storage_manager, self.storage_quota,
+                                                       server_manager.player_index)
+        self.redis_data: Optional[RedisDataService] = None
+        self.redis_data_workers: int = redis_data_workers
+        self.redis_data_batch_size: int = redis_data_batch_size
 
 
         self.admin_token = "reguh9irefguh9greuhgregreuhigeriuhgerguhreigreuhiergiuh"
@@ -78,6 +236,19 @@ class APIManager:
             allow_headers=["*"],
         )
 
+        # Eine Dispatch-Tabelle für WebSocket und Redis
+        self.dispatcher: MessageDispatcher = MessageDispatcher()
+        self.dispatcher.register(HeartbeatResponse, self.process_heartbeat_response)
+        self.dispatcher.register(ShutdownNotification, self.process_shutdown_notification)
+        self.dispatcher.register(RpcResponse, self.process_rpc_response)
+        self.dispatcher.register(DataRequest, self.process_data_request)
+
+        self.app.add_event_handler("startup", self.start_background_tasks)
+        events.subscribe(SERVER_REGISTERED, self._on_server_registered)
+        events.subscribe(SERVER_UNREGISTERED, self._on_server_unregistered)
+        events.subscribe(SERVER_STATE_CHANGED, self._on_server_state_changed)
+        self.app.add_event_handler("shutdown", self.stop_background_tasks)
+
         self.setup_routes()
         if use_https:
             self.setup_https()
@@ -112,15 +283,7 @@ class APIManager:
                             break
                         if message["type"] == "message":
                             try:
-                                data = json.loads(message["data"])
-                                server_id = data.get("server_id")
-                                msg_type = data.get("type")
-                                if msg_type == "heartbeat_response":
-                                    self.process_heartbeat_response(server_id, data)
-                                elif msg_type == "shutdown_notification":
-                                    self.process_shutdown_notification(server_id, data)
-                                else:
-                                    pInfo(f"[Redis Daten] {server_id}: {data}")
+                                await self.handle_message("redis", message["data"])
                             except Exception as e:
                                 if not self.should_stop:
                                     pWarning(f"Redis Nachricht Fehler: {e}")
@@ -130,11 +293,293 @@ class APIManager:
                     if not self.should_stop:
                         pWarning(f"Redis Reader Fehler: {e}")
 
+            self.redis_data = RedisDataService(self.redis, self.data_ops,
+                                               workers=self.redis_data_workers,
+                                               batch_size=self.redis_data_batch_size)
+            self.redis_data.start()
             self.redis_task = asyncio.create_task(reader())
+            self.start_background_tasks()
             self.start_heartbeat()
             pInfo("Redis Kommunikation gestartet ✓")
 
-    def load_auth_tokens(self, path: str) -> Dict[str, str]:
+    async def handle_message(self, transport: str, raw: str, server_id: Optional[str] = None):
+        """Dekodiert und validiert eine Nachricht und ruft den Handler ihres Typs auf"""
+        try:
+            message, data = decode(raw)
+        except MessageError as e:
+            telemetry.MESSAGES_REJECTED.inc(transport=transport)
+            pWarning(f"Ungültige Nachricht von {server_id or 'unbekannt'} ({transport}): {e}")
+            return
+
+        if server_id is None:  # Redis: Absender steht in der Nachricht
+            server_id = data.get("server_id")
+            self._observe_redis_lag(data.get("timestamp"))
+        telemetry.MESSAGES_RECEIVED.inc(transport=transport, type=str(message.type))
+
+        if isinstance(message, UnknownMessage) or not await self.dispatcher.dispatch(server_id, message):
+            pInfo("[Daten] %s: %s", server_id, data)
+
+    @staticmethod
+    def _observe_redis_lag(timestamp: Optional[str]):
+        """Misst den Abstand zwischen Sende-Zeitstempel einer Redis-Nachricht und ihrer Verarbeitung"""
+        if not timestamp:
+            return
+        try:
+            sent = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+        except ValueError:
+            return
+        now = datetime.now(sent.tzinfo) if sent.tzinfo else datetime.now()
+        telemetry.REDIS_READER_LAG_SECONDS.set(max(0.0, (now - sent).total_seconds()))
+
+    def _add_client(self, server_id: str, websocket: WebSocket):
+        previous = self.senders.pop(server_id, None)
+        if previous:
+            previous.close()
+        self.clients[server_id] = websocket
+        sender = ClientSender(server_id, websocket,
+                              max_queue=self.outbound_queue_size,
+                              max_lag=self.outbound_max_lag,
+                              send_timeout=self.outbound_send_timeout,
+                              on_evict=self._on_client_evicted)
+        sender.start()
+        self.senders[server_id] = sender
+        self._schedule_heartbeat(server_id, time.monotonic())
+        telemetry.CONNECTED_CLIENTS.set(len(self.clients))
+        if self.fleet_state:
+            self.connection_directory[server_id] = self.worker_id
+            self._spawn(self.fleet_state.claim_connection(server_id))
+
+    def _remove_client(self, server_id: str, websocket: Optional[WebSocket] = None):
+        """Entfernt einen Client. Mit websocket nur, wenn es noch dieselbe Verbindung ist"""
+        if websocket is not None and self.clients.get(server_id) is not websocket:
+            return
+        if self.clients.pop(server_id, None) is None:
+            return
+        sender = self.senders.pop(server_id, None)
+        if sender:
+            sender.close()
+        self.heartbeat_scheduler.remove(server_id)
+        telemetry.CONNECTED_CLIENTS.set(len(self.clients))
+        if self.fleet_state:
+            if self.connection_directory.get(server_id) == self.worker_id:
+                self.connection_directory.pop(server_id, None)
+            self._spawn(self.fleet_state.release_connection(server_id))
+
+    def _on_client_evicted(self, server_id: str, reason: str):
+        self._remove_client(server_id)
+
+    def _enqueue(self, server_id: str, text: str, coalesce_key: Optional[str] = None) -> bool:
+        """Reiht eine Nachricht in die Sende-Warteschlange des Clients ein"""
+        sender = self.senders.get(server_id)
+        if sender is None:
+            return False
+        return sender.send(text, coalesce_key)
+
+    def is_connected(self, server_id: str) -> bool:
+        return server_id in self.clients or server_id in self.connection_directory
+
+    @staticmethod
+    def _spawn(coro):
+        """Plant eine Coroutine im laufenden Event-Loop ein (ohne Loop wird sie verworfen)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coro.close()
+            return None
+        return loop.create_task(coro)
+
+    def _share_runtime(self, server, crash_reason: Optional[str] = None):
+        """Verteilt geänderte Laufzeitdaten an die anderen API-Worker"""
+        if self.fleet_state:
+            self._spawn(self.fleet_state.publish_runtime(server, crash_reason))
+
+    def publish_process_stats(self, server: Server, with_metrics: bool):
+        """ProcSampler (anderer Thread): Messwerte im Multi-Worker Modus an die Worker weitergeben"""
+        if self.multi_worker and not self.worker_mode:
+            self._call_in_loop(self._share_process_stats, server, with_metrics)
+
+    def _share_process_stats(self, server: Server, with_metrics: bool):
+        if self.fleet_state:
+            self._spawn(self.fleet_state.publish_process(server, with_metrics))
+
+    async def init_fleet_state(self):
+        """Verbindet diesen Prozess mit dem gemeinsamen Flotten-Zustand in Redis"""
+        if self.fleet_state is not None:
+            return
+        self.fleet_redis = aioredis.from_url(f"redis://{self.redis_host}:{self.redis_port}",
+                                             username=self.redis_user,
+                                             password=self.redis_password,
+                                             decode_responses=True)
+        self.fleet_state = FleetStateStore(self.fleet_redis, self.worker_id)
+
+        if self.worker_mode:
+            for server_id, data in (await self.fleet_state.load_servers()).items():
+                self._apply_server_update(server_id, data)
+        for server_id, runtime in (await self.fleet_state.load_runtime()).items():
+            server = self.server_manager.get_server_by_id(server_id)
+            if server:
+                apply_runtime(server, runtime)
+        self.connection_directory = await self.fleet_state.connections()
+        pInfo(f"Gemeinsamer Flotten-Zustand verbunden (Worker {self.worker_id}) ✓")
+
+    async def fleet_state_reader(self):
+        """Empfängt Laufzeitdaten anderer Worker und an diesen Worker weitergeleitete Nachrichten"""
+        pubsub = self.fleet_redis.pubsub()
+        await pubsub.subscribe(CHANNEL_RUNTIME, self.fleet_state.channel)
+        try:
+            async for message in pubsub.listen():
+                if self.should_stop:
+                    break
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    if message["channel"] == CHANNEL_RUNTIME:
+                        self._apply_fleet_update(data)
+                    else:
+                        await self._handle_routed_message(data)
+                except Exception as e:
+                    if not self.should_stop:
+                        pWarning(f"Fehler im Flotten-Zustand: {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.close()
+            except Exception:
+                pass
+
+    def _apply_fleet_update(self, data: dict):
+        if data.get("worker_id") == self.worker_id:
+            return
+        server_id = data.get("server_id")
+        if "server" in data:
+            if self.worker_mode:
+                self._apply_server_update(server_id, data)
+            return
+        if "connected_worker" in data:
+            if data["connected_worker"]:
+                self.connection_directory[server_id] = data["connected_worker"]
+            elif server_id not in self.clients:
+                self.connection_directory.pop(server_id, None)
+            return
+        server = self.server_manager.get_server_by_id(server_id)
+        if server and "process" in data:
+            # Messwerte aus /proc vom Hauptprozess
+            server.process_stats = data["process"]
+            if "cpu_usage" in data:
+                server.cpu_usage = data["cpu_usage"]
+                server.ram_usage_mb = data["ram_usage_mb"]
+                telemetry.observe_server(server)
+            return
+        if server and server_id not in self.clients:
+            sampled = (server.cpu_usage, server.ram_usage_mb) if server.process_stats else None
+            apply_runtime(server, data.get("runtime") or {})
+            if sampled and server.cpu_usage is None and server.ram_usage_mb is None:
+                # Plugin liefert keine Werte: die aus /proc (ProcSampler bzw. Hauptprozess) behalten
+                server.cpu_usage, server.ram_usage_mb = sampled
+            if not self.worker_mode:
+                # Hauptprozess: führt den Metrik-Verlauf für alle Worker und speichert ihn
+                server.metrics_history.add_sample(server.tps, server.cpu_usage, server.ram_usage_mb)
+            if not self.server_manager.is_registered(server):
+                return  # Beim Statuswechsel entfernt (dynamische Instanz)
+            self.server_manager.runtime_updated(server)
+            telemetry.observe_server(server)
+            if data.get("crashed") and not self.worker_mode and server.server_state == ServerState.CRASHED:
+                # Absturz wurde im Worker mit der Verbindung erkannt: Neustart (CrashRecovery) läuft hier
+                events.emit(SERVER_CRASHED, server=server, reason=data["crashed"])
+
+    def _apply_server_update(self, server_id: str, data: dict):
+        """Worker: vom Hauptprozess zur Laufzeit registrierte bzw. entfernte Server übernehmen"""
+        existing = self.server_manager.get_server_by_id(server_id)
+        if data.get("server") is None:
+            if existing:
+                self.server_manager.unregister_server(existing)
+            self.auth_tokens.pop(server_id, None)
+            return
+        if data.get("auth_token"):
+            self.auth_tokens[server_id] = data["auth_token"]
+        if existing is None:
+            self.server_manager.register_server(server_from_dict(data["server"]))
+
+    async def _handle_routed_message(self, data: dict):
+        if "rpc_response" in data:
+            self.rpc.resolve(data["rpc_response"])
+            return
+
+        server_id = data.get("server_id")
+        if server_id not in self.clients:
+            pWarning(f"Weitergeleitete Nachricht für {server_id}, aber keine Verbindung in diesem Worker")
+            return
+        if data.get("rpc_reply_to"):
+            self._expire_rpc_forwards()
+            self.rpc_forwards[data["rpc_id"]] = (data["rpc_reply_to"], server_id)
+            timeout = data.get("rpc_timeout") or self.rpc.default_timeout
+            heapq.heappush(self._rpc_forward_expiry, (time.monotonic() + timeout, data["rpc_id"]))
+        self._enqueue(server_id, data["message"])
+
+    async def process_rpc_response(self, server_id: str, message: RpcResponse):
+        """Ordnet eine RPC-Antwort dem wartenden Aufruf zu (lokal oder in einem anderen Worker)"""
+        data = message.to_dict()
+        if self.rpc.resolve(data):
+            return
+        self._expire_rpc_forwards()
+        forward = self.rpc_forwards.pop(message.id, None)
+        reply_to = forward[0] if forward else None
+        if reply_to and self.fleet_state:
+            await self.fleet_redis.publish(CHANNEL_WORKER.format(worker_id=reply_to),
+                                           json.dumps({"rpc_response": data}))
+            return
+        pDebug("RPC-Antwort ohne wartenden Aufruf: %s", message.id)
+
+    def _expire_rpc_forwards(self):
+        """Vergisst Weiterleitungen, deren Aufruf im anderen Worker schon abgelaufen ist"""
+        now = time.monotonic()
+        while self._rpc_forward_expiry and self._rpc_forward_expiry[0][0] <= now:
+            _, rpc_id = heapq.heappop(self._rpc_forward_expiry)
+            self.rpc_forwards.pop(rpc_id, None)
+
+    def _fail_rpc_calls(self, server_id: str, reason: str):
+        """Verbindung weg: wartende Aufrufe sofort scheitern lassen, auch die anderer Worker"""
+        self.rpc.cancel_all(server_id, reason)
+        for rpc_id, (reply_to, target) in list(self.rpc_forwards.items()):
+            if target != server_id:
+                continue
+            del self.rpc_forwards[rpc_id]
+            if self.fleet_state:
+                self._spawn(self.fleet_redis.publish(CHANNEL_WORKER.format(worker_id=reply_to),
+                                                     json.dumps({"rpc_response": {"id": rpc_id, "error": reason}})))
+
+    async def execute_command_async(self, server_id: str, command: str, timeout: Optional[float] = None) -> List[str]:
+        """Führt einen Konsolenbefehl per RPC aus und liefert die Ausgabezeilen"""
+        result = await self.rpc.call(server_id, "command", {"command": command}, timeout)
+        if isinstance(result, dict):
+            output = result.get("output", [])
+        else:
+            output = result
+        if output is None:
+            return []
+        if isinstance(output, str):
+            return output.splitlines()
+        return [str(line) for line in output]
+
+    def can_rpc(self, server_id: str) -> bool:
+        """True, wenn der API-Loop läuft und der Server über WebSocket/Redis erreichbar ist"""
+        if not self.loop or not self.loop.is_running():
+            return False
+        if self.communication_type == "redis":
+            server = self.server_manager.get_server_by_id(server_id)
+            return self.redis is not None and server is not None and server.is_running
+        return self.is_connected(server_id)
+
+    def execute_command(self, server_id: str, command: str, timeout: Optional[float] = None) -> List[str]:
+        """Blockierende Variante für die CLI (läuft im Thread des Prompts)"""
+        timeout = timeout or self.rpc.default_timeout
+        future = asyncio.run_coroutine_threadsafe(self.execute_command_async(server_id, command, timeout), self.loop)
+        return future.result(timeout + 1)
+
+    def load_auth_tokens(self, path: str, write: bool = True) -> Dict[str, str]:
         tokens = {}
 
         path = Path(path)
@@ -152,49 +597,54 @@ class APIManager:
                 pInfo(f"Neuer Token generiert für '{srv.server_id}'")
                 updated = True
 
-        if not path.exists() or updated:
+        if write and (not path.exists() or updated):
             with open(path, "w") as f:
                 yaml.dump(tokens, f)
             pInfo(f"Auth-Datei aktualisiert: '{path}'")
 
         return tokens
 
+    def ensure_auth_token(self, server_id: str) -> str:
+        """Token für einen zur Laufzeit erstellten Server (dynamische Instanz), wird in auth_tokens.yaml ergänzt"""
+        token = self.auth_tokens.get(server_id)
+        if token:
+            return token
+        with self._auth_lock:
+            token = self.auth_tokens.get(server_id)
+            if token:
+                return token
+            token = self.auth_tokens[server_id] = secrets.token_hex(32)
+            # Temporäre Datei + os.replace: Leser sehen nie eine halb geschriebene Datei
+            tmp = f"{self.auth_config_path}.tmp"
+            with open(tmp, "w") as f:
+                yaml.dump(dict(self.auth_tokens), f)
+            os.replace(tmp, self.auth_config_path)
+        pInfo(f"Neuer Token generiert für '{server_id}'")
+        return token
+
     async def heartbeat_loop(self):
-        """Sendet regelmäßig Heartbeats"""
+        """Sendet Heartbeat-Requests an alle Server, deren Intervall abgelaufen ist"""
         while self.heartbeat_running and not self.should_stop:
             try:
-                if self.communication_type == "websocket":  # Websocket
-                    for server_id, websocket in list(self.clients.items()):
-                        try:
-                            heartbeat_request = {
-                                "type": "heartbeat_request",
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            await websocket.send_text(json.dumps(heartbeat_request))
-                            pDebug(f"Heartbeat-Request an {server_id} gesendet")
-                        except Exception as e:
-                            pWarning(f"Fehler beim Senden von Heartbeat an {server_id}: {e}")
-                            self.clients.pop(server_id, None)
-                            server = self.server_manager.get_server_by_id(server_id)
-                            if server:
-                                self.reset_server_runtime_data(server)
-                else:  # Redis
-                    if self.redis and not self.should_stop:
-                        for server in self.server_manager.servers:
-                            heartbeat_request = {
-                                "type": "heartbeat_request",
-                                "server_id": server.server_id,
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            try:
-                                await self.redis.publish(f"echocloud:{server.server_id}", json.dumps(heartbeat_request))
-                                pDebug(f"Heartbeat-Request an {server.server_id} über Redis gesendet")
-                            except Exception as e:
-                                if not self.should_stop:
-                                    pWarning(f"Redis Heartbeat Fehler: {e}")
-                                break
-
-                await asyncio.sleep(self.heartbeat_delay)
+                now = time.monotonic()
+                due_servers = self.heartbeat_scheduler.pop_due(now)
+                if due_servers:
+                    tick_start = time.perf_counter()
+                    if self.communication_type == "websocket":  # Websocket
+                        self._send_websocket_heartbeats(due_servers, now)
+                    elif self.redis and not self.should_stop:  # Redis
+                        await self._send_redis_heartbeats(due_servers, now)
+                    telemetry.HEARTBEAT_TICK_SECONDS.observe(time.perf_counter() - tick_start)
+
+                # Bis zur nächsten Fälligkeit schlafen, neue oder vorgezogene Server wecken früher auf
+                next_due = self.heartbeat_scheduler.next_due()
+                timeout = self.heartbeat_scheduler.max_interval if next_due is None else next_due - time.monotonic()
+                self.heartbeat_wakeup.clear()
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self.heartbeat_wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -202,12 +652,203 @@ class APIManager:
                     pWarning(f"Fehler im Heartbeat-Loop: {e}")
                     await asyncio.sleep(1)
 
+    def _heartbeat_request(self, server_id: Optional[str] = None) -> str:
+        request = {"type": "heartbeat_request", "timestamp": datetime.now().isoformat()}
+        if server_id:
+            request["server_id"] = server_id
+        return json.dumps(request)
+
+    def _send_websocket_heartbeats(self, server_ids: List[str], now: float):
+        heartbeat_request = self._heartbeat_request()
+        for server_id in server_ids:
+            if server_id not in self.clients:
+                continue
+            server = self.server_manager.get_server_by_id(server_id)
+            # Ein noch nicht gesendeter Heartbeat-Request wird ersetzt statt doppelt eingereiht
+            if self._enqueue(server_id, heartbeat_request, coalesce_key="heartbeat_request"):
+                pDebug("Heartbeat-Request an %s eingereiht", server_id)
+                if server:
+                    self._schedule_heartbeat(server_id, now + self.heartbeat_scheduler.interval_for(server))
+            elif server:
+                self.reset_server_runtime_data(server)
+
+    async def _send_redis_heartbeats(self, server_ids: List[str], now: float):
+        servers = [s for s in map(self.server_manager.get_server_by_id, server_ids) if s]
+        for server in servers:
+            self._schedule_heartbeat(server.server_id, now + self.heartbeat_scheduler.interval_for(server))
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for server in servers:
+                    pipe.publish(f"echocloud:{server.server_id}", self._heartbeat_request(server.server_id))
+                await pipe.execute()
+            pDebug("Heartbeat-Requests an %d Server über Redis gesendet", len(servers))
+        except Exception as e:
+            if not self.should_stop:
+                pWarning(f"Redis Heartbeat Fehler: {e}")
+
+    def _schedule_heartbeat(self, server_id: str, due: float):
+        if self.heartbeat_scheduler.schedule(server_id, due):
+            self.heartbeat_wakeup.set()
+
+    def _call_in_loop(self, callback: Callable[..., Any], *args):
+        """Führt callback im Event-Loop der API aus, auch wenn das Event aus einem anderen Thread kommt"""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _is_heartbeat_target(self, server_id: str) -> bool:
+        if self.communication_type == "websocket":
+            return server_id in self.clients
+        return self.heartbeat_running
+
+    def _heartbeat_soon(self, server_id: str):
+        if self._is_heartbeat_target(server_id):
+            self._schedule_heartbeat(server_id, time.monotonic())
+
+    def _on_server_registered(self, server: Server):
+        self._call_in_loop(self._heartbeat_soon, server.server_id)
+        if self.multi_worker and not self.worker_mode:
+            self._call_in_loop(self._publish_server, server)
+
+    def _on_server_unregistered(self, server: Server):
+        self._call_in_loop(self.heartbeat_scheduler.remove, server.server_id)
+        if self.multi_worker and not self.worker_mode:
+            self._call_in_loop(self._unpublish_server, server.server_id)
+
+    def _publish_server(self, server: Server):
+        """Hauptprozess: zur Laufzeit registrierte Server (Autoscan, dynamische Instanzen) an die Worker geben"""
+        if self.fleet_state:
+            self._spawn(self.fleet_state.publish_server(server, self.auth_tokens.get(server.server_id)))
+
+    def _unpublish_server(self, server_id: str):
+        if self.fleet_state:
+            self._spawn(self.fleet_state.remove_server(server_id))
+
+    def _on_server_state_changed(self, server: Server, old_state: ServerState, new_state: ServerState):
+        # Statuswechsel (z.B. Start über die CLI) sofort nachverfolgen statt das lange Intervall abzuwarten
+        if new_state in (ServerState.STARTING, ServerState.STOPPING):
+            self._call_in_loop(self._heartbeat_soon, server.server_id)
+
+    def start_background_tasks(self):
+        """Startet die periodischen Hintergrund-Tasks im Event-Loop der API"""
+        if self.background_tasks:
+            return
+        self.loop = asyncio.get_running_loop()
+        if not self.worker_mode:  # Im Multi-Worker Modus speichert der Hauptprozess (siehe _run_worker_pool)
+            self.background_tasks.append(asyncio.create_task(self.metrics_persist_loop()))
+        self.background_tasks.append(asyncio.create_task(self.event_loop_lag_monitor()))
+        self.background_tasks.append(asyncio.create_task(self.liveness_monitor()))
+        if self.worker_mode:
+            self.background_tasks.append(asyncio.create_task(self._run_fleet_state()))
+
+    async def _run_fleet_state(self):
+        try:
+            await self.init_fleet_state()
+            await self.fleet_state_reader()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            pError(f"Gemeinsamer Flotten-Zustand nicht verfügbar: {e}")
+
+    async def stop_background_tasks(self):
+        if self.fleet_state:
+            try:
+                await self.fleet_state.release_all(self.clients.keys())
+            except Exception as e:
+                pWarning(f"Fehler beim Freigeben der Verbindungen: {e}")
+        for task in self.background_tasks:
+            task.cancel()
+        for task in self.background_tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.background_tasks.clear()
+
+    async def metrics_persist_loop(self):
+        """Speichert den Metrik-Verlauf aller Server in festen Abständen"""
+        while not self.should_stop:
+            try:
+                await asyncio.sleep(self.metrics_persist_interval)
+                # Datenbank-Schreibzugriffe im Thread, sonst stehen Heartbeats, WebSockets und RPC so lange still
+                await asyncio.to_thread(self.server_manager.save_metrics_history)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if not self.should_stop:
+                    pWarning(f"Fehler beim Speichern des Metrik-Verlaufs: {e}")
+
+    async def event_loop_lag_monitor(self, interval: float = 0.5):
+        """Misst, wie viel später als geplant der Event-Loop einen Sleep beendet"""
+        while not self.should_stop:
+            try:
+                start = time.perf_counter()
+                await asyncio.sleep(interval)
+                telemetry.EVENT_LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - start - interval))
+            except asyncio.CancelledError:
+                break
+
+    async def liveness_monitor(self):
+        """Markiert Server, deren Heartbeat-Antworten ausbleiben, als abgestürzt"""
+        while not self.should_stop:
+            try:
+                await asyncio.sleep(self.liveness.tick)
+                for server_id in self.liveness.advance(time.monotonic()):
+                    server = self.server_manager.get_server_by_id(server_id)
+                    if server and server.is_running:
+                        self._handle_server_lost(
+                            server, f"{self.heartbeat_missed_limit} Heartbeats ohne Antwort")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if not self.should_stop:
+                    pWarning(f"Fehler bei der Heartbeat-Überwachung: {e}")
+
+    def _mark_alive(self, server: Server):
+        """Merkt sich die letzte Heartbeat-Antwort und verschiebt die Timeout-Deadline"""
+        server.last_seen = datetime.now()
+        now = time.monotonic()
+        # Der nächste Request kann noch mit dem alten (längeren) Intervall geplant sein
+        interval = max(self.heartbeat_scheduler.interval_for(server),
+                       self.heartbeat_scheduler.due_in(server.server_id, now))
+        timeout = interval * self.heartbeat_missed_limit + self.liveness.tick
+        self.liveness.schedule(server.server_id, now + timeout)
+
+    def _handle_server_lost(self, server: Server, reason: str):
+        """Verbindung bzw. Heartbeats verloren: ordnungsgemäßer Shutdown oder Crash"""
+        if server.server_state in (ServerState.OFFLINE, ServerState.CRASHED):
+            # Bereits erkannt, z.B. vom Supervisor beim Prozessende
+            self.reset_server_runtime_data(server, server.server_state)
+        elif server.server_state == ServerState.STOPPING:
+            self.reset_server_runtime_data(server)
+            pInfo(f"Server {server.server_id} ordnungsgemäß heruntergefahren")
+        else:
+            self.reset_server_runtime_data(server, ServerState.CRASHED, crash_reason=reason)
+            pWarning(f"Server {server.server_id} unerwartet abgestürzt ({reason})")
+            events.emit(SERVER_CRASHED, server=server, reason=reason)
+
     def start_heartbeat(self):
         if not self.heartbeat_running:
             self.heartbeat_running = True
+            if self.communication_type != "websocket":
+                # Erste Requests über das Basisintervall verteilen, damit nicht alle Server gleichzeitig antworten
+                now = time.monotonic()
+                servers = self.server_manager.servers
+                for index, server in enumerate(servers):
+                    self._schedule_heartbeat(server.server_id,
+                                             now + index * self.heartbeat_scheduler.base_interval / len(servers))
             self.heartbeat_task = asyncio.create_task(self.heartbeat_loop())
             print("\n")  # Wegen Zeilen Bug. Nachricht Kommt aus anderer Thread. Wiederspricht sich mit Commandmanager.
-            pInfo(f"Heartbeat-System gestartet (Intervall: {self.heartbeat_delay}s)")
+            pInfo(f"Heartbeat-System gestartet (Intervall: {self.heartbeat_scheduler.min_interval:g}-"
+                  f"{self.heartbeat_scheduler.max_interval:g}s, Basis {self.heartbeat_scheduler.base_interval:g}s)")
 
     def stop_heartbeat(self):
         self.heartbeat_running = False
@@ -215,9 +856,11 @@ class APIManager:
             self.heartbeat_task.cancel()
             pInfo("Heartbeat-System gestoppt")
 
-    def reset_server_runtime_data(self, server):
-        """Setzt alle Laufzeit-Informationen des Servers zurück"""
-        server.server_state = ServerState.OFFLINE
+    def reset_server_runtime_data(self, server, state: ServerState = ServerState.OFFLINE,
+                                  crash_reason: Optional[str] = None):
+        """Setzt alle Laufzeit-Informationen des Servers zurück (state: OFFLINE oder CRASHED)"""
+        self.liveness.cancel(server.server_id)
+        server.server_state = state
         server.is_running = False
         server.start_time = None
         server.tps = 0.0
@@ -225,8 +868,13 @@ class APIManager:
         server.ram_usage_mb = 0.0
         server.players_online = []
         server.max_players = 0
+        if not self.server_manager.is_registered(server):
+            return  # Beim Statuswechsel entfernt (dynamische Instanz): keine Metriken/Serverauswahl mehr
+        self.server_manager.runtime_updated(server)
+        telemetry.observe_server(server)
+        self._share_runtime(server, crash_reason)
 
-    def process_shutdown_notification(self, server_id: str, data: dict):
+    def process_shutdown_notification(self, server_id: str, message: ShutdownNotification):
         """Verarbeitet Shutdown-Benachrichtigungen von Servern"""
         server = self.server_manager.get_server_by_id(server_id)
         if not server:
@@ -234,63 +882,114 @@ class APIManager:
             return
 
         # Server aus Client-Liste entfernen falls vorhanden
-        self.clients.pop(server_id, None)
+        self._remove_client(server_id)
 
         # Alle Laufzeit-Daten zurücksetzen
         self.reset_server_runtime_data(server)
 
-    def process_heartbeat_response(self, server_id: str, data: dict):
+    def process_heartbeat_response(self, server_id: str, message: HeartbeatResponse):
         server = self.server_manager.get_server_by_id(server_id)
         if not server:
             pWarning(f"Unbekannter Server: {server_id}")
             return
 
         try:
-            state_str = data.get("server_state")
-            if state_str and state_str in [s.value for s in ServerState]:
-                server.server_state = ServerState(state_str)
-                server.is_running = server.server_state == ServerState.ONLINE
+            if message.server_state is not None:
+                new_state = message.server_state
+                is_running = new_state == ServerState.ONLINE
             else:
-                server.is_running = data.get("is_running", False)
-                server.server_state = ServerState.ONLINE if server.is_running else ServerState.OFFLINE
+                is_running = message.is_running
+                new_state = ServerState.ONLINE if is_running else ServerState.OFFLINE
+
+            # Metriken vor dem Statuswechsel setzen: SERVER_STATE_CHANGED-Listener (Selector) sehen schon die neuen Werte
+            if is_running:
+                if not server.start_time:
+                    start_time_str = message.start_time
+                    if start_time_str:
+                        try:
+                            server.start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
+                        except:
+                            server.start_time = datetime.now()
+                    else:
+                        server.start_time = datetime.now()
+
+                if message.tps is not None and message.cpu_usage is not None and message.ram_usage_mb is not None:
+                    server.update_metrics(
+                        tps=message.tps,
+                        cpu_usage=message.cpu_usage,
+                        ram_usage=message.ram_usage_mb
+                    )
+
+                server.update_players(message.players_online, message.max_players)
+
+            server.is_running = is_running
+            server.server_state = new_state
 
             # Wenn Server nicht mehr läuft, Daten zurücksetzen
             if not server.is_running:
                 self.reset_server_runtime_data(server)
                 return
 
-            if server.is_running and not server.start_time:
-                start_time_str = data.get("start_time")
-                if start_time_str:
-                    try:
-                        server.start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                    except:
-                        server.start_time = datetime.now()
-                else:
-                    server.start_time = datetime.now()
-
-            tps = data.get("tps")
-            cpu_usage = data.get("cpu_usage")
-            ram_usage = data.get("ram_usage_mb")
+            self.server_manager.runtime_updated(server)
+            self._mark_alive(server)
+            telemetry.observe_server(server)
+            self._share_runtime(server)
 
-            if tps is not None and cpu_usage is not None and ram_usage is not None:
-                server.update_metrics(
-                    tps=float(tps),
-                    cpu_usage=float(cpu_usage),
-                    ram_usage=float(ram_usage)
-                )
-
-            players_online = data.get("players_online", [])
-            max_players = data.get("max_players", 0)
-            server.update_players(players_online, max_players)
-
-            pDebug(f"Heartbeat von {server_id}: Status={server.server_state.value}, "
-                   f"TPS={server.tps}, CPU={server.cpu_usage}%, RAM={server.ram_usage_mb}MB, "
-                   f"Spieler={len(server.players_online)}/{server.max_players}")
+            pDebug("Heartbeat von %s: Status=%s, TPS=%s, CPU=%s%%, RAM=%sMB, Spieler=%d/%d",
+                   server_id, server.server_state.value, server.tps, server.cpu_usage, server.ram_usage_mb,
+                   len(server.players_online), server.max_players)
 
         except Exception as e:
             pWarning(f"Fehler beim Verarbeiten von Heartbeat-Daten von {server_id}: {e}")
 
+    def _enforce_rate_limit(self, server_id: str, endpoint: str, cost: float = 1.0):
+        """Wirft 429, wenn der Server sein Kontingent für den Endpoint aufgebraucht hat"""
+        allowed, retry_after = self.rate_limiter.check(server_id, endpoint, cost)
+        if not allowed:
+            telemetry.RATE_LIMITED.inc(server_id=server_id, endpoint=endpoint)
+            raise HTTPException(status_code=429,
+                                detail=f"Rate-Limit für '{endpoint}' überschritten",
+                                headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))})
+
+    async def process_data_request(self, server_id: str, message: DataRequest):
+        """Storage-/Log-Anfrage über Redis: gleiche Auth und Rate-Limits wie die HTTP-Endpoints"""
+        if not self.redis_data or not server_id:
+            return
+        expected_token = self.auth_tokens.get(server_id)
+        if not expected_token or not secrets.compare_digest(expected_token, message.auth_token):
+            await self.redis_data.reply(server_id, message, 401, {"status": "error", "detail": "Auth fehlgeschlagen"})
+            return
+        try:
+            self._enforce_rate_limit(server_id, REQUEST_TYPES[message.type][1])
+        except HTTPException as e:
+            await self.redis_data.reply(server_id, message, e.status_code,
+                                        {"status": "error", "detail": e.detail,
+                                         "retry_after": int(e.headers["Retry-After"])})
+            return
+        if not self.redis_data.submit(server_id, message):
+            await self.redis_data.reply(server_id, message, 503,
+                                        {"status": "error", "detail": "Zu viele offene Anfragen"})
+
+    def serialize_server(self, server: Server, fields: List[str]) -> Dict[str, Any]:
+        """Baut nur die angeforderten Felder eines Servers auf"""
+        return {field: SERVER_FIELDS[field](self, server) for field in fields}
+
+    @staticmethod
+    def _parse_fields(raw: Optional[str], default: List[str]) -> List[str]:
+        if not raw:
+            return default
+        fields = [f.strip() for f in raw.split(",") if f.strip()]
+        unknown = [f for f in fields if f not in SERVER_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unbekannte Felder: {', '.join(unknown)}")
+        return fields
+
+    def _authorize_server_or_admin(self, server_id: str, auth_token: str):
+        expected_token = self.auth_tokens.get(server_id)
+        is_server = expected_token and secrets.compare_digest(expected_token, auth_token)
+        if not is_server and not secrets.compare_digest(self.admin_token, auth_token):
+            raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
+
     def setup_routes(self):
         @self.app.websocket("/ws/{server_id}/{auth_token}")
         async def websocket_endpoint(websocket: WebSocket, server_id: str, auth_token: str):
@@ -301,7 +1000,7 @@ class APIManager:
                 return
 
             await websocket.accept()
-            self.clients[server_id] = websocket
+            self._add_client(server_id, websocket)
             pInfo(f"Server verbunden: {server_id}")
 
             if not self.heartbeat_running:
@@ -310,72 +1009,81 @@ class APIManager:
             try:
                 while True:
                     data = await websocket.receive_text()
-                    try:
-                        json_data = json.loads(data)
-                        message_type = json_data.get("type")
-
-                        if message_type == "heartbeat_response":
-                            self.process_heartbeat_response(server_id, json_data)
-                        elif message_type == "shutdown_notification":
-                            self.process_shutdown_notification(server_id, json_data)
-                        else:
-                            pInfo(f"[Daten] {server_id}: {data}")
-                    except json.JSONDecodeError:
-                        pInfo(f"[Daten] {server_id}: {data}")
-
-            except WebSocketDisconnect:
-                self.clients.pop(server_id, None)
-                pWarning(f"Verbindung getrennt: {server_id}")
+                    await self.handle_message("websocket", data, server_id)
+
+            except (WebSocketDisconnect, RuntimeError):
+                current = self.clients.get(server_id)
+                if current is not None and current is not websocket:
+                    return  # Durch eine neuere Verbindung desselben Servers ersetzt
+                evicted = current is None  # Bereits wegen Rückstau entfernt
+                self._remove_client(server_id, websocket)
+                self._fail_rpc_calls(server_id, "Verbindung getrennt")
+                pWarning(f"Verbindung getrennt: {server_id}{' (Rückstau)' if evicted else ''}")
 
                 server = self.server_manager.get_server_by_id(server_id)
                 if server:
-                    # Unterscheidung zwischen ordnungsgemäßem Shutdown und Crash
-                    if server.server_state == ServerState.STOPPING:
-                        server.server_state = ServerState.OFFLINE
-                        pInfo(f"Server {server_id} ordnungsgemäß heruntergefahren")
-                    else:
-                        server.server_state = ServerState.CRASHED
-                        pWarning(f"Server {server_id} unerwartet abgestürzt")
-
-                    # In beiden Fällen Laufzeit-Daten zurücksetzen
-                    self.reset_server_runtime_data(server)
+                    self._handle_server_lost(server, "Verbindung getrennt")
 
         @self.app.get("/api/ping")
         async def ping():
             return JSONResponse({"status": "ok"})
 
+        @self.app.get("/metrics")
+        async def metrics(request: Request):
+            """Prometheus-Exposition. Auth über 'Authorization: Bearer <admin_token>'"""
+            auth_header = request.headers.get("authorization", "")
+            scheme, _, token = auth_header.partition(" ")
+            if scheme.lower() != "bearer" or not secrets.compare_digest(self.admin_token, token.strip()):
+                raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
+            return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
         @self.app.get("/api/servers/{auth_token}")
-        async def get_servers(auth_token: str):
+        async def get_servers(auth_token: str,
+                              fields: Optional[str] = None,
+                              state: Optional[str] = None,
+                              server_type: Optional[str] = None,
+                              software: Optional[str] = None,
+                              sort: str = "server_id",
+                              order: str = "asc",
+                              cursor: Optional[str] = None,
+                              limit: Optional[int] = None):
+            """
+            Liste aller Server. Optionale Query-Parameter:
+            fields=server_id,server_state,player_count  state=Online,Startet  server_type=Lobby
+            software=Paper  sort=players  order=asc|desc  limit=50  cursor=<next_cursor>
+            """
             if not secrets.compare_digest(self.admin_token, auth_token):  # Admin-Token für alle Server
                 raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
-            servers_data = []
-            for server in self.server_manager.servers:
-                server_info = {
-                    "server_id": server.server_id,
-                    "name": server.name,
-                    "ip": server.ip,
-                    "port": server.port,
-                    "server_type": server.server_type,
-                    "software": server.software.value,
-                    "software_version": server.software_version,
-                    "server_state": server.server_state.value,
-                    "is_running": server.is_running,
-                    "start_time": server.start_time.isoformat() if server.start_time else None,
-                    "tps": server.tps,
-                    "cpu_usage": server.cpu_usage,
-                    "ram_usage_mb": server.ram_usage_mb,
-                    "players_online": server.players_online,
-                    "max_players": server.max_players,
-                    "uptime": server.get_uptime(),
-                    "java_memory": server.java_memory,
-                    "connected": server.server_id in self.clients
-                }
-                servers_data.append(server_info)
-
-            return JSONResponse({"servers": servers_data})
+
+            selected_fields = self._parse_fields(fields, DEFAULT_LIST_FIELDS)
+            if sort not in SORT_KEYS:
+                raise HTTPException(status_code=400,
+                                    detail=f"Ungültige Sortierung. Erlaubt: {', '.join(SORT_KEYS)}")
+            if order not in ("asc", "desc"):
+                raise HTTPException(status_code=400, detail="Ungültige order. Erlaubt: 'asc', 'desc'")
+            if limit is not None and limit <= 0:
+                raise HTTPException(status_code=400, detail="limit muss größer als 0 sein")
+
+            server_types = [t.strip() for t in server_type.split(",") if t.strip()] if server_type else None
+
+            try:
+                servers, next_cursor = self.server_manager.query_servers(
+                    states=_parse_enum_list(state, ServerState, "state"),
+                    server_types=server_types,
+                    softwares=_parse_enum_list(software, Software, "software"),
+                    sort_by=sort,
+                    descending=order == "desc",
+                    cursor=cursor,
+                    limit=limit
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            servers_data = [self.serialize_server(server, selected_fields) for server in servers]
+            return JSONResponse({"servers": servers_data, "next_cursor": next_cursor})
 
         @self.app.get("/api/server/{server_id}/{auth_token}")
-        async def get_server(server_id: str, auth_token: str):
+        async def get_server(server_id: str, auth_token: str, fields: Optional[str] = None):
             expected_token = self.auth_tokens.get(server_id)
             if not expected_token or not secrets.compare_digest(expected_token, auth_token):
                 raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
@@ -383,30 +1091,195 @@ class APIManager:
             if not server:
                 raise HTTPException(status_code=404, detail="Server nicht gefunden")
 
-            server_info = {
+            return JSONResponse(self.serialize_server(server, self._parse_fields(fields, DETAIL_FIELDS)))
+
+        @self.app.get("/api/server/{server_id}/metrics/{auth_token}")
+        async def get_server_metrics(server_id: str, auth_token: str, range: str = "1h",
+                                     resolution: Optional[str] = None):
+            """
+            Metrik-Verlauf (TPS, CPU, RAM) eines Servers.
+            range=30m|6h|7d, resolution=raw|1m|10m (optional, sonst automatisch)
+            """
+            expected_token = self.auth_tokens.get(server_id)
+            is_server = expected_token and secrets.compare_digest(expected_token, auth_token)
+            if not is_server and not secrets.compare_digest(self.admin_token, auth_token):
+                raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
+            server = self.server_manager.get_server_by_id(server_id)
+            if not server:
+                raise HTTPException(status_code=404, detail="Server nicht gefunden")
+
+            try:
+                history = server.metrics_history.query(parse_range(range), resolution)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            return JSONResponse({"server_id": server_id, **history})
+
+        @self.app.get("/api/players/{server_id}/{auth_token}")
+        async def get_players(server_id: str, auth_token: str, server: Optional[str] = None):
+            """
+            Spielerzahlen im ganzen Netzwerk und pro Server (Server- oder Admin-Token).
+            server=Lobby-1 liefert zusätzlich die Spieler dieses Servers
+            """
+            self._authorize_server_or_admin(server_id, auth_token)
+            index = self.server_manager.player_index
+            response = {"total": index.count(), "servers": index.counts()}
+            if server:
+                response["players"] = [entry.to_dict() for entry in index.players_on(server)]
+            return JSONResponse(response)
+
+        @self.app.get("/api/players/{server_id}/{auth_token}/{player}")
+        async def find_player(server_id: str, auth_token: str, player: str):
+            """Sucht einen Spieler per Name oder UUID"""
+            self._authorize_server_or_admin(server_id, auth_token)
+            entry = self.server_manager.player_index.find(player)
+            if entry is None:
+                raise HTTPException(status_code=404, detail="Spieler nicht online")
+            return JSONResponse(entry.to_dict())
+
+        @self.app.post("/api/players/{server_id}/{auth_token}/lookup")
+        async def lookup_players(server_id: str, auth_token: str, request: Request):
+            """
+            Mehrere Spieler auf einmal suchen.
+            POST Body: {"players": ["Steve", "<uuid>"]} -> {"players": {"Steve": {...} | null}}
+            """
+            self._authorize_server_or_admin(server_id, auth_token)
+            try:
+                data = await request.json()
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
+            players = data.get("players") if isinstance(data, dict) else None
+            if not isinstance(players, list) or not all(isinstance(p, str) for p in players):
+                raise HTTPException(status_code=400, detail="Fehlender Parameter: 'players' (Liste)")
+            if len(players) > MAX_PLAYER_LOOKUP:
+                raise HTTPException(status_code=413, detail=f"Maximal {MAX_PLAYER_LOOKUP} Spieler pro Anfrage")
+
+            index = self.server_manager.player_index
+            found = {}
+            for player in players:
+                entry = index.find(player)
+                found[player] = entry.to_dict() if entry else None
+            return JSONResponse({"players": found})
+
+        @self.app.post("/api/select/{server_id}/{auth_token}")
+        async def select_server(server_id: str, auth_token: str, request: Request):
+            """
+            Wählt einen Zielserver für einen Spieler (Server- oder Admin-Token).
+            POST Body: {"server_type": "Lobby", "strategy": "least_players", "reserve": true}
+            strategy = least_players | best_tps | fill_first | weighted
+            """
+            self._authorize_server_or_admin(server_id, auth_token)
+            try:
+                data = await request.json()
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
+            if not isinstance(data, dict) or not data.get("server_type"):
+                raise HTTPException(status_code=400, detail="Fehlender Parameter: 'server_type'")
+
+            selector = self.server_manager.selector
+            try:
+                server = selector.select(str(data["server_type"]), data.get("strategy") or "least_players",
+                                         bool(data.get("reserve", True)))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if server is None:
+                raise HTTPException(status_code=503, detail="Kein freier Server verfügbar")
+
+            return JSONResponse({
                 "server_id": server.server_id,
                 "name": server.name,
                 "ip": server.ip,
                 "port": server.port,
-                "server_type": server.server_type,
-                "software": server.software.value,
-                "software_version": server.software_version,
-                "server_state": server.server_state.value,
-                "is_running": server.is_running,
-                "start_time": server.start_time.isoformat() if server.start_time else None,
-                "tps": server.tps,
-                "cpu_usage": server.cpu_usage,
-                "ram_usage_mb": server.ram_usage_mb,
-                "players_online": server.players_online,
+                "players": len(server.players_online),
                 "max_players": server.max_players,
-                "plugins": server.plugins,
-                "uptime": server.get_uptime(),
-                "java_memory": server.java_memory,
-                "connected": server.server_id in self.clients,
-                "last_output_lines": server.last_output_lines
-            }
+                "reserved": selector.reserved(server.server_id),
+            })
+
+        @self.app.post("/api/server/{server_id}/command/{auth_token}")
+        async def command_endpoint(server_id: str, auth_token: str, request: Request):
+            """
+            Führt einen Konsolenbefehl per RPC aus (Admin-Token).
+            POST Body: {"command": "list", "timeout": 5}
+            """
+            if not secrets.compare_digest(self.admin_token, auth_token):
+                raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
+            if not self.server_manager.get_server_by_id(server_id):
+                raise HTTPException(status_code=404, detail="Server nicht gefunden")
+
+            try:
+                data = await request.json()
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
+            if not isinstance(data, dict):
+                raise HTTPException(status_code=400, detail="JSON-Objekt erwartet")
+            command = data.get("command")
+            if not command or not isinstance(command, str):
+                raise HTTPException(status_code=400, detail="Fehlender Parameter: 'command'")
+            timeout = data.get("timeout")
+            if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+                                        or not 0 < timeout < math.inf):
+                raise HTTPException(status_code=400, detail="'timeout' muss eine positive Zahl sein")
+
+            try:
+                output = await self.execute_command_async(server_id, command, timeout)
+            except RpcTimeout as e:
+                raise HTTPException(status_code=504, detail=str(e))
+            except RpcError as e:
+                raise HTTPException(status_code=502, detail=str(e))
+
+            return JSONResponse({"status": "success", "command": command, "output": output})
+
+        @self.app.get("/api/console/{server_id}/{auth_token}")
+        async def console_endpoint(server_id: str, auth_token: str, pattern: Optional[str] = None,
+                                   level: Optional[str] = None, backlog: int = 50, follow: bool = True):
+            """
+            Konsole eines Servers live als Server-Sent Events (Admin-Token).
+            pattern=<Regex>  level=WARN (Mindest-Level)  backlog=50 (letzte Zeilen vorab)  follow=false (nur Verlauf)
+            """
+            if not secrets.compare_digest(self.admin_token, auth_token):
+                raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
+            server = self.server_manager.get_server_by_id(server_id)
+            if not server:
+                raise HTTPException(status_code=404, detail="Server nicht gefunden")
+            try:
+                log_filter = LogFilter(pattern, level)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            hub = self.server_manager.console
+            history = await asyncio.to_thread(hub.backlog_for, server, log_filter, backlog) if backlog > 0 else []
+            if not follow:
+                return JSONResponse({"server_id": server_id, "lines": history})
+
+            loop = asyncio.get_running_loop()
+            lines: asyncio.Queue = asyncio.Queue(maxsize=CONSOLE_QUEUE_SIZE)
 
-            return JSONResponse(server_info)
+            def offer(line: str):
+                if lines.full():
+                    lines.get_nowait()  # Langsamer Client: älteste Zeile verwerfen
+                lines.put_nowait(line)
+
+            try:
+                subscription = hub.subscribe(server, lambda line: loop.call_soon_threadsafe(offer, line), log_filter)
+            except RuntimeError as e:
+                raise HTTPException(status_code=429, detail=str(e))
+
+            async def stream():
+                try:
+                    for line in history:
+                        yield f"data: {line}\n\n"
+                    while True:
+                        try:
+                            line = await asyncio.wait_for(lines.get(), CONSOLE_KEEPALIVE)
+                        except asyncio.TimeoutError:
+                            yield ": keepalive\n\n"
+                            continue
+                        yield f"data: {line}\n\n"
+                finally:
+                    hub.unsubscribe(subscription)
+
+            return StreamingResponse(stream(), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
         @self.app.post("/api/plugin/{server_id}/{auth_token}")
         async def plugin_endpoint(server_id: str, auth_token: str, request: Request):
@@ -414,6 +1287,8 @@ class APIManager:
             if not expected_token or not secrets.compare_digest(expected_token, auth_token):
                 raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
 
+            self._enforce_rate_limit(server_id, "plugin")
+
             data = await request.json()  # JSON-Daten vom Plugin
             player_name = data.get("playerName")
             player_uuid = data.get("uuid")
@@ -442,64 +1317,13 @@ class APIManager:
             if not expected_token or not secrets.compare_digest(expected_token, auth_token):
                 raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
 
+            self._enforce_rate_limit(server_id, "storage")
+
             try:
                 data = await request.json()
-                action = data.get("action")
-                key = data.get("key")
-
-                if not action or not key:
-                    raise HTTPException(status_code=400,
-                                        detail="Fehlende Parameter: 'action' und 'key' sind erforderlich")
-
-                # Präfix für Server-spezifische Schlüssel
-                storage_key = f"server:{server_id}:{key}"
-
-                if action == "store":
-                    storage_data = data.get("data")
-                    if storage_data is None:
-                        raise HTTPException(status_code=400,
-                                            detail="Fehlender Parameter: 'data' ist für action='store' erforderlich")
-
-                    # Daten speichern
-                    self.storage_manager.store_data(storage_key, storage_data)
-                    pDebug(f"[Storage] Server {server_id} hat Daten unter Schlüssel '{key}' gespeichert")
-
-                    return JSONResponse({
-                        "status": "success",
-                        "action": "store",
-                        "key": key,
-                        "message": "Daten erfolgreich gespeichert"
-                    })
-
-                elif action == "get":
-                    # Daten abrufen
-                    stored_data = self.storage_manager.get_data(storage_key)
-                    pDebug(f"[Storage] Server {server_id} hat Daten unter Schlüssel '{key}' abgerufen")
-
-                    return JSONResponse({
-                        "status": "success",
-                        "action": "get",
-                        "key": key,
-                        "data": stored_data
-                    })
-
-                elif action == "delete":
-                    # Daten durch None überschreiben (löschen)
-                    self.storage_manager.store_data(storage_key, None)
-                    message = "Daten erfolgreich gelöscht"
-
-                    pDebug(f"[Storage] Server {server_id} hat Daten unter Schlüssel '{key}' gelöscht")
-
-                    return JSONResponse({
-                        "status": "success",
-                        "action": "delete",
-                        "key": key,
-                        "message": message
-                    })
-
-                else:
-                    raise HTTPException(status_code=400, detail="Ungültige action. Erlaubt: 'store', 'get', 'delete'")
-
+                return JSONResponse(self.data_ops.storage(server_id, data))
+            except DataRequestError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail)
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
             except Exception as e:
@@ -512,57 +1336,74 @@ class APIManager:
             if not expected_token or not secrets.compare_digest(expected_token, auth_token):
                 raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
 
-            data = await request.json()
-            player_name = data.get("playerName")
-            player_uuid = data.get("uuid")
-            action = data.get("action")
-            forced = data.get("forced", False)
-            now = datetime.now()
+            self._enforce_rate_limit(server_id, "logs")
 
-            if not player_name or action not in ("join", "leave"):
-                raise HTTPException(status_code=400, detail="Ungültige Log-Daten")
+            try:
+                data = await request.json()
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
+            if not isinstance(data, dict):
+                raise HTTPException(status_code=400, detail="JSON-Objekt erwartet")
+            try:
+                return JSONResponse(self.data_ops.log_event(server_id, data))
+            except DataRequestError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-            logs_key = f"logs:{server_id}:{player_name}:{player_uuid}"
-            logs = self.storage_manager.get_data(logs_key) or {
-                "player": player_name,
-                "uuid": player_uuid,
-                "server_id": server_id,
-                "sessions": [],
-                "total_playtime_seconds": 0,
-                "last_join": None
+        @self.app.post("/api/logs/batch/{server_id}/{auth_token}")
+        async def log_batch_endpoint(server_id: str, auth_token: str, request: Request):
+            """
+            Mehrere Join/Leave-Events in einem Aufruf (z.B. nach Neustart oder Lobby-Wechseln)
+
+            POST Body Format:
+            {
+                "events": [
+                    {"playerName": "Steve", "uuid": "...", "action": "join" | "leave",
+                     "forced": false, "timestamp": "2025-01-01T12:00:00"},
+                    ...
+                ]
             }
+            """
+            expected_token = self.auth_tokens.get(server_id)
+            if not expected_token or not secrets.compare_digest(expected_token, auth_token):
+                raise HTTPException(status_code=401, detail="Auth fehlgeschlagen")
 
-            if action == "join":
-                logs["last_join"] = now.isoformat()
-                pInfo(f"[Logs] Spieler {player_name} ist dem Server {server_id} beigetreten")
+            self._enforce_rate_limit(server_id, "logs")
 
-            elif action == "leave":
-                join_time = logs.get("last_join")
-                if join_time:
-                    try:
-                        join_dt = datetime.fromisoformat(join_time)
-                        session_seconds = int((now - join_dt).total_seconds())
-                        logs["total_playtime_seconds"] += session_seconds
-                        logs["sessions"].append({
-                            "join": join_dt.isoformat(),
-                            "leave": now.isoformat(),
-                            "forced": forced,
-                            "duration_seconds": session_seconds
-                        })
-                    except Exception as e:
-                        pWarning(f"Konnte Session-Dauer nicht berechnen für {player_name}: {e}")
-                logs["last_join"] = None
-                pInfo(f"[Logs] Spieler {player_name} hat den Server {server_id} verlassen (forced={forced})")
-
-            self.storage_manager.store_data(logs_key, logs)
-
-            return JSONResponse({"status": "success", "logs": logs})
+            try:
+                data = await request.json()
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="Ungültiges JSON Format")
+            if not isinstance(data, dict):
+                raise HTTPException(status_code=400, detail="JSON-Objekt erwartet")
+            try:
+                return JSONResponse(self.data_ops.log_batch(server_id, data))
+            except DataRequestError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    async def send_payload(self, server_id: str, payload: Dict[str, Any]):
+        """Sendet ein JSON-Objekt über die Verbindung des Servers (WebSocket, anderer Worker oder Redis)"""
+        if self.communication_type == "websocket":
+            text = json.dumps(payload)
+            if self._enqueue(server_id, text):
+                return
+            routed = {"message": text}
+            if payload.get("type") == "rpc_request":
+                routed.update(rpc_id=payload["id"], rpc_reply_to=self.worker_id,
+                              rpc_timeout=self.rpc.remaining(payload["id"]))
+            if self.fleet_state and await self.fleet_state.route(server_id, routed):
+                return
+            raise HTTPException(status_code=404, detail=f"Client '{server_id}' nicht verbunden.")
+        else:  # Redis
+            if not self.redis:
+                await self.init_redis()
+            await self.redis.publish(f"echocloud:{server_id}", json.dumps({"server_id": server_id, **payload}))
 
     async def send_message(self, server_id: str, message: str):
         if self.communication_type == "websocket":
-            websocket = self.clients.get(server_id)
-            if websocket:
-                await websocket.send_text(message)
+            if self._enqueue(server_id, message):
+                pass
+            elif self.fleet_state and await self.fleet_state.route(server_id, {"message": message}):
+                pDebug("Nachricht an %s über Worker weitergeleitet", server_id)
             else:
                 raise HTTPException(status_code=404, detail=f"Client '{server_id}' nicht verbunden.")
         else:  # Redis
@@ -578,8 +1419,15 @@ class APIManager:
     def _run_loop(self):
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        self.loop = loop
 
         async def cleanup_and_exit():
+            await self.stop_background_tasks()
+
+            if self.redis_data:
+                await self.redis_data.stop()
+                self.redis_data = None
+
             if self.redis_task:
                 self.redis_task.cancel()
                 try:
@@ -634,8 +1482,44 @@ class APIManager:
                     pWarning(f"Fehler beim Cleanup: {e}")
             loop.close()
 
+    def _run_worker_pool(self):
+        """Startet N uvicorn-Worker als Unterprozess und spiegelt deren Zustand in diesen Prozess"""
+        command = [sys.executable, "-m", "uvicorn", "api.workers:create_worker_app", "--factory",
+                   "--host", str(self.host), "--port", str(self.port),
+                   "--workers", str(self.api_workers), "--log-level", "warning"]
+        if self.use_https:
+            command += ["--ssl-certfile", str(self.cert_file_path), "--ssl-keyfile", str(self.key_file_path)]
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+
+        async def mirror():
+            await self.init_fleet_state()
+            reader = asyncio.create_task(self.fleet_state_reader())
+            persist = asyncio.create_task(self.metrics_persist_loop())
+            while not self.should_stop:
+                if self.worker_process.poll() is not None:
+                    pError(f"API Worker beendet (Exit-Code {self.worker_process.returncode})")
+                    break
+                await asyncio.sleep(0.5)
+            reader.cancel()
+            persist.cancel()
+            await asyncio.gather(reader, persist, return_exceptions=True)
+            await self.fleet_redis.close()
+
+        try:
+            self.worker_process = subprocess.Popen(command)
+            pInfo(f"Cloud Manager API [green]Online[/green] mit {self.api_workers} Workern ✓")
+            loop.run_until_complete(mirror())
+        except Exception as e:
+            pError(f"Fehler im API Worker-Pool: {e}")
+        finally:
+            loop.close()
+
     def start_in_thread(self):
-        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        target = self._run_worker_pool if self.multi_worker and not self.worker_mode else self._run_loop
+        self.thread = threading.Thread(target=target, daemon=True)
         self.thread.start()
 
     def stop_thread(self):
@@ -648,6 +1532,13 @@ class APIManager:
             if hasattr(self, "server") and self.server:
                 self.server.should_exit = True
 
+        if self.worker_process and self.worker_process.poll() is None:
+            self.worker_process.terminate()
+            try:
+                self.worker_process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.worker_process.kill()
+
         # Wait for thread to finish with timeout
         if hasattr(self, "thread") and self.thread:
             self.thread.join(timeout=5.0)
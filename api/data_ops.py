@@ -0,0 +1,290 @@
+import copy
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core import telemetry
+from core.player_index import PlayerIndex
+from core.console import pInfo, pDebug, pWarning, pError
+from utils.ratelimit import StorageQuota
+from utils.storagemanager import StorageManager
+
+# Maximale Anzahl Join/Leave-Events pro Batch
+MAX_LOG_BATCH = 1000
+
+
+class DataRequestError(Exception):
+    """Fehlerhafte Storage-/Log-Anfrage. status_code entspricht dem HTTP-Status"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code: int = status_code
+        self.detail: str = detail
+
+
+class _DirectStore:
+    """Liest und schreibt sofort über den StorageManager (HTTP-Endpoints)"""
+
+    def __init__(self, storage_manager: StorageManager):
+        self.storage_manager = storage_manager
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.storage_manager.get_data(key)
+
+    def put(self, key: str, value: Any):
+        if not self.storage_manager.store_data(key, value):
+            raise DataRequestError(500, "Daten konnten nicht gespeichert werden")
+
+
+class _BatchStore:
+    """Sammelt die Schreibzugriffe eines Batches und schreibt sie mit einem Commit"""
+
+    def __init__(self, storage_manager: StorageManager):
+        self.storage_manager = storage_manager
+        self.values: Dict[str, Any] = {}
+        self.pending: Dict[str, Any] = {}
+        self.writes: int = 0
+
+    def prefetch(self, keys: List[str]):
+        missing = [key for key in dict.fromkeys(keys) if key not in self.values]
+        if missing:
+            self.values.update(self.storage_manager.get_many(missing))
+
+    def get(self, key: str) -> Optional[Any]:
+        if key not in self.values:
+            self.values[key] = self.storage_manager.get_data(key)
+        # Kopie, damit spätere Anfragen im Batch bereits gebaute Antworten nicht verändern
+        return copy.deepcopy(self.values[key])
+
+    def put(self, key: str, value: Any):
+        self.values[key] = value
+        self.pending[key] = value
+        self.writes += 1
+
+    def flush(self) -> bool:
+        pending, self.pending = self.pending, {}
+        return self.storage_manager.store_many(pending)
+
+
+def log_key(server_id: str, player_name: str, player_uuid: Optional[str]) -> str:
+    return f"logs:{server_id}:{player_name}:{player_uuid}"
+
+
+class DataOperations:
+    """
+    Storage- und Log-Operationen der Plugins, unabhängig vom Transport.
+    Die HTTP-Endpoints rufen sie direkt auf, im Redis-Modus werden sie gebündelt über execute_batch() ausgeführt.
+    """
+
+    def __init__(self, storage_manager: StorageManager, storage_quota: StorageQuota,
+                 player_index: Optional[PlayerIndex] = None):
+        self.storage_manager: StorageManager = storage_manager
+        self.storage_quota: StorageQuota = storage_quota
+        self.player_index: Optional[PlayerIndex] = player_index
+        self.handlers: Dict[str, Callable[[str, Dict[str, Any], Any], Dict[str, Any]]] = {
+            "storage": self.storage,
+            "logs": self.log_event,
+            "logs_batch": self.log_batch,
+        }
+
+    def storage(self, server_id: str, data: Dict[str, Any], store=None) -> Dict[str, Any]:
+        """action = store | get | delete unter dem Namespace server:{id}:"""
+        store = store or _DirectStore(self.storage_manager)
+        action = data.get("action")
+        key = data.get("key")
+
+        if not action or not key:
+            raise DataRequestError(400, "Fehlende Parameter: 'action' und 'key' sind erforderlich")
+
+        # Präfix für Server-spezifische Schlüssel
+        storage_key = f"server:{server_id}:{key}"
+
+        if action == "store":
+            storage_data = data.get("data")
+            if storage_data is None:
+                raise DataRequestError(400, "Fehlender Parameter: 'data' ist für action='store' erforderlich")
+
+            self._store_with_quota(server_id, storage_key, storage_data, store)
+            pDebug("[Storage] Server %s hat Daten unter Schlüssel '%s' gespeichert", server_id, key)
+            return {"status": "success", "action": "store", "key": key, "message": "Daten erfolgreich gespeichert"}
+
+        elif action == "get":
+            stored_data = store.get(storage_key)
+            pDebug("[Storage] Server %s hat Daten unter Schlüssel '%s' abgerufen", server_id, key)
+            return {"status": "success", "action": "get", "key": key, "data": stored_data}
+
+        elif action == "delete":
+            # Daten durch None überschreiben (löschen)
+            self._store_with_quota(server_id, storage_key, None, store)
+            pDebug("[Storage] Server %s hat Daten unter Schlüssel '%s' gelöscht", server_id, key)
+            return {"status": "success", "action": "delete", "key": key, "message": "Daten erfolgreich gelöscht"}
+
+        raise DataRequestError(400, "Ungültige action. Erlaubt: 'store', 'get', 'delete'")
+
+    def log_event(self, server_id: str, data: Dict[str, Any], store=None) -> Dict[str, Any]:
+        """Einzelnes Join/Leave-Event eines Spielers"""
+        store = store or _DirectStore(self.storage_manager)
+        player_name = data.get("playerName")
+        player_uuid = data.get("uuid")
+        action = data.get("action")
+        forced = data.get("forced", False)
+
+        if not player_name or action not in ("join", "leave"):
+            raise DataRequestError(400, "Ungültige Log-Daten")
+
+        logs_key = log_key(server_id, player_name, player_uuid)
+        logs = store.get(logs_key) or self._new_player_log(server_id, player_name, player_uuid)
+
+        now = datetime.now()
+        self._apply_log_event(logs, action, now, forced)
+        self._index_event(server_id, player_name, player_uuid, action, now)
+        if action == "join":
+            pInfo("[Logs] Spieler %s ist dem Server %s beigetreten", player_name, server_id)
+        else:
+            pInfo("[Logs] Spieler %s hat den Server %s verlassen (forced=%s)", player_name, server_id, forced)
+
+        store.put(logs_key, logs)
+        return {"status": "success", "logs": logs}
+
+    def log_batch(self, server_id: str, data: Dict[str, Any], store=None) -> Dict[str, Any]:
+        """Mehrere Join/Leave-Events, pro Spieler ein Lese- und ein Schreibzugriff"""
+        store = store or _DirectStore(self.storage_manager)
+        events = data.get("events")
+        if not isinstance(events, list) or not events:
+            raise DataRequestError(400, "Fehlender Parameter: 'events' (Liste)")
+        if len(events) > MAX_LOG_BATCH:
+            raise DataRequestError(413, f"Maximal {MAX_LOG_BATCH} Events pro Batch")
+
+        # Nach Spieler gruppieren -> pro Spieler ein Lesezugriff und ein Schreibzugriff
+        now = datetime.now()
+        groups: Dict[tuple, List[tuple]] = {}
+        rejected = 0
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                rejected += 1
+                continue
+            player_name = event.get("playerName")
+            action = event.get("action")
+            if not player_name or action not in ("join", "leave"):
+                rejected += 1
+                continue
+            when = now
+            if event.get("timestamp"):
+                try:
+                    when = datetime.fromisoformat(str(event["timestamp"]).replace('Z', '+00:00'))
+                    if when.tzinfo:
+                        when = when.astimezone().replace(tzinfo=None)
+                except ValueError:
+                    rejected += 1
+                    continue
+            groups.setdefault((player_name, event.get("uuid")), []).append(
+                (when, index, action, bool(event.get("forced", False))))
+
+        if isinstance(store, _BatchStore):
+            store.prefetch([log_key(server_id, name, uuid) for name, uuid in groups])
+
+        for (player_name, player_uuid), player_events in groups.items():
+            player_events.sort()  # Client-Zeitstempel, bei Gleichstand Reihenfolge im Batch
+            logs_key = log_key(server_id, player_name, player_uuid)
+            logs = store.get(logs_key) or self._new_player_log(server_id, player_name, player_uuid)
+            for when, _, action, forced in player_events:
+                self._apply_log_event(logs, action, when, forced)
+            store.put(logs_key, logs)
+            # Für den Index zählt nur der letzte Stand des Spielers
+            when, _, action, _ = player_events[-1]
+            self._index_event(server_id, player_name, player_uuid, action, when)
+
+        applied = len(events) - rejected
+        pInfo(f"[Logs] {applied} Events für {len(groups)} Spieler von {server_id} verarbeitet")
+        return {"status": "success", "applied": applied, "rejected": rejected, "players": len(groups)}
+
+    def execute_batch(self, requests: List[Tuple[str, str, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Führt (operation, server_id, data) der Reihe nach aus. Lesezugriffe werden gebündelt vorgeladen,
+        alle Schreibzugriffe landen in einem einzigen Commit. Gibt (Status, Antwort) pro Anfrage zurück.
+        """
+        store = _BatchStore(self.storage_manager)
+        store.prefetch([log_key(server_id, data.get("playerName"), data.get("uuid"))
+                        for operation, server_id, data in requests
+                        if operation == "logs" and data.get("playerName")])
+
+        results: List[Tuple[int, Dict[str, Any]]] = []
+        writers: List[int] = []
+        namespaces: Set[str] = set()
+        for index, (operation, server_id, data) in enumerate(requests):
+            handler = self.handlers.get(operation)
+            writes_before = store.writes
+            try:
+                if handler is None:
+                    raise DataRequestError(400, f"Unbekannte Operation '{operation}'")
+                results.append((200, handler(server_id, data, store)))
+            except DataRequestError as e:
+                results.append((e.status_code, {"status": "error", "detail": e.detail}))
+            except Exception as e:
+                pError(f"Fehler bei '{operation}' für Server {server_id}: {e}")
+                results.append((500, {"status": "error", "detail": f"Interner Serverfehler: {str(e)}"}))
+            if store.writes != writes_before:
+                writers.append(index)
+                namespaces.add(f"server:{server_id}:")
+
+        if not store.flush():
+            pWarning(f"Batch mit {len(writers)} Schreibzugriffen konnte nicht gespeichert werden")
+            for index in writers:
+                results[index] = (500, {"status": "error", "detail": "Daten konnten nicht gespeichert werden"})
+            for namespace in namespaces:
+                self.storage_quota.invalidate(namespace)
+        return results
+
+    def _store_with_quota(self, server_id: str, storage_key: str, storage_data: Any, store):
+        """Speichert unter server:{id}: und pflegt die belegte Größe des Namespace"""
+        namespace = f"server:{server_id}:"
+        size = len(json.dumps(storage_data, ensure_ascii=False).encode("utf-8"))
+        if self.storage_quota.would_exceed(namespace, storage_key, size):
+            telemetry.STORAGE_QUOTA_REJECTED.inc(server_id=server_id)
+            raise DataRequestError(413, f"Speicher-Quota von {self.storage_quota.quota_bytes} Bytes überschritten")
+        store.put(storage_key, storage_data)
+        self.storage_quota.record(namespace, storage_key, size)
+        telemetry.STORAGE_NAMESPACE_BYTES.set(self.storage_quota.usage(namespace), server_id=server_id)
+
+    @staticmethod
+    def _new_player_log(server_id: str, player_name: str, player_uuid: Optional[str]) -> Dict[str, Any]:
+        return {
+            "player": player_name,
+            "uuid": player_uuid,
+            "server_id": server_id,
+            "sessions": [],
+            "total_playtime_seconds": 0,
+            "last_join": None
+        }
+
+    def _index_event(self, server_id: str, player_name: str, player_uuid: Optional[str], action: str,
+                     when: datetime):
+        if self.player_index is None:
+            return
+        if action == "join":
+            self.player_index.join(server_id, player_name, player_uuid, when)
+        else:
+            self.player_index.leave(server_id, player_name)
+
+    @staticmethod
+    def _apply_log_event(logs: Dict[str, Any], action: str, when: datetime, forced: bool = False):
+        """Wendet ein Join/Leave-Event auf den Log-Eintrag eines Spielers an"""
+        if action == "join":
+            logs["last_join"] = when.isoformat()
+            return
+
+        join_time = logs.get("last_join")
+        if join_time:
+            try:
+                join_dt = datetime.fromisoformat(join_time)
+                session_seconds = max(0, int((when - join_dt).total_seconds()))
+                logs["total_playtime_seconds"] += session_seconds
+                logs["sessions"].append({
+                    "join": join_dt.isoformat(),
+                    "leave": when.isoformat(),
+                    "forced": forced,
+                    "duration_seconds": session_seconds
+                })
+            except Exception as e:
+                pWarning(f"Konnte Session-Dauer nicht berechnen für {logs.get('player')}: {e}")
+        logs["last_join"] = None
@@ -0,0 +1,77 @@
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from core.server_manager import Server, ServerState
+
+# Unterhalb dieser TPS gilt ein Server als belastet und wird öfter abgefragt
+DEGRADED_TPS: float = 18.0
+
+
+class HeartbeatScheduler:
+    """
+    Plant Heartbeat-Requests pro Server nach ihrer nächsten Fälligkeit (Min-Heap).
+    Beim Verschieben bleibt der alte Heap-Eintrag liegen und wird beim Entnehmen als veraltet verworfen.
+    Nicht thread-safe: nur aus dem Event-Loop der API verwenden.
+    """
+
+    def __init__(self, base_interval: float = 10.0, min_interval: float = 2.0, max_interval: float = 30.0):
+        self.min_interval: float = max(0.5, min_interval)
+        self.max_interval: float = max(self.min_interval, max_interval)
+        self.base_interval: float = min(max(base_interval, self.min_interval), self.max_interval)
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due: Dict[str, float] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, server_id: str) -> bool:
+        return server_id in self._due
+
+    def interval_for(self, server: Server) -> float:
+        """Schnell bei Statuswechseln und niedriger TPS, langsam bei leeren Servern"""
+        if server.server_state in (ServerState.STARTING, ServerState.STOPPING):
+            interval = self.min_interval
+        elif server.tps is not None and server.is_running and server.tps < DEGRADED_TPS:
+            interval = self.base_interval / 2
+        elif not server.is_running or not server.players_online:
+            interval = self.max_interval
+        else:
+            interval = self.base_interval
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def schedule(self, server_id: str, due: float) -> bool:
+        """Setzt die nächste Fälligkeit. True, wenn sie früher liegt als alles bisher Geplante"""
+        if self._due.get(server_id) == due:
+            return False
+        earliest = self.next_due()
+        self._due[server_id] = due
+        heapq.heappush(self._heap, (due, next(self._counter), server_id))
+        return earliest is None or due < earliest
+
+    def due_in(self, server_id: str, now: float) -> float:
+        """Sekunden bis zum nächsten geplanten Heartbeat (0, wenn keiner geplant ist)"""
+        due = self._due.get(server_id)
+        return max(0.0, due - now) if due is not None else 0.0
+
+    def remove(self, server_id: str):
+        self._due.pop(server_id, None)
+
+    def next_due(self) -> Optional[float]:
+        """Früheste gültige Fälligkeit (veraltete Einträge an der Spitze werden dabei entfernt)"""
+        heap = self._heap
+        while heap and self._due.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: float) -> List[str]:
+        """Entnimmt alle Server, deren Heartbeat fällig ist. Sie müssen danach neu eingeplant werden"""
+        due_servers: List[str] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            due, _, server_id = heapq.heappop(heap)
+            if self._due.get(server_id) == due:
+                del self._due[server_id]
+                due_servers.append(server_id)
+        return due_servers
@@ -0,0 +1,175 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from core.server_manager import ServerState
+
+# Einmalig statt [s.value for s in ServerState] pro Nachricht
+STATES_BY_VALUE: Dict[str, ServerState] = {state.value: state for state in ServerState}
+
+
+class MessageError(ValueError):
+    """Nachricht ist kein gültiges JSON-Objekt oder passt nicht zum Schema ihres Typs"""
+
+
+def _optional_float(data: Dict[str, Any], key: str) -> Optional[float]:
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise MessageError(f"'{key}' muss eine Zahl sein")
+    return float(value)
+
+
+def _optional_str(data: Dict[str, Any], key: str) -> Optional[str]:
+    value = data.get(key)
+    if value is not None and not isinstance(value, str):
+        raise MessageError(f"'{key}' muss ein String sein")
+    return value
+
+
+@dataclass
+class HeartbeatResponse:
+    type = "heartbeat_response"
+    server_state: Optional[ServerState]  # None bei fehlendem oder unbekanntem Status -> is_running entscheidet
+    is_running: bool
+    start_time: Optional[str]
+    tps: Optional[float]
+    cpu_usage: Optional[float]
+    ram_usage_mb: Optional[float]
+    players_online: List[str]
+    max_players: int
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HeartbeatResponse':
+        players = data.get("players_online") or []
+        if not isinstance(players, list) or not all(isinstance(p, str) for p in players):
+            raise MessageError("'players_online' muss eine Liste von Namen sein")
+        max_players = data.get("max_players") or 0
+        if isinstance(max_players, bool) or not isinstance(max_players, int):
+            raise MessageError("'max_players' muss eine Ganzzahl sein")
+        state = data.get("server_state")
+        return cls(
+            server_state=STATES_BY_VALUE.get(state) if isinstance(state, str) else None,
+            is_running=bool(data.get("is_running", False)),
+            start_time=_optional_str(data, "start_time"),
+            tps=_optional_float(data, "tps"),
+            cpu_usage=_optional_float(data, "cpu_usage"),
+            ram_usage_mb=_optional_float(data, "ram_usage_mb"),
+            players_online=players,
+            max_players=max_players,
+        )
+
+
+@dataclass
+class ShutdownNotification:
+    type = "shutdown_notification"
+    reason: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ShutdownNotification':
+        return cls(reason=_optional_str(data, "reason"))
+
+
+@dataclass
+class RpcResponse:
+    type = "rpc_response"
+    id: str
+    result: Any = None
+    error: Any = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RpcResponse':
+        request_id = data.get("id")
+        if not isinstance(request_id, str) or not request_id:
+            raise MessageError("'id' fehlt")
+        return cls(id=request_id, result=data.get("result"), error=data.get("error"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "id": self.id, "result": self.result, "error": self.error}
+
+
+@dataclass
+class DataRequest:
+    """storage_request, log_request oder log_batch_request (Body wie bei den HTTP-Endpoints)"""
+    type: str
+    data: Dict[str, Any]
+    auth_token: str = ""
+    request_id: Optional[str] = None
+    reply_to: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DataRequest':
+        body = data.get("data") or {}
+        if not isinstance(body, dict):
+            raise MessageError("'data' muss ein Objekt sein")
+        request_id = data.get("request_id")
+        return cls(type=data["type"], data=body,
+                   auth_token=str(data.get("auth_token") or ""),
+                   request_id=str(request_id) if request_id is not None else None,
+                   reply_to=_optional_str(data, "reply_to"))
+
+
+@dataclass
+class UnknownMessage:
+    """Nachricht mit unbekanntem Typ, wird nur protokolliert"""
+    type: Optional[str]
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+Message = Union[HeartbeatResponse, ShutdownNotification, RpcResponse, DataRequest, UnknownMessage]
+
+# Nachrichtentyp -> Schema
+MESSAGE_TYPES: Dict[str, Type] = {
+    HeartbeatResponse.type: HeartbeatResponse,
+    ShutdownNotification.type: ShutdownNotification,
+    RpcResponse.type: RpcResponse,
+    "storage_request": DataRequest,
+    "log_request": DataRequest,
+    "log_batch_request": DataRequest,
+}
+
+
+def decode(raw: Union[str, bytes, Dict[str, Any]]) -> Tuple[Message, Dict[str, Any]]:
+    """Parst und validiert eine Nachricht. Gibt (typisierte Nachricht, Rohdaten) zurück"""
+    if isinstance(raw, dict):
+        data = raw
+    else:
+        try:
+            data = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise MessageError(f"Ungültiges JSON: {e}")
+    if not isinstance(data, dict):
+        raise MessageError("Nachricht muss ein JSON-Objekt sein")
+
+    message_type = data.get("type")
+    schema = MESSAGE_TYPES.get(message_type) if isinstance(message_type, str) else None
+    if schema is None:
+        return UnknownMessage(type=message_type if isinstance(message_type, str) else None, data=data), data
+    return schema.from_dict(data), data
+
+
+Handler = Callable[[str, Any], Union[None, Awaitable[None]]]
+
+
+class MessageDispatcher:
+    """Eine Tabelle Schema -> Handler(server_id, message) für WebSocket und Redis"""
+
+    def __init__(self):
+        self._handlers: Dict[Type, Tuple[Handler, bool]] = {}
+
+    def register(self, schema: Type, handler: Handler):
+        self._handlers[schema] = (handler, asyncio.iscoroutinefunction(handler))
+
+    async def dispatch(self, server_id: str, message: Message) -> bool:
+        """False, wenn für den Nachrichtentyp kein Handler registriert ist"""
+        entry = self._handlers.get(type(message))
+        if entry is None:
+            return False
+        handler, is_async = entry
+        if is_async:
+            await handler(server_id, message)
+        else:
+            handler(server_id, message)
+        return True
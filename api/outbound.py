@@ -0,0 +1,129 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+from core import telemetry
+from core.console import pWarning
+
+
+class _Outgoing:
+    __slots__ = ("text", "coalesce_key", "enqueued_at")
+
+    def __init__(self, text: str, coalesce_key: Optional[str], enqueued_at: float):
+        self.text: str = text
+        self.coalesce_key: Optional[str] = coalesce_key
+        self.enqueued_at: float = enqueued_at
+
+
+class ClientSender:
+    """
+    Eigener Sende-Task pro verbundenem Server mit begrenzter Warteschlange.
+    Nachrichten mit gleichem coalesce_key ersetzen sich gegenseitig (z.B. Heartbeat-Requests),
+    Clients mit voller Warteschlange oder zu hoher Wartezeit werden getrennt.
+    """
+
+    def __init__(self,
+                 server_id: str,
+                 websocket,
+                 max_queue: int = 256,
+                 max_lag: float = 30.0,
+                 send_timeout: float = 10.0,
+                 on_evict: Optional[Callable[[str, str], None]] = None):
+        self.server_id: str = server_id
+        self.websocket = websocket
+        self.max_queue: int = max_queue
+        self.max_lag: float = max_lag
+        self.send_timeout: float = send_timeout
+        self.on_evict = on_evict
+        self.queue: Deque[_Outgoing] = deque()
+        self._coalesced: Dict[str, _Outgoing] = {}
+        self._wakeup = asyncio.Event()
+        self.closed: bool = False
+        self.evicted: bool = False
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def send(self, text: str, coalesce_key: Optional[str] = None) -> bool:
+        """Reiht eine Nachricht ein. False, wenn der Client geschlossen oder getrennt wurde"""
+        if self.closed:
+            return False
+
+        now = time.monotonic()
+        if coalesce_key is not None:
+            queued = self._coalesced.get(coalesce_key)
+            if queued is not None:
+                # Ältere, noch nicht gesendete Nachricht wird durch die neue ersetzt
+                queued.text = text
+                telemetry.OUTBOUND_COALESCED.inc()
+                return True
+
+        if len(self.queue) >= self.max_queue:
+            self.evict(f"Warteschlange voll ({self.max_queue} Nachrichten)")
+            return False
+
+        entry = _Outgoing(text, coalesce_key, now)
+        self.queue.append(entry)
+        if coalesce_key is not None:
+            self._coalesced[coalesce_key] = entry
+        telemetry.OUTBOUND_QUEUE_DEPTH.set(len(self.queue), server_id=self.server_id)
+        self._wakeup.set()
+        return True
+
+    async def run(self):
+        try:
+            while not self.closed:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.queue and not self.closed:
+                    entry = self.queue.popleft()
+                    if entry.coalesce_key is not None:
+                        self._coalesced.pop(entry.coalesce_key, None)
+                    telemetry.OUTBOUND_QUEUE_DEPTH.set(len(self.queue), server_id=self.server_id)
+
+                    waited = time.monotonic() - entry.enqueued_at
+                    if waited > self.max_lag:
+                        self.evict(f"Nachricht wartete {waited:.1f}s in der Warteschlange")
+                        return
+                    try:
+                        await asyncio.wait_for(self.websocket.send_text(entry.text), self.send_timeout)
+                    except asyncio.TimeoutError:
+                        self.evict(f"Senden dauerte länger als {self.send_timeout}s")
+                        return
+                    except Exception as e:
+                        self.evict(f"Sendefehler: {e}")
+                        return
+                    telemetry.OUTBOUND_LATENCY_SECONDS.observe(time.monotonic() - entry.enqueued_at)
+        except asyncio.CancelledError:
+            pass
+
+    def evict(self, reason: str):
+        """Trennt einen Client, der mit dem Empfangen nicht hinterherkommt"""
+        if self.closed:
+            return
+        self.evicted = True
+        telemetry.OUTBOUND_EVICTIONS.inc()
+        pWarning(f"Server {self.server_id} wird getrennt: {reason}")
+        self.close()
+        asyncio.get_running_loop().create_task(self._close_socket())
+        if self.on_evict:
+            self.on_evict(self.server_id, reason)
+
+    async def _close_socket(self):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1013), self.send_timeout)
+        except Exception:
+            pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self._coalesced.clear()
+        self._wakeup.set()
+        telemetry.OUTBOUND_QUEUE_DEPTH.remove(server_id=self.server_id)
+        if self.task and self.task is not asyncio.current_task():
+            self.task.cancel()
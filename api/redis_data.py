@@ -0,0 +1,114 @@
+import asyncio
+import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from api.data_ops import DataOperations
+from api.messages import DataRequest
+from core import telemetry
+from core.console import pWarning, pDebug
+
+# Nachrichtentyp -> (Operation in DataOperations, Rate-Limit-Endpoint)
+REQUEST_TYPES: Dict[str, Tuple[str, str]] = {
+    "storage_request": ("storage", "storage"),
+    "log_request": ("logs", "logs"),
+    "log_batch_request": ("logs_batch", "logs"),
+}
+RESPONSE_TYPE = "data_response"
+
+
+class RedisDataService:
+    """
+    Beantwortet Storage- und Log-Anfragen, die im Redis-Modus über Pub/Sub eintreffen.
+
+    Anfragen eines Servers landen immer beim selben Worker (Reihenfolge bleibt erhalten, keine parallelen
+    Schreibzugriffe auf dieselben Schlüssel). Jeder Worker nimmt alle wartenden Anfragen (bis batch_size)
+    auf einmal, führt sie in einem Thread des Pools aus und veröffentlicht die Antworten in einer Pipeline.
+    """
+
+    def __init__(self, redis, operations: DataOperations, workers: int = 4, batch_size: int = 50,
+                 queue_size: int = 1000):
+        self.redis = redis
+        self.operations: DataOperations = operations
+        self.workers: int = max(1, workers)
+        self.batch_size: int = max(1, batch_size)
+        self.queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in range(self.workers)]
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="echocloud-data")
+        loop = asyncio.get_running_loop()
+        self.tasks = [loop.create_task(self._worker(queue)) for queue in self.queues]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        for task in self.tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self.tasks.clear()
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    @staticmethod
+    def reply_channel(server_id: str, request: DataRequest) -> str:
+        """Antwort-Channel: reply_to, sofern er zum Server gehört, sonst echocloud:{server_id}"""
+        channel = f"echocloud:{server_id}"
+        if request.reply_to and (request.reply_to == channel or request.reply_to.startswith(channel + ":")):
+            return request.reply_to
+        return channel
+
+    @staticmethod
+    def build_response(server_id: str, request: DataRequest, status: int, body: Dict[str, Any]) -> str:
+        return json.dumps({
+            "type": RESPONSE_TYPE,
+            "server_id": server_id,
+            "request_id": request.request_id,
+            "code": status,
+            **body,
+        })
+
+    async def reply(self, server_id: str, request: DataRequest, status: int, body: Dict[str, Any]):
+        await self.redis.publish(self.reply_channel(server_id, request),
+                                 self.build_response(server_id, request, status, body))
+
+    def submit(self, server_id: str, request: DataRequest) -> bool:
+        """Reiht eine Anfrage beim zuständigen Worker ein. False, wenn dessen Warteschlange voll ist"""
+        queue = self.queues[zlib.crc32(server_id.encode()) % self.workers]
+        try:
+            queue.put_nowait((server_id, request))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _worker(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            telemetry.REDIS_DATA_BATCH_SIZE.observe(len(batch))
+
+            requests = [(REQUEST_TYPES[request.type][0], server_id, request.data)
+                        for server_id, request in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.operations.execute_batch, requests)
+            except Exception as e:
+                pWarning(f"Fehler beim Ausführen eines Daten-Batches: {e}")
+                results = [(500, {"status": "error", "detail": "Interner Serverfehler"})] * len(batch)
+
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for (server_id, request), (status, body) in zip(batch, results):
+                        telemetry.REDIS_DATA_REQUESTS.inc(type=request.type, code=str(status))
+                        pipe.publish(self.reply_channel(server_id, request),
+                                     self.build_response(server_id, request, status, body))
+                    await pipe.execute()
+                pDebug("%d Daten-Anfragen über Redis beantwortet", len(batch))
+            except Exception as e:
+                pWarning(f"Antworten auf Daten-Anfragen konnten nicht gesendet werden: {e}")
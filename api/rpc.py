@@ -0,0 +1,86 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+
+class RpcError(Exception):
+    """Fehlerantwort eines Servers auf einen RPC-Aufruf"""
+
+
+class RpcTimeout(RpcError):
+    """Der Server hat nicht innerhalb des Timeouts geantwortet"""
+
+
+class RpcManager:
+    """
+    Request/Response über die bestehende Server-Verbindung (WebSocket oder Redis).
+
+    Anfrage:  {"type": "rpc_request", "id": "...", "method": "command", "params": {...}}
+    Antwort:  {"type": "rpc_response", "id": "...", "result": {...}}  oder  {..., "error": "..."}
+    """
+
+    def __init__(self, send: Callable[[str, Dict[str, Any]], Awaitable[None]], default_timeout: float = 10.0):
+        self._send = send
+        self.default_timeout: float = default_timeout
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._targets: Dict[str, Tuple[str, float]] = {}  # Request-ID -> (server_id, Deadline monotonic)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def call(self, server_id: str, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: Optional[float] = None) -> Any:
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        request = {
+            "type": "rpc_request",
+            "id": request_id,
+            "method": method,
+            "params": params or {},
+            "timestamp": datetime.now().isoformat()
+        }
+        try:
+            # Im try, damit finally auch bei einem Fehler hier (z.B. ungültiger timeout) aufräumt
+            self._pending[request_id] = future
+            self._targets[request_id] = (server_id, time.monotonic() + (timeout or self.default_timeout))
+            await self._send(server_id, request)
+            return await asyncio.wait_for(future, timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            raise RpcTimeout(f"Keine Antwort von '{server_id}' auf '{method}' "
+                             f"innerhalb von {timeout or self.default_timeout}s")
+        finally:
+            self._pending.pop(request_id, None)
+            self._targets.pop(request_id, None)
+
+    def is_pending(self, request_id: str) -> bool:
+        return request_id in self._pending
+
+    def resolve(self, response: Dict[str, Any]) -> bool:
+        """Ordnet eine rpc_response ihrem wartenden Aufruf zu. False = unbekannte ID"""
+        future = self._pending.get(response.get("id"))
+        if future is None or future.done():
+            return False
+        error = response.get("error")
+        if error:
+            future.set_exception(RpcError(str(error)))
+        else:
+            future.set_result(response.get("result"))
+        return True
+
+    def remaining(self, request_id: str) -> Optional[float]:
+        """Sekunden bis zum Timeout eines wartenden Aufrufs"""
+        target = self._targets.get(request_id)
+        return max(0.0, target[1] - time.monotonic()) if target else None
+
+    def cancel_all(self, server_id: Optional[str] = None, reason: str = "Verbindung geschlossen"):
+        """Lässt wartende Aufrufe (eines Servers bzw. alle) sofort mit RpcError scheitern"""
+        for request_id, future in list(self._pending.items()):
+            if server_id is not None and self._targets.get(request_id, (None,))[0] != server_id:
+                continue
+            if not future.done():
+                future.set_exception(RpcError(reason))
+            self._pending.pop(request_id, None)
+            self._targets.pop(request_id, None)
@@ -0,0 +1,238 @@
+import json
+import os
+import socket
+from datetime import datetime
+from typing import Dict, Optional, Any, TYPE_CHECKING
+
+from core.server_manager import Server, ServerState, Software
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# Redis-Schlüssel des gemeinsamen Flotten-Zustands
+KEY_RUNTIME = "echocloud:fleet:runtime"          # Hash server_id -> Laufzeitdaten (JSON)
+KEY_CONNECTIONS = "echocloud:fleet:connections"  # Hash server_id -> worker_id
+KEY_SERVERS = "echocloud:fleet:servers"          # Hash server_id -> zur Laufzeit registrierter Server (JSON)
+CHANNEL_RUNTIME = "echocloud:fleet:updates"      # Broadcast geänderter Laufzeitdaten
+CHANNEL_WORKER = "echocloud:worker:{worker_id}"  # Nachrichten an den Worker, der den Socket hält
+
+# Entfernt die Verbindung nur, wenn sie noch zum aufrufenden Worker gehört
+_RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    return redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+# Nur Datenbanken mit eigenem Server vertragen mehrere Prozesse. H2 (AUTO_SERVER=FALSE) öffnet nur einer
+MULTI_PROCESS_STORAGE = {"mysql", "mariadb", "postgresql"}
+
+
+def supports_workers(storage_type: str) -> bool:
+    return str(storage_type).lower() in MULTI_PROCESS_STORAGE
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def runtime_to_dict(server: Server) -> Dict[str, Any]:
+    return {
+        "server_state": server.server_state.value,
+        "is_running": server.is_running,
+        "start_time": server.start_time.isoformat() if server.start_time else None,
+        "tps": server.tps,
+        "cpu_usage": server.cpu_usage,
+        "ram_usage_mb": server.ram_usage_mb,
+        "players_online": server.players_online,
+        "max_players": server.max_players,
+        "last_seen": server.last_seen.isoformat() if server.last_seen else None,
+    }
+
+
+def apply_runtime(server: Server, data: Dict[str, Any]):
+    """Übernimmt Laufzeitdaten eines anderen Workers in das lokale Server-Objekt"""
+    try:
+        server.server_state = ServerState(data.get("server_state", ServerState.OFFLINE.value))
+    except ValueError:
+        server.server_state = ServerState.OFFLINE
+    server.is_running = bool(data.get("is_running", False))
+    start_time = data.get("start_time")
+    server.start_time = datetime.fromisoformat(start_time) if start_time else None
+    server.tps = data.get("tps")
+    server.cpu_usage = data.get("cpu_usage")
+    server.ram_usage_mb = data.get("ram_usage_mb")
+    server.players_online = data.get("players_online") or []
+    server.max_players = data.get("max_players", 0)
+    last_seen = data.get("last_seen")
+    server.last_seen = datetime.fromisoformat(last_seen) if last_seen else None
+
+
+def server_to_dict(server: Server) -> Dict[str, Any]:
+    return {
+        "server_id": server.server_id,
+        "name": server.name,
+        "ip": server.ip,
+        "port": server.port,
+        "server_type": server.server_type,
+        "config_path": server.config_path,
+        "java_memory": server.java_memory,
+        "software": server.software.value,
+        "software_version": server.software_version,
+        "run_sh_path": server.run_sh_path,
+    }
+
+
+def server_from_dict(data: Dict[str, Any]) -> Server:
+    try:
+        software = Software(data.get("software", Software.UNKNOWN.value))
+    except ValueError:
+        software = Software.UNKNOWN
+    return Server(server_id=data["server_id"], name=data.get("name", data["server_id"]), ip=data.get("ip", "127.0.0.1"),
+                  port=int(data.get("port", 25565)), server_type=data.get("server_type", "Unknown"),
+                  config_path=data.get("config_path", "__AUTO__"), java_memory=data.get("java_memory"),
+                  server_state=ServerState.OFFLINE, software=software,
+                  software_version=data.get("software_version"), run_sh_path=data.get("run_sh_path", "Unknown"))
+
+
+class FleetStateStore:
+    """Gemeinsamer Flotten-Zustand aller API-Worker in Redis (Laufzeitdaten + Verbindungsverzeichnis)"""
+
+    def __init__(self, redis, worker_id: str):
+        self.redis = redis
+        self.worker_id: str = worker_id
+        self.channel: str = CHANNEL_WORKER.format(worker_id=worker_id)
+        self._release = redis.register_script(_RELEASE_SCRIPT)
+
+    async def publish_runtime(self, server: Server, crash_reason: Optional[str] = None):
+        """crash_reason: Absturz in diesem Worker erkannt, der Hauptprozess (CrashRecovery) reagiert darauf"""
+        data = {"worker_id": self.worker_id, "server_id": server.server_id, "runtime": runtime_to_dict(server)}
+        if crash_reason:
+            data["crashed"] = crash_reason
+        payload = json.dumps(data)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(KEY_RUNTIME, server.server_id, payload)
+            pipe.publish(CHANNEL_RUNTIME, payload)
+            await pipe.execute()
+
+    async def publish_process(self, server: Server, with_metrics: bool):
+        """Messwerte aus /proc (nur der Hauptprozess misst) an die Worker, die /api/servers und /metrics liefern"""
+        data = {"worker_id": self.worker_id, "server_id": server.server_id, "process": server.process_stats}
+        if with_metrics:
+            data.update(cpu_usage=server.cpu_usage, ram_usage_mb=server.ram_usage_mb)
+        await self.redis.publish(CHANNEL_RUNTIME, json.dumps(data))
+
+    async def load_runtime(self) -> Dict[str, Dict[str, Any]]:
+        raw = await self.redis.hgetall(KEY_RUNTIME)
+        result = {}
+        for server_id, payload in raw.items():
+            try:
+                result[server_id] = json.loads(payload)["runtime"]
+            except (ValueError, KeyError):
+                continue
+        return result
+
+    async def publish_server(self, server: Server, auth_token: Optional[str]):
+        """Macht einen zur Laufzeit registrierten Server (z.B. dynamische Instanz) samt Token allen Workern bekannt"""
+        payload = json.dumps({"worker_id": self.worker_id, "server_id": server.server_id,
+                              "server": server_to_dict(server), "auth_token": auth_token})
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(KEY_SERVERS, server.server_id, payload)
+            pipe.publish(CHANNEL_RUNTIME, payload)
+            await pipe.execute()
+
+    async def remove_server(self, server_id: str):
+        payload = json.dumps({"worker_id": self.worker_id, "server_id": server_id, "server": None})
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hdel(KEY_SERVERS, server_id)
+            pipe.hdel(KEY_RUNTIME, server_id)
+            pipe.publish(CHANNEL_RUNTIME, payload)
+            await pipe.execute()
+
+    async def load_servers(self) -> Dict[str, Dict[str, Any]]:
+        raw = await self.redis.hgetall(KEY_SERVERS)
+        result = {}
+        for server_id, payload in raw.items():
+            try:
+                result[server_id] = json.loads(payload)
+            except ValueError:
+                continue
+        return result
+
+    async def claim_connection(self, server_id: str):
+        await self.redis.hset(KEY_CONNECTIONS, server_id, self.worker_id)
+        await self.redis.publish(CHANNEL_RUNTIME, json.dumps(
+            {"worker_id": self.worker_id, "server_id": server_id, "connected_worker": self.worker_id}))
+
+    async def release_connection(self, server_id: str):
+        if await self._release(keys=[KEY_CONNECTIONS], args=[server_id, self.worker_id]):
+            await self.redis.publish(CHANNEL_RUNTIME, json.dumps(
+                {"worker_id": self.worker_id, "server_id": server_id, "connected_worker": None}))
+
+    async def release_all(self, server_ids):
+        for server_id in list(server_ids):
+            await self.release_connection(server_id)
+
+    async def connections(self) -> Dict[str, str]:
+        return await self.redis.hgetall(KEY_CONNECTIONS)
+
+    async def owner_of(self, server_id: str) -> Optional[str]:
+        return await self.redis.hget(KEY_CONNECTIONS, server_id)
+
+    async def route(self, server_id: str, payload: Dict[str, Any]) -> bool:
+        """Leitet eine Nachricht an den Worker weiter, der die Verbindung des Servers hält"""
+        owner = await self.owner_of(server_id)
+        if not owner:
+            return False
+        receivers = await self.redis.publish(CHANNEL_WORKER.format(worker_id=owner),
+                                             json.dumps({"server_id": server_id, **payload}))
+        return receivers > 0
+
+
+def create_worker_app() -> 'FastAPI':
+    """App-Factory für 'uvicorn api.workers:create_worker_app --factory --workers N'"""
+    from api.apimanager import APIManager
+    from core import (host, port, auth_config_path, cert_file_path, key_file_path, storage_type, storage_host,
+                      storage_port, storage_username, storage_password, storage_database, storage_table_name,
+                      storage_h2_file_path, heartbeat_delay, heartbeat_min_delay, heartbeat_max_delay,
+                      heartbeat_missed_limit, metrics_persist_interval, cert_days, autocert, use_https,
+                      communication_type, redis_channel, redis_user, redis_password, redis_host, redis_port,
+                      rpc_timeout, outbound_queue_size, outbound_max_lag, outbound_send_timeout, ratelimit_config)
+    from core.server_manager import ServerManager
+    from utils.storagemanager import StorageManager
+
+    if not supports_workers(storage_type):
+        raise RuntimeError(f"api_workers > 1 braucht eine Netzwerk-Datenbank ({', '.join(sorted(MULTI_PROCESS_STORAGE))}), "
+                           f"nicht '{storage_type}'")
+    storagemanager = StorageManager(storage_type, storage_host, storage_port, storage_database, storage_username,
+                                    storage_password, storage_table_name, storage_h2_file_path)
+    servermanager = ServerManager(storagemanager=storagemanager)
+    apimanager = APIManager(storage_manager=storagemanager,
+                            server_manager=servermanager,
+                            host=host,
+                            port=port,
+                            auth_config_path=auth_config_path,
+                            cert_file_path=cert_file_path,
+                            key_file_path=key_file_path,
+                            cert_duration_days=cert_days,
+                            heartbeat_delay=heartbeat_delay,
+                            heartbeat_min_delay=heartbeat_min_delay,
+                            heartbeat_max_delay=heartbeat_max_delay,
+                            heartbeat_missed_limit=heartbeat_missed_limit,
+                            metrics_persist_interval=metrics_persist_interval,
+                            autocert=autocert,
+                            use_https=use_https,
+                            communication_type=communication_type,
+                            redis_channel=redis_channel,
+                            redis_user=redis_user,
+                            redis_password=redis_password,
+                            redis_host=redis_host,
+                            redis_port=redis_port,
+                            rpc_timeout=rpc_timeout,
+                            outbound_queue_size=outbound_queue_size,
+                            outbound_max_lag=outbound_max_lag,
+                            outbound_send_timeout=outbound_send_timeout,
+                            ratelimit_config=ratelimit_config,
+                            worker_mode=True)
+    return apimanager.app
@@ -1,4 +1,5 @@
 import os
+import queue
 import sys
 from typing import Dict, Callable, Optional, TYPE_CHECKING, List, Tuple
 
@@ -8,6 +9,12 @@ import core
 import core.console as utils
 from core.server_manager import ServerManager
 from api.apimanager import APIManager
+from api.rpc import RpcTimeout
+from core.autoscaler import Autoscaler
+from core.console_stream import LogFilter
+from core.instances import InstanceManager
+from core.recovery import CrashRecovery
+from core.operations import OperationScheduler, START, STOP, RESTART
 from utils.storagemanager import StorageManager
 
 if TYPE_CHECKING:
@@ -15,9 +22,15 @@ if TYPE_CHECKING:
 
 
 class CommandManager:
-    def __init__(self, server_manager: 'ServerManager', api_manager: APIManager, storage_manager: StorageManager):
+    def __init__(self, server_manager: 'ServerManager', api_manager: APIManager, storage_manager: StorageManager,
+                 autoscaler: Optional[Autoscaler] = None, instances: Optional[InstanceManager] = None,
+                 operations: Optional[OperationScheduler] = None, recovery: Optional[CrashRecovery] = None):
         self.server_manager: ServerManager = server_manager
         self.api_manager = api_manager
+        self.autoscaler: Optional[Autoscaler] = autoscaler
+        self.instances: Optional[InstanceManager] = instances
+        self.operations: Optional[OperationScheduler] = operations
+        self.recovery: Optional[CrashRecovery] = recovery
         self.selected_server: Optional[Server] = None  # Module = Server Plugin
         self.commands: Dict[str, Callable[[str], None]] = {}
         self.command_infos: List[Tuple[str, str]] = []
@@ -30,6 +43,10 @@ class CommandManager:
         self.register_command("config", self.cmd_config)
         self.register_command("start", self.cmd_start)
         self.register_command("stop", self.cmd_stop)
+        self.register_command("restart", self.cmd_restart)
+        self.register_command("ops", self.cmd_ops)
+        self.register_command("memory", self.cmd_memory)
+        self.register_command("crashes", self.cmd_crashes)
         self.register_command("logs", self.cmd_logs)
         self.register_command("help", self.cmd_help)
         self.register_command("autoscan", self.cmd_autoscan)
@@ -37,6 +54,8 @@ class CommandManager:
         self.register_command("reload", self.cmd_reload)
         self.register_command("startapi", self.cmd_startapi)
         self.register_command("execute", self.cmd_execute)
+        self.register_command("autoscale", self.cmd_autoscale)
+        self.register_command("create", self.cmd_create)
         self.register_command("exit", self.cmd_exit)
 
         self.add_default_commands()
@@ -46,15 +65,21 @@ class CommandManager:
         self.add_help_message("select <server>", "Wählt Server aus")
         self.add_help_message("status", "Zeigt Status des Servers")
         self.add_help_message("config [opt val]", "Zeigt oder setzt Server-Konfiguration")
-        self.add_help_message("start", "Startet den Server")
-        self.add_help_message("stop", "Stoppt den Server")
+        self.add_help_message("start [all|group <typ>]", "Startet den Server oder eine Gruppe")
+        self.add_help_message("stop [all|group <typ>]", "Stoppt den Server oder eine Gruppe")
+        self.add_help_message("restart [all|type <typ>]", "Startet den Server oder eine Gruppe neu")
+        self.add_help_message("ops [cancel]", "Fortschritt der Gruppenoperation / abbrechen")
+        self.add_help_message("memory", "Zeigt Speicherbudget und wartende Starts")
+        self.add_help_message("crashes", "Abstürze, geplante Neustarts und Crash-Loops")
         self.add_help_message("reload", "Lädt einen Server neu")
-        self.add_help_message("logs", "Zeigt Server-Logs")
+        self.add_help_message("logs [-f] [-l level] [regex]", "Zeigt Server-Logs (-f: live)")
         self.add_help_message("debug", "Debug Modus an/aus")
-        self.add_help_message("autoscan", "Scannt nach neuen Servern")
+        self.add_help_message("autoscan [-y]", "Scannt nach neuen Servern (-y: ohne Rückfragen)")
         self.add_help_message("help", "Diese Hilfe anzeigen")
         self.add_help_message("startapi", "Startet den API Webserver")
         self.add_help_message("execute <command>", "Führt einen Befehl auf einem Server aus")
+        self.add_help_message("autoscale [on|off]", "Zeigt den Autoscaler oder schaltet ihn an/aus")
+        self.add_help_message("create <type> [anzahl]", "Startet neue Instanzen aus der Vorlage eines Servertyps")
         self.add_help_message("exit", "Stoppt EchoCloud")
 
     def add_help_message(self, command: str, info: str):
@@ -87,6 +112,17 @@ class CommandManager:
 
         if command == "select":
             return self.get_server_completions(args)
+        elif command in ("start", "stop", "restart"):
+            parts = args.split(" ", 1)
+            if len(parts) == 1:
+                return [scope for scope in ("all", "group", "type", "server") if scope.startswith(parts[0])]
+            if parts[0] in ("group", "type"):
+                types = sorted({s.server_type for s in self.server_manager.servers})
+                return [t for t in types if t.startswith(parts[1])]
+            if parts[0] == "server":
+                return self.get_server_completions(parts[1])
+        elif command == "create" and self.instances:
+            return [t for t in self.instances.list_templates() if t.startswith(args)]
         elif command == "config" and self.selected_server:
             # Add config key completions if server is selected
             if hasattr(self.selected_server, 'java_memory'):
@@ -110,10 +146,14 @@ class CommandManager:
         cmd = parts[0].lower()
         args = parts[1] if len(parts) > 1 else ""
 
-        if cmd in self.commands:
-            self.commands[cmd](args)
-        else:
-            utils.pWarning("Unbekannter Befehl. Tippe 'help' für eine Liste.")
+        try:
+            if cmd in self.commands:
+                self.commands[cmd](args)
+            else:
+                utils.pWarning("Unbekannter Befehl. Tippe 'help' für eine Liste.")
+        finally:
+            # Ausgabe des Befehls vollständig anzeigen, bevor der Prompt wieder erscheint
+            utils.flush_logs()
 
     def cmd_status(self, args):
         """Zeigt Status des ausgewählten Servers an"""
@@ -191,7 +231,11 @@ class CommandManager:
 
     # TEST
     def cmd_start(self, args):
-        """Startet den ausgewählten Server"""
+        """Startet den ausgewählten Server oder eine Gruppe (start all | start group <typ>)"""
+        if args.strip():
+            self._group_operation(START, args)
+            return
+
         if not self.selected_server:
             utils.pWarning("Kein Server ausgewählt.")
             return
@@ -200,7 +244,10 @@ class CommandManager:
             utils.pWarning("Server läuft bereits.")
             return
 
-        self.selected_server.start()
+        if self.recovery and self.selected_server.crash_looping:
+            self.recovery.reset(self.selected_server)
+            utils.pInfo("Crash-Loop aufgehoben, automatische Neustarts wieder aktiv.")
+        self.server_manager.start_server(self.selected_server)
 
     def cmd_execute(self, args):
         """Führt einen Befehl auf dem Server aus"""
@@ -217,11 +264,32 @@ class CommandManager:
             return
 
         utils.pInfo(f"Führe Befehl aus: {args}")
+
+        # Per RPC ausführen, wenn der Server verbunden ist -> Ausgabe kommt zurück
+        if self.api_manager.can_rpc(self.selected_server.server_id):
+            try:
+                output = self.api_manager.execute_command(self.selected_server.server_id, args)
+            except RpcTimeout as e:
+                utils.pWarning(f"{e}. Unterstützt das Plugin RPC?")
+                return
+            except Exception as e:
+                utils.pError(f"Befehl konnte nicht per RPC ausgeführt werden: {e}")
+                return
+            if not output:
+                utils.pInfo("(keine Ausgabe)")
+            for line in output:
+                utils.pInfo(f"[grey70]{line}[/grey70]")
+            return
+
         self.selected_server.send_command(args)
 
     # TEST
     def cmd_stop(self, args):
-        """Stoppt den ausgewählten Server"""
+        """Stoppt den ausgewählten Server oder eine Gruppe (stop all | stop group <typ>)"""
+        if args.strip():
+            self._group_operation(STOP, args)
+            return
+
         if not self.selected_server:
             utils.pWarning("Kein Server ausgewählt.")
             return
@@ -232,20 +300,152 @@ class CommandManager:
 
         self.selected_server.stop()
 
-    # TEST
+    def cmd_restart(self, args):
+        """Startet den ausgewählten Server oder eine Gruppe neu (restart all | restart type <typ>)"""
+        if not args.strip():
+            if not self.selected_server:
+                utils.pWarning("Kein Server ausgewählt.")
+                return
+            args = f"server {self.selected_server.server_id}"
+        self._group_operation(RESTART, args)
+
+    def cmd_crashes(self, args):
+        """Zeigt die letzten Abstürze des ausgewählten Servers (mit Konsolenzeilen) oder aller Server"""
+        if not self.recovery:
+            return
+        pending = self.recovery.pending()
+        if self.selected_server is None:
+            for server in self.server_manager.servers:
+                reports = self.recovery.reports.get(server.server_id)
+                if not reports and server.server_id not in pending and not server.crash_looping:
+                    continue
+                info = f"{len(reports or ())} Abstürze, letzter {reports[-1].time:%H:%M:%S}" if reports else ""
+                if server.crash_looping:
+                    info += " [red]Crash-Loop[/red]"
+                if server.server_id in pending:
+                    info += f" Neustart in {pending[server.server_id]:.0f}s"
+                utils.pInfo(f" - {server.name}: {info.strip()}")
+            return
+
+        server = self.selected_server
+        policy = self.recovery.policy_for(server)
+        utils.pInfo(f"{server.name}: Neustart-Modus {policy.mode}"
+                    f"{', Crash-Loop' if server.crash_looping else ''}"
+                    f"{f', Neustart in {pending[server.server_id]:.0f}s' if server.server_id in pending else ''}")
+        reports = self.recovery.reports.get(server.server_id)
+        if not reports:
+            utils.pInfo("Keine Abstürze aufgezeichnet.")
+            return
+        report = reports[-1]
+        utils.pInfo(f"Letzter Absturz {report.time:%d.%m. %H:%M:%S}: {report.reason}")
+        utils.flush_logs()
+        for line in report.lines:
+            utils.console.print(line, markup=False, highlight=False)
+
+    def cmd_ops(self, args):
+        """Zeigt den Fortschritt der laufenden Gruppenoperation oder bricht sie ab (ops cancel)"""
+        if not self.operations:
+            return
+        if args.strip().lower() == "cancel":
+            if self.operations.cancel():
+                utils.pInfo("Operation wird nach den laufenden Vorgängen abgebrochen.")
+            else:
+                utils.pInfo("Keine laufende Operation.")
+            return
+
+        status = self.operations.status()
+        if status is None:
+            utils.pInfo("Noch keine Gruppenoperation ausgeführt.")
+            return
+        state = "fertig" if status["finished"] else "läuft"
+        utils.pInfo("%s %s (%s): %d/%d nach %.0fs", status["action"], status["label"], state, status["done"],
+                    status["total"], status["elapsed"])
+        if status["failed"]:
+            utils.pWarning(f"Fehlgeschlagen: {', '.join(status['failed'])}")
+
+    def cmd_memory(self, args):
+        """Zeigt zugesagten Speicher, Budget und wartende Starts"""
+        budget = self.server_manager.memory_budget
+        if not budget.enabled:
+            utils.pInfo("Speicherbudget ist deaktiviert.")
+            return
+        status = budget.status()
+        available = status["available_mb"]
+        utils.pInfo("Zugesagt: %d MB von %d MB, verfügbar laut /proc/meminfo: %s MB (Reserve %d MB)",
+                    status["committed_mb"], status["budget_mb"], available if available is not None else "?",
+                    status["reserve_mb"])
+        if status["queued"]:
+            utils.pInfo("Warten auf Speicher: %s", ", ".join(status["queued"]))
+
+    def _group_operation(self, action: str, args: str):
+        if not self.operations:
+            utils.pWarning("Gruppenoperationen sind nicht verfügbar.")
+            return
+        parts = args.split(maxsplit=1)
+        scope = parts[0].lower()
+        value = parts[1].strip() if len(parts) > 1 else None
+        try:
+            servers = self.operations.select(scope, value)
+        except ValueError as e:
+            utils.pWarning(f"{e}")
+            return
+        if not servers:
+            utils.pWarning("Keine passenden Server gefunden.")
+            return
+
+        label = "alle Server" if scope == "all" else (value or "")
+        if self.operations.submit(action, servers, label) is None:
+            utils.pWarning("Es läuft bereits eine Gruppenoperation ('ops' zeigt den Fortschritt).")
+
     def cmd_logs(self, args):
-        """Zeigt letzte Log-Zeilen des Servers"""
+        """Zeigt die letzten Konsolenzeilen des Servers, mit -f live bis Strg+C"""
         if not self.selected_server:
             utils.pWarning("Kein Server ausgewählt.")
             return
 
-        if not self.selected_server.last_output_lines:
+        follow, count, level, pattern = False, 20, None, []
+        tokens = args.split()
+        try:
+            while tokens:
+                token = tokens.pop(0)
+                if token == "-f":
+                    follow = True
+                elif token == "-n":
+                    count = int(tokens.pop(0))
+                elif token in ("-l", "--level"):
+                    level = tokens.pop(0)
+                else:
+                    pattern.append(token)
+            log_filter = LogFilter(" ".join(pattern) or None, level)
+        except (IndexError, ValueError) as e:
+            utils.pWarning(f"Verwendung: logs [-f] [-n <zeilen>] [-l <level>] [regex] ({e})")
+            return
+
+        hub = self.server_manager.console
+        history = hub.backlog_for(self.selected_server, log_filter, count)
+        if not history and not follow:
             utils.pInfo("Keine Logs verfügbar.")
             return
 
-        utils.pInfo("Server Logs:")
-        for line in self.selected_server.last_output_lines[-20:]:  # Show last 20 lines
-            utils.pInfo(line)
+        utils.flush_logs()
+        for line in history:
+            utils.console.print(line, markup=False, highlight=False)
+        if not follow:
+            return
+
+        lines: "queue.Queue[str]" = queue.Queue()
+        subscription = hub.subscribe(self.selected_server, lines.put, log_filter)
+        utils.console.print("-- Live-Konsole, Strg+C zum Beenden --", style="deep_sky_blue2")
+        try:
+            while True:
+                try:
+                    utils.console.print(lines.get(timeout=0.5), markup=False, highlight=False)
+                except queue.Empty:
+                    continue
+        except KeyboardInterrupt:
+            pass
+        finally:
+            hub.unsubscribe(subscription)
 
     # TODO server reloaden via /reload
     def cmd_reload(self, args):
@@ -258,8 +458,9 @@ class CommandManager:
 
     def cmd_debug(self, args):
         """Aktiviert/Deaktiviert Entwickler Modus"""
-        tmp = not core.debug_mode
-        core.debug_mode = not core.debug_mode
+        tmp = not utils.is_debug()
+        core.debug_mode = tmp
+        utils.set_debug(tmp)
 
         if tmp:
             utils.pInfo("Debug Mode aktiviert")
@@ -277,10 +478,54 @@ class CommandManager:
         utils.pInfo(" - Nutze Pfeiltasten ↑/↓ für Command History")
 
     def cmd_autoscan(self, args):
-        """Importiert automatisch neue Server"""
+        """Importiert automatisch neue Server (autoscan -y: ohne Rückfragen, Configs werden erstellt)"""
+        if args.strip() == "-y":
+            self.server_manager.scan_servers(interactive=False, generate_configs=True)
+            return
         self.server_manager.scan_servers()
         utils.pInfo(f"Server Erfolgreich gescannt.")
 
+    def cmd_autoscale(self, args):
+        """Zeigt Auslastung und Soll-Instanzen pro Gruppe oder schaltet den Autoscaler an/aus"""
+        if not self.autoscaler or not self.autoscaler.policies:
+            utils.pWarning("Keine Gruppen unter autoscaling.groups konfiguriert.")
+            return
+
+        arg = args.strip().lower()
+        if arg == "on":
+            self.autoscaler.start()
+            return
+        if arg == "off":
+            self.autoscaler.stop()
+            utils.pInfo("Autoscaler gestoppt")
+            return
+
+        for group in self.autoscaler.policies:
+            status = self.autoscaler.group_status(group)
+            utils.pInfo("%s: %d aktiv (%d startend, %d auslaufend), Soll %d [%d-%d], Spieler %d/%d (%.0f%%)",
+                        group, status["active"], status["starting"], status["draining"], status["desired"],
+                        status["min"], status["max"], status["players"], status["capacity"], status["fill"] * 100)
+
+    def cmd_create(self, args):
+        """Erstellt und startet dynamische Instanzen aus einer Vorlage"""
+        if not self.instances:
+            utils.pWarning("Vorlagen sind nicht verfügbar.")
+            return
+
+        parts = args.split()
+        if not parts:
+            templates = self.instances.list_templates()
+            utils.pWarning("Bitte Servertyp angeben: create <type> [anzahl]")
+            utils.pInfo("Vorlagen: %s", ", ".join(templates) if templates else "keine")
+            return
+        count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+
+        for _ in range(count):
+            server = self.instances.launch(parts[0])
+            if server is None:
+                break
+            utils.pInfo("Instanz %s gestartet (Port %d)", server.server_id, server.port)
+
     def cmd_startapi(self, args):
         """Startet den API Webserver"""
         self.api_manager.start_in_thread()
@@ -288,7 +533,10 @@ class CommandManager:
 
     def cmd_exit(self, args):
         """Beendet EchoCloud"""
+        if self.autoscaler:
+            self.autoscaler.stop()
         self.api_manager.stop_thread()
+        self.server_manager.save_metrics_history()
         self.storage_manager.close()
         utils.pInfo(f"[red]Bye Bye...[/red]")
         sys.exit(-1)
\ No newline at end of file
@@ -7,10 +7,22 @@ with open(settings_path, "r") as f:
     settings = yaml.safe_load(f) or {}
 
 debug_mode: bool = settings.get("cloud", {}).get("debug_mode", False)
+log_file: str = settings.get("logging", {}).get("file", "logs/echocloud.jsonl")
+log_max_bytes: int = settings.get("logging", {}).get("max_bytes", 10485760)
+log_backup_count: int = settings.get("logging", {}).get("backup_count", 5)
+log_console = settings.get("logging", {}).get("console", "auto")
+log_queue_size: int = settings.get("logging", {}).get("queue_size", 10000)
 autoregister: bool = settings.get("cloud", {}).get("autoregister", True)
 use_https: bool = settings.get("network", {}).get("use_https", True)
 server_path: str = settings.get("server", {}).get("default_path", "../Cloud/running/static")
 heartbeat_delay: int = settings.get("server", {}).get("heartbeat_delay", 10)
+heartbeat_min_delay: float = settings.get("server", {}).get("heartbeat_min_delay", 2)
+heartbeat_max_delay: float = settings.get("server", {}).get("heartbeat_max_delay", 30)
+heartbeat_missed_limit: int = settings.get("server", {}).get("heartbeat_missed_limit", 3)
+operation_concurrency: int = settings.get("server", {}).get("operation_concurrency", 4)
+operation_start_timeout: float = settings.get("server", {}).get("operation_start_timeout", 180)
+operation_stop_timeout: float = settings.get("server", {}).get("operation_stop_timeout", 60)
+metrics_persist_interval: int = settings.get("server", {}).get("metrics_persist_interval", 300)
 cert_days: int = settings.get("network", {}).get("cert_duration_days", 365)
 autocert: bool = settings.get("network", {}).get("auto_cert", False)
 host: str = settings.get("cloud", {}).get("host", "localhost")
@@ -23,6 +35,20 @@ communication_type: str = settings.get("network", {}).get("communication_type",
 redis_channel: str = settings.get("network", {}).get("redis_channel", "echocloud:all")
 redis_password: str = settings.get("network", {}).get("redis_password", "password")
 redis_user: str = settings.get("network", {}).get("redis_user", "default")
+redis_data_workers: int = settings.get("network", {}).get("redis_data_workers", 4)
+redis_data_batch_size: int = settings.get("network", {}).get("redis_data_batch_size", 50)
+redis_host: str = settings.get("network", {}).get("redis_host", "127.0.0.1")
+redis_port: int = settings.get("network", {}).get("redis_port", 6379)
+api_workers: int = settings.get("network", {}).get("api_workers", 1)
+rpc_timeout: float = settings.get("network", {}).get("rpc_timeout", 10)
+outbound_queue_size: int = settings.get("network", {}).get("outbound_queue_size", 256)
+outbound_max_lag: float = settings.get("network", {}).get("outbound_max_lag", 30)
+outbound_send_timeout: float = settings.get("network", {}).get("outbound_send_timeout", 10)
+ratelimit_config: dict = settings.get("ratelimit", {}) or {}
+autoscaling_config: dict = settings.get("autoscaling", {}) or {}
+templates_config: dict = settings.get("templates", {}) or {}
+restart_config: dict = settings.get("restart", {}) or {}
+process_metrics_config: dict = settings.get("process_metrics", {}) or {}
 
 storage_type: str = settings.get("storage", {}).get("storage_type", "h2")
 storage_host: str = settings.get("storage", {}).get("host", "localhost")
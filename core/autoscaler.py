@@ -0,0 +1,234 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+from core.console import pInfo, pWarning, pError, pDebug
+from core.memory_budget import ADMITTED, QUEUED
+from core.server_manager import ServerManager, ServerState
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+
+@dataclass
+class GroupPolicy:
+    """Skalierungsregeln für einen server_type (settings.yaml -> autoscaling.groups.<typ>)"""
+    min: int = 1
+    max: int = 1
+    target_fill: float = 0.7          # Hochskalieren, sobald die Auslastung darüber liegt
+    scale_down_fill: float = 0.3      # Herunterskalieren erst unterhalb (Hysterese)
+    slots: int = 50                   # Plätze pro Instanz, solange max_players noch nicht gemeldet wurde
+    min_tps: float = 18.0             # Instanzen darunter gelten als überlastet
+    step: int = 1                     # Maximal so viele Instanzen pro Durchlauf starten
+    scale_up_cooldown: float = 60.0
+    scale_down_cooldown: float = 300.0
+    drain_timeout: float = 600.0      # So lange warten, bis Spieler einen auslaufenden Server verlassen haben
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'GroupPolicy':
+        known = {f.name for f in fields(cls)}
+        policy = cls(**{key: value for key, value in (data or {}).items() if key in known})
+        policy.max = max(policy.max, policy.min)
+        return policy
+
+
+class _GroupState:
+    __slots__ = ("last_scale_up", "last_scale_down", "draining")
+
+    def __init__(self):
+        self.last_scale_up: float = -math.inf
+        self.last_scale_down: float = -math.inf
+        self.draining: Dict[str, float] = {}  # server_id -> Beginn des Auslaufens
+
+
+class Autoscaler:
+    """
+    Startet und stoppt Instanzen pro server_type anhand der Spieler- und TPS-Werte aus den Heartbeats.
+
+    Soll-Anzahl = Spieler (inkl. Reservierungen) / (Plätze pro Instanz * target_fill), begrenzt auf min..max,
+    plus eine Instanz, wenn ein Server unter min_tps fällt. Hochskaliert wird sofort (nach scale_up_cooldown),
+    herunter nur unterhalb von scale_down_fill: der leerste Server wird aus der Auswahl genommen und gestoppt,
+    sobald er leer ist oder drain_timeout abläuft.
+    Zum Hochskalieren werden zuerst gestoppte Server der Gruppe gestartet, danach neue Instanzen über
+    launcher(server_type) erstellt (z.B. InstanceManager.launch aus einer Vorlage).
+    """
+
+    def __init__(self, server_manager: ServerManager, config: Optional[Dict[str, Any]] = None,
+                 launcher: Optional[Callable[[str], Optional['Server']]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        config = config or {}
+        self.server_manager: ServerManager = server_manager
+        self.enabled: bool = bool(config.get("enabled", False))
+        self.interval: float = float(config.get("interval", 15))
+        self.policies: Dict[str, GroupPolicy] = {
+            group: GroupPolicy.from_dict(policy) for group, policy in (config.get("groups") or {}).items()
+        }
+        self.launcher: Optional[Callable[[str], Optional['Server']]] = launcher
+        self._clock = clock
+        self._groups: Dict[str, _GroupState] = {group: _GroupState() for group in self.policies}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="echocloud-autoscaler", daemon=True)
+        self._thread.start()
+        pInfo("Autoscaler gestartet (%d Gruppen)", len(self.policies))
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                pError(f"Fehler im Autoscaler: {e}")
+
+    def tick(self):
+        """Ein Durchlauf über alle konfigurierten Gruppen"""
+        now = self._clock()
+        for group, policy in self.policies.items():
+            self._scale_group(group, policy, self._groups[group], now)
+
+    def group_status(self, group: str) -> Dict[str, Any]:
+        """Aktuelle Kennzahlen einer Gruppe (für CLI/Status)"""
+        policy = self.policies[group]
+        servers = self._servers(group)
+        state = self._groups[group]
+        active = [s for s in servers if self._is_active(s) and s.server_id not in state.draining]
+        players = self._players(active)
+        capacity = sum(self._slots(s, policy) for s in active)
+        return {
+            "group": group,
+            "active": len(active),
+            "starting": sum(1 for s in active if s.server_state == ServerState.STARTING),
+            "draining": len(state.draining),
+            "players": players,
+            "capacity": capacity,
+            "fill": players / capacity if capacity else 0.0,
+            "desired": self._desired(policy, active, players, capacity),
+            "min": policy.min,
+            "max": policy.max,
+        }
+
+    def _servers(self, group: str) -> List['Server']:
+        servers, _ = self.server_manager.query_servers(server_types=[group])
+        return servers
+
+    @staticmethod
+    def _is_active(server: 'Server') -> bool:
+        return server.server_state in (ServerState.STARTING, ServerState.ONLINE)
+
+    @staticmethod
+    def _slots(server: 'Server', policy: GroupPolicy) -> int:
+        return server.max_players if server.max_players > 0 else policy.slots
+
+    def _players(self, servers: List['Server']) -> int:
+        selector = self.server_manager.selector
+        return sum(len(s.players_online) + selector.reserved(s.server_id) for s in servers)
+
+    def _desired(self, policy: GroupPolicy, active: List['Server'], players: int, capacity: int) -> int:
+        slots = capacity / len(active) if active else policy.slots
+        desired = math.ceil(players / (slots * policy.target_fill)) if slots and policy.target_fill > 0 else 0
+        overloaded = any(s.server_state == ServerState.ONLINE and s.tps and s.tps < policy.min_tps
+                         for s in active)
+        if overloaded:
+            desired = max(desired, len(active) + 1)
+        return min(policy.max, max(policy.min, desired))
+
+    def _scale_group(self, group: str, policy: GroupPolicy, state: _GroupState, now: float):
+        servers = self._servers(group)
+        self._process_draining(group, policy, state, servers, now)
+
+        active = [s for s in servers if self._is_active(s) and s.server_id not in state.draining]
+        players = self._players(active)
+        capacity = sum(self._slots(s, policy) for s in active)
+        desired = self._desired(policy, active, players, capacity)
+        pDebug("[Autoscaler] %s: %d aktiv, %d/%d Spieler, Soll %d", group, len(active), players, capacity, desired)
+
+        if len(active) < desired:
+            if now - state.last_scale_up < policy.scale_up_cooldown:
+                return
+            missing = min(desired - len(active), max(1, policy.step))
+            started = self._undrain(group, state, servers, missing)
+            started += self._start_instances(group, servers, missing - started)
+            if started:
+                state.last_scale_up = now
+                pInfo("[Autoscaler] %s: %d Instanz(en) hochgefahren (%d/%d Spieler, Soll %d)",
+                      group, started, players, capacity, desired)
+            return
+
+        if len(active) > desired:
+            fill = players / capacity if capacity else 0.0
+            starting = any(s.server_state == ServerState.STARTING for s in active)
+            if (fill >= policy.scale_down_fill or starting
+                    or now - state.last_scale_down < policy.scale_down_cooldown
+                    or now - state.last_scale_up < policy.scale_up_cooldown):
+                return
+            online = [s for s in active if s.server_state == ServerState.ONLINE]
+            if not online:
+                return
+            victim = min(online, key=lambda s: (len(s.players_online), s.server_id))
+            state.draining[victim.server_id] = now
+            state.last_scale_down = now
+            self.server_manager.selector.set_draining(victim.server_id, True)
+            pInfo("[Autoscaler] %s: %s läuft aus (%d Spieler, Auslastung %.0f%%)",
+                  group, victim.name, len(victim.players_online), fill * 100)
+            self._process_draining(group, policy, state, [victim], now)
+
+    def _process_draining(self, group: str, policy: GroupPolicy, state: _GroupState,
+                          servers: List['Server'], now: float):
+        for server in servers:
+            since = state.draining.get(server.server_id)
+            if since is None:
+                continue
+            if server.server_state != ServerState.ONLINE:
+                self._finish_draining(state, server)
+            elif not server.players_online or now - since >= policy.drain_timeout:
+                pInfo("[Autoscaler] %s: stoppe %s", group, server.name)
+                self._finish_draining(state, server)
+                server.stop()
+
+    def _finish_draining(self, state: _GroupState, server: 'Server'):
+        state.draining.pop(server.server_id, None)
+        self.server_manager.selector.set_draining(server.server_id, False)
+
+    def _undrain(self, group: str, state: _GroupState, servers: List['Server'], count: int) -> int:
+        """Auslaufende Server zurückholen ist billiger als neue zu starten"""
+        revived = 0
+        for server in servers:
+            if revived >= count:
+                break
+            if server.server_id in state.draining and server.server_state == ServerState.ONLINE:
+                self._finish_draining(state, server)
+                revived += 1
+                pInfo("[Autoscaler] %s: %s wird weiter genutzt", group, server.name)
+        return revived
+
+    def _start_instances(self, group: str, servers: List['Server'], count: int) -> int:
+        started = 0
+        spares = [s for s in servers
+                  if s.server_state in (ServerState.OFFLINE, ServerState.CRASHED) and not s.crash_looping]
+        while started < count:
+            if spares:
+                server = spares.pop(0)
+                decision = self.server_manager.start_server(server)
+                if decision == QUEUED:
+                    started += 1  # Startet, sobald Speicher frei wird. Weitere Starts hätten auch keinen Platz
+                    break
+                if decision == ADMITTED and self._is_active(server):
+                    started += 1
+                continue
+            if self.launcher is None or self.launcher(group) is None:
+                pWarning(f"[Autoscaler] {group}: keine gestoppte Instanz oder Vorlage zum Starten vorhanden")
+                break
+            started += 1
+        return started
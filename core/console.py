@@ -1,21 +1,172 @@
+import json
+import os
+import queue
 import sys
-from typing import AnyStr
+import threading
+import time
+from datetime import datetime
+from typing import AnyStr, Any, Dict, Optional, Tuple
 import termios
 
 from rich.console import Console
+from rich.markup import escape
 from rich.prompt import Prompt
-import asyncio
+from rich.text import Text
 import atexit
-from core import debug_mode
-
-_console_lock = asyncio.Lock()
+from core import debug_mode, log_file, log_max_bytes, log_backup_count, log_console, log_queue_size
 
 console = Console()
 
+# Level wie im logging-Modul
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+_LEVEL_NAMES = {DEBUG: "debug", INFO: "info", WARNING: "warning", ERROR: "error"}
+_LEVEL_MARKUP = {
+    DEBUG: "[deep_sky_blue2][[/deep_sky_blue2][purple4]*[/purple4][deep_sky_blue2]][/deep_sky_blue2] [purple4]{}[/purple4]",
+    INFO: "[deep_sky_blue2][[/deep_sky_blue2][green]*[/green][deep_sky_blue2]][/deep_sky_blue2] {}",
+    WARNING: "[deep_sky_blue2][[/deep_sky_blue2][yellow]*[/yellow][deep_sky_blue2]][/deep_sky_blue2] [yellow]{}[/yellow]",
+    ERROR: "[deep_sky_blue2][[/deep_sky_blue2][red]*[/red][deep_sky_blue2]][/deep_sky_blue2] [red]{}[/red]",
+}
+
+_min_level: int = DEBUG if debug_mode else INFO
+
+
+class _LogWriter(threading.Thread):
+    """
+    Schreibt Lognachrichten im Hintergrund: formatiert erst hier, rendert auf die Konsole
+    und hängt jede Nachricht als JSON-Zeile an die Logdatei (mit Rotation nach Größe).
+    Aufrufer legen nur ein Tupel in die Queue und warten nie auf Konsole oder Datei.
+    """
+
+    def __init__(self, path: Optional[str], max_bytes: int, backup_count: int, to_console: bool, maxsize: int):
+        super().__init__(name="echocloud-log", daemon=True)
+        self.queue: "queue.Queue[Optional[Tuple]]" = queue.Queue(maxsize=maxsize)
+        self.path: Optional[str] = path
+        self.max_bytes: int = max_bytes
+        self.backup_count: int = backup_count
+        self.to_console: bool = to_console
+        self.dropped: int = 0
+        self._file = None
+        self._size: int = 0
+
+    def submit(self, record: Tuple):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # Lieber Nachrichten verlieren als den aufrufenden Thread blockieren
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            try:
+                if record is None:
+                    return
+                self._write(*record)
+                if self.dropped and self.queue.empty():
+                    dropped, self.dropped = self.dropped, 0
+                    self._write(time.time(), WARNING, "%d Lognachrichten verworfen (Queue voll)", (dropped,),
+                                self.name, None)
+            except Exception as e:
+                sys.__stderr__.write(f"Fehler im Log-Writer: {e}\n")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, created: float, level: int, text: str, args: tuple, thread: str, fields: Optional[Dict]):
+        if self.to_console:
+            rendered = text % tuple(escape(a) if isinstance(a, str) else a for a in args) if args else text
+            console.print(_LEVEL_MARKUP[level].format(rendered))
+        if self.path:
+            try:
+                plain = Text.from_markup(text).plain
+            except Exception:
+                plain = text
+            if args:
+                plain = plain % args
+            entry = {"ts": datetime.fromtimestamp(created).isoformat(timespec="milliseconds"),
+                     "level": _LEVEL_NAMES[level], "thread": thread, "msg": plain}
+            if fields:
+                entry.update(fields)
+            self._write_line(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def _write_line(self, line: str):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+        data = line.encode("utf-8")
+        if self.max_bytes and self._size + len(data) > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._file.write(line)
+        self._size += len(data)
+        if self.queue.empty():
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+    def stop(self):
+        self.queue.put(None)
+        self.join(timeout=5)
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+_console_output = sys.stdout.isatty() if log_console == "auto" else bool(log_console)
+_writer = _LogWriter(log_file or None, log_max_bytes, log_backup_count, _console_output, log_queue_size)
+_writer.start()
+
+
+def _log(level: int, text: str, args: tuple, fields: Optional[Dict[str, Any]]):
+    if level < _min_level:
+        return
+    _writer.submit((time.time(), level, text, args, threading.current_thread().name, fields))
+
+
+def set_debug(enabled: bool):
+    global _min_level
+    _min_level = DEBUG if enabled else INFO
+
+
+def is_debug() -> bool:
+    return _min_level <= DEBUG
+
+
+def flush_logs():
+    """Wartet, bis alle eingereihten Nachrichten geschrieben sind (z.B. nach einem CLI-Befehl)"""
+    if _writer.is_alive():
+        _writer.queue.join()
+
+
+def shutdown_logging():
+    if _writer.is_alive():
+        flush_logs()
+        _writer.stop()
+
+
+atexit.register(shutdown_logging)
+
+
 def showBanner():
     try:
         with open('./data/banner.txt', 'r') as file:
             banner: AnyStr = file.read()
+        flush_logs()
         console.print(banner, style="deep_sky_blue2")
     except FileNotFoundError:
         pError("banner.txt nicht gefunden in ../data/")
@@ -23,48 +174,47 @@ def showBanner():
         pError(f"Error reading banner: {e}")
 
 def showClientInfo(version: str, servers: str):
+    flush_logs()
     console.print(f"          + -- --=[   EchoCloud Version [yellow4]{version}  [/yellow4]]=-- -- +", style="white")
     console.print(f"          + -- --=[   [yellow4]{servers}[/yellow4] - Server Registriert   ]=-- -- +", style="white")
     print(" ")
 
-def pInfo(text: str):
-    console.print("[deep_sky_blue2][[/deep_sky_blue2][green]*[/green][deep_sky_blue2]][/deep_sky_blue2] " + text)
+# Formatierung erfolgt erst im Writer-Thread: pDebug("Heartbeat von %s", server_id) statt f-Strings.
+# Zusätzliche Keyword-Argumente landen als Felder in der JSON-Logdatei.
+def pInfo(text: str, *args, **fields):
+    _log(INFO, text, args, fields)
 
-def pWarning(text: str):
-    console.print("[deep_sky_blue2][[/deep_sky_blue2][yellow]*[/yellow][deep_sky_blue2]][/deep_sky_blue2] [yellow]" + text + "[/yellow]")
+def pWarning(text: str, *args, **fields):
+    _log(WARNING, text, args, fields)
 
-def pError(text: str):
-    console.print("[deep_sky_blue2][[/deep_sky_blue2][red]*[/red][deep_sky_blue2]][/deep_sky_blue2] [red]" + text + "[/red]")
+def pError(text: str, *args, **fields):
+    _log(ERROR, text, args, fields)
 
-def pDebug(text: str):
-    if debug_mode:
-        console.print("[deep_sky_blue2][[/deep_sky_blue2][purple4]*[/purple4][deep_sky_blue2]][/deep_sky_blue2] [purple4]" + text + "[/purple4]")
+def pDebug(text: str, *args, **fields):
+    _log(DEBUG, text, args, fields)
 
 #hier async nicht vergessen: await asyncInfo(...)
-async def asyncInfo(text: str):
-    async with _console_lock:
-        console.print("[deep_sky_blue2][[/deep_sky_blue2][green]*[/green][deep_sky_blue2]][/deep_sky_blue2] " + text)
+async def asyncInfo(text: str, *args, **fields):
+    _log(INFO, text, args, fields)
 
-async def asyncWarning(text: str):
-    async with _console_lock:
-        console.print("[deep_sky_blue2][[/deep_sky_blue2][yellow]*[/yellow][deep_sky_blue2]][/deep_sky_blue2] [yellow]" + text + "[/yellow]")
+async def asyncWarning(text: str, *args, **fields):
+    _log(WARNING, text, args, fields)
 
-async def asyncError(text: str):
-    async with _console_lock:
-        console.print("[deep_sky_blue2][[/deep_sky_blue2][red]*[/red][deep_sky_blue2]][/deep_sky_blue2] [red]" + text + "[/red]")
+async def asyncError(text: str, *args, **fields):
+    _log(ERROR, text, args, fields)
 
-async def asyncDebug(text: str):
-    if debug_mode:
-        async with _console_lock:
-            console.print("[deep_sky_blue2][[/deep_sky_blue2][purple4]*[/purple4][deep_sky_blue2]][/deep_sky_blue2] [purple4]" + text + "[/purple4]")
+async def asyncDebug(text: str, *args, **fields):
+    _log(DEBUG, text, args, fields)
 
 def pYesNoQuestion(text: str):
     """Stellt dem Benutzer eine Ja-/Nein-Frage im passenden Stil."""
+    flush_logs()
     while True:
         answer = Prompt.ask(f"[blue][[/blue][cyan>?[/cyan][blue]][/blue] [cyan]{text}[/cyan] ([green]j[/green]/[red]n[/red])", choices=["j", "n"], default="n")
         if answer in ["j", "n"]:
             return answer == "j"
 def clearConsole():
+    flush_logs()
     console.clear()
 
 def reset_terminal_force():
@@ -0,0 +1,240 @@
+import itertools
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from core.console import pWarning, pDebug
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+    from core.supervisor import ProcessSupervisor
+
+# Schwellwerte der Log-Level (Minecraft/Log4j)
+LEVELS: Dict[str, int] = {"TRACE": 0, "DEBUG": 1, "INFO": 2, "WARN": 3, "WARNING": 3, "ERROR": 4, "FATAL": 5}
+
+# "[12:34:56 INFO]: ..." (Paper, Velocity) und "[12:34:56] [Server thread/WARN]: ..." (Vanilla)
+_LEVEL_RE = re.compile(r"\[(?:[^\]]*[ /])?(TRACE|DEBUG|INFO|WARN|WARNING|ERROR|FATAL)\]")
+
+LATEST_LOG = "logs/latest.log"
+INITIAL_TAIL_BYTES = 64 * 1024  # Beim ersten Öffnen nur das Ende der Datei lesen
+MAX_READ_BYTES = 1024 * 1024    # Pro Abfrage höchstens so viel lesen, Rest beim nächsten Mal
+
+
+def detect_level(line: str) -> Optional[str]:
+    match = _LEVEL_RE.search(line, 0, 80)
+    if not match:
+        return None
+    level = match.group(1)
+    return "WARN" if level == "WARNING" else level
+
+
+class LogFilter:
+    """Serverseitiger Filter: Regex auf die Zeile und Mindest-Level (Zeilen ohne Level erben das vorherige)"""
+
+    def __init__(self, pattern: Optional[str] = None, level: Optional[str] = None):
+        try:
+            self.pattern: Optional[re.Pattern] = re.compile(pattern) if pattern else None
+        except re.error as e:
+            raise ValueError(f"Ungültiger Regex: {e}")
+        if level and level.upper() not in LEVELS:
+            raise ValueError(f"Ungültiges Level. Erlaubt: {', '.join(LEVELS)}")
+        self.min_level: int = LEVELS[level.upper()] if level else 0
+
+    def matches(self, line: str, level: Optional[str]) -> bool:
+        if self.min_level and LEVELS.get(level or "INFO", 2) < self.min_level:
+            return False
+        return self.pattern is None or self.pattern.search(line) is not None
+
+
+class Subscription:
+    __slots__ = ("id", "server_id", "callback", "filter")
+
+    def __init__(self, subscription_id: int, server_id: str, callback: Callable[[str], None], log_filter: LogFilter):
+        self.id: int = subscription_id
+        self.server_id: str = server_id
+        self.callback: Callable[[str], None] = callback
+        self.filter: LogFilter = log_filter
+
+
+class _Reader:
+    """Gemeinsamer Leser pro Server. Merkt sich die letzten Zeilen (mit Level) für neue Abonnenten"""
+
+    def __init__(self, server: 'Server', backlog: int):
+        self.server: 'Server' = server
+        self.subscribers: List[Subscription] = []
+        self.recent: Deque[Tuple[str, Optional[str]]] = deque(maxlen=backlog)
+        self.last_level: Optional[str] = None
+
+    def classify(self, line: str) -> Optional[str]:
+        level = detect_level(line)
+        if level is not None:
+            self.last_level = level
+        return self.last_level
+
+    def dispatch(self, lines: List[str]):
+        subscribers = list(self.subscribers)
+        for line in lines:
+            level = self.classify(line)
+            self.recent.append((line, level))
+            for subscription in subscribers:
+                if subscription.filter.matches(line, level):
+                    try:
+                        subscription.callback(line)
+                    except Exception as e:
+                        pWarning(f"Fehler beim Weiterreichen der Konsole von {self.server.server_id}: {e}")
+
+
+class _BufferReader(_Reader):
+    """Konsole eines vom Supervisor gestarteten Servers: Zeilen kommen direkt aus dem Ringpuffer"""
+
+    supervised = True
+
+    def __init__(self, server: 'Server', backlog: int):
+        super().__init__(server, backlog)
+        for line in list(server.last_output_lines)[-backlog:]:
+            self.recent.append((line, self.classify(line)))
+
+
+class _FileReader(_Reader):
+    """Liest logs/latest.log inkrementell ab dem gespeicherten Offset (erkennt Rotation über Inode und Größe)"""
+
+    supervised = False
+
+    def __init__(self, server: 'Server', path: Path, backlog: int):
+        super().__init__(server, backlog)
+        self.path: Path = path
+        self.inode: Optional[int] = None
+        self.offset: int = 0
+        self.partial: bytes = b""
+
+    def poll(self) -> List[str]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+        first = self.inode is None
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # Neue Datei (Serverstart, Rotation): von vorne, beim allerersten Mal nur das Ende
+            self.offset = max(0, stat.st_size - INITIAL_TAIL_BYTES) if first else 0
+            self.inode = stat.st_ino
+            self.partial = b""
+        if stat.st_size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(min(stat.st_size - self.offset, MAX_READ_BYTES))
+        skip_first = first and self.offset > 0  # Angeschnittene erste Zeile
+        self.offset += len(data)
+        chunks = (self.partial + data).split(b"\n")
+        self.partial = chunks.pop()
+        if skip_first and chunks:
+            chunks.pop(0)
+        return [chunk.decode("utf-8", errors="replace").rstrip("\r") for chunk in chunks]
+
+
+class ConsoleHub:
+    """
+    Verteilt die Konsolenausgabe der Server an beliebig viele Abonnenten (API-Stream, CLI `logs -f`).
+
+    Pro Server gibt es genau einen Leser, egal wie viele zuschauen: bei Servern unter dem Supervisor
+    die Zeilen aus dem Ringpuffer, sonst logs/latest.log, das ein einzelner Thread für alle Server
+    ab dem gespeicherten Offset weiterliest. Filter (Regex, Level) werden hier angewendet,
+    Callbacks laufen im Leser-Thread und dürfen nicht blockieren.
+    """
+
+    def __init__(self, supervisor: Optional['ProcessSupervisor'] = None, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.poll_interval: float = float(config.get("poll_interval", 0.5))
+        self.backlog: int = max(1, int(config.get("backlog", 200)))
+        self.max_subscribers: int = int(config.get("max_subscribers", 50))
+        self.supervisor: Optional['ProcessSupervisor'] = supervisor
+        self._readers: Dict[str, _Reader] = {}
+        self._lock = threading.RLock()  # Callbacks dürfen unsubscribe() aufrufen
+        self._ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+        if supervisor is not None:
+            supervisor.add_output_listener(self._on_output)
+
+    def _reader_for(self, server: 'Server') -> _Reader:
+        supervised = self.supervisor is not None and self.supervisor.is_supervised(server.server_id)
+        reader = self._readers.get(server.server_id)
+        if reader is None or reader.supervised != supervised or reader.server is not server:
+            if supervised:
+                reader = _BufferReader(server, self.backlog)
+            else:
+                reader = _FileReader(server, Path(server.run_sh_path).parent / LATEST_LOG, self.backlog)
+                reader.dispatch(reader.poll())  # Vorhandenes Ende der Datei als Verlauf
+            if self._readers.get(server.server_id) is not None:
+                reader.subscribers = self._readers[server.server_id].subscribers
+            self._readers[server.server_id] = reader
+        return reader
+
+    def backlog_for(self, server: 'Server', log_filter: Optional[LogFilter] = None,
+                    lines: Optional[int] = None) -> List[str]:
+        """Die letzten Zeilen (gefiltert), ohne zu abonnieren"""
+        if not server.run_sh_path or server.run_sh_path == "Unknown":
+            return []
+        with self._lock:
+            reader = self._reader_for(server)
+            if isinstance(reader, _FileReader) and not reader.subscribers:
+                reader.dispatch(reader.poll())
+            recent = list(reader.recent)
+        log_filter = log_filter or LogFilter()
+        matching = [line for line, level in recent if log_filter.matches(line, level)]
+        return matching[-lines:] if lines else matching
+
+    def subscribe(self, server: 'Server', callback: Callable[[str], None],
+                  log_filter: Optional[LogFilter] = None) -> Subscription:
+        with self._lock:
+            if sum(len(r.subscribers) for r in self._readers.values()) >= self.max_subscribers:
+                raise RuntimeError(f"Zu viele Konsolen-Abonnenten (max. {self.max_subscribers})")
+            reader = self._reader_for(server)
+            subscription = Subscription(next(self._ids), server.server_id, callback, log_filter or LogFilter())
+            reader.subscribers.append(subscription)
+            if isinstance(reader, _FileReader):
+                self._ensure_thread()
+        pDebug("Konsole von %s abonniert (#%d)", server.server_id, subscription.id)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            reader = self._readers.get(subscription.server_id)
+            if reader is not None and subscription in reader.subscribers:
+                reader.subscribers.remove(subscription)
+        pDebug("Konsolen-Abo #%d beendet", subscription.id)
+
+    def forget(self, server: 'Server'):
+        """Server entfernt: Leser (Offset, Verlauf) verwerfen"""
+        with self._lock:
+            self._readers.pop(server.server_id, None)
+
+    def _on_output(self, server: 'Server', line: str):
+        reader = self._readers.get(server.server_id)
+        if reader is not None and reader.supervised and reader.server is server:
+            reader.dispatch([line])
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._poll_loop, name="echocloud-console", daemon=True)
+            self._thread.start()
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                readers = [r for r in self._readers.values() if isinstance(r, _FileReader) and r.subscribers]
+                if not readers:
+                    self._thread = None  # Startet mit dem nächsten Abonnenten neu
+                    return
+                for reader in readers:
+                    try:
+                        lines = reader.poll()
+                    except OSError as e:
+                        pWarning(f"{reader.path} nicht lesbar: {e}")
+                        continue
+                    if lines:
+                        reader.dispatch(lines)
+            time.sleep(self.poll_interval)
@@ -0,0 +1,34 @@
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+from core.console import pWarning
+
+# Event-Namen
+SERVER_REGISTERED = "server_registered"        # server
+SERVER_UNREGISTERED = "server_unregistered"    # server
+SERVER_STATE_CHANGED = "server_state_changed"  # server, old_state, new_state
+SERVER_CRASHED = "server_crashed"              # server, reason
+
+
+class EventBus:
+    """Einfacher synchroner Event-Bus: Callbacks werden im Thread des Aufrufers von emit() ausgeführt"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[..., None]]] = defaultdict(list)
+
+    def subscribe(self, event: str, callback: Callable[..., None]):
+        self._subscribers[event].append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable[..., None]):
+        if callback in self._subscribers[event]:
+            self._subscribers[event].remove(callback)
+
+    def emit(self, event: str, **data):
+        for callback in list(self._subscribers[event]):
+            try:
+                callback(**data)
+            except Exception as e:
+                pWarning(f"Fehler in Event-Handler für '{event}': {e}")
+
+
+events = EventBus()
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.console import pWarning, pDebug
+
+CACHE_VERSION = 1
+UNKNOWN = "Unknown"
+
+# Ende der Datei (enthält das Central Directory mit den CRCs aller Einträge): Grundlage des Inhalts-Hashes
+TAIL_BYTES = 64 * 1024
+
+# Main-Class-Präfix -> Software (Werte von core.server_manager.Software)
+_MAIN_CLASSES: List[Tuple[str, str]] = [
+    ("io.papermc.paperclip.", "Paper"),
+    ("com.destroystokyo.paperclip.", "Paper"),
+    ("io.papermc.", "Paper"),
+    ("com.velocitypowered.", "Velocity"),
+    ("net.md_5.bungee.", "Bungeecord"),
+    ("net.minecraftforge.", "Forge"),
+    ("cpw.mods.", "Forge"),
+    ("org.bukkit.craftbukkit.", "Bukkit"),
+    ("net.minecraft.bundler.", "Vanilla"),
+    ("net.minecraft.server.", "Vanilla"),
+]
+
+# Implementation-Title -> Software (Forks ohne eigenen Eintrag in Software)
+_TITLES: Dict[str, str] = {
+    "paper": "Paper", "purpur": "Paper", "folia": "Paper",
+    "velocity": "Velocity",
+    "bungeecord": "Bungeecord", "waterfall": "Bungeecord",
+    "craftbukkit": "Bukkit", "spigot": "Spigot",
+    "forge": "Forge",
+}
+
+_MC_VERSION_RE = re.compile(r"(\d+\.\d+(?:\.\d+)?)")
+# versions.list: "<sha256>\t<id>\t<pfad>", z.B. "...\tpaper-1.20.4\tpaper-1.20.4.jar"
+_VERSIONS_LIST_RE = re.compile(r"^\S+\t([A-Za-z]+)-([^\t]+)\t", re.MULTILINE)
+
+
+def parse_manifest(data: bytes) -> Dict[str, str]:
+    """META-INF/MANIFEST.MF: 'Key: Value', Fortsetzungszeilen beginnen mit einem Leerzeichen"""
+    manifest: Dict[str, str] = {}
+    key = None
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        if line.startswith(" ") and key:
+            manifest[key] += line[1:]
+        elif ":" in line:
+            key, _, value = line.partition(":")
+            key = key.strip()
+            manifest[key] = value.strip()
+        elif not line.strip():
+            key = None
+            if manifest:
+                break  # Nur die Hauptsektion
+    return manifest
+
+
+def _read_member(jar: zipfile.ZipFile, name: str, limit: int = 256 * 1024) -> Optional[bytes]:
+    try:
+        info = jar.getinfo(name)
+    except KeyError:
+        return None
+    if info.file_size > limit:
+        return None
+    return jar.read(info)
+
+
+def inspect_jar(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Erkennt Software und Version aus dem Inhalt einer Jar, ohne sie zu entpacken: zipfile liest nur das
+    Central Directory und die wenigen benötigten Einträge (MANIFEST.MF, version.json, META-INF/versions.list).
+    """
+    with zipfile.ZipFile(path) as jar:
+        manifest = parse_manifest(_read_member(jar, "META-INF/MANIFEST.MF") or b"")
+        versions_list = (_read_member(jar, "META-INF/versions.list") or b"").decode("utf-8", errors="replace")
+        version_json = _read_member(jar, "version.json")
+
+    software = UNKNOWN
+    main_class = manifest.get("Main-Class", "")
+    for prefix, name in _MAIN_CLASSES:
+        if main_class.startswith(prefix):
+            software = name
+            break
+    title = manifest.get("Implementation-Title", "").lower()
+    if title in _TITLES and (software in (UNKNOWN, "Bukkit") or _TITLES[title] == "Paper"):
+        software = _TITLES[title]
+
+    bundled = _VERSIONS_LIST_RE.search(versions_list)  # Paperclip/Bundler: eigentlicher Server steckt in der Jar
+    if bundled:
+        bundled_name = bundled.group(1).lower()
+        if bundled_name in _TITLES and software in (UNKNOWN, "Bukkit", "Vanilla"):
+            software = _TITLES[bundled_name]
+
+    implementation = manifest.get("Implementation-Version", "")
+    if software == "Bukkit" and "spigot" in implementation.lower():
+        software = "Spigot"
+
+    version = None
+    if software in ("Velocity", "Forge") and implementation:
+        version = implementation.split()[0]
+    elif software == "Bungeecord" and implementation:
+        # "git:BungeeCord-Bootstrap:1.20-R0.3-SNAPSHOT:5f1ba3d:1869"
+        parts = implementation.split(":")
+        version = parts[2] if len(parts) > 2 else implementation
+    elif bundled:
+        version = bundled.group(2)
+    if version is None and version_json:
+        try:
+            info = json.loads(version_json)
+            version = info.get("id") or info.get("name")
+        except ValueError:
+            pass
+    if version is None and implementation:
+        match = _MC_VERSION_RE.search(implementation)
+        version = match.group(1) if match else implementation
+    return software, version
+
+
+class FingerprintStore:
+    """
+    Persistenter Cache der Jar-Erkennung (JSON).
+
+    Schnellzugriff über Pfad, Größe und mtime: unveränderte Jars werden gar nicht geöffnet. Sonst entscheidet
+    ein Hash über Größe und Dateiende (mit dem Central Directory): umbenannte oder kopierte Jars werden
+    über den Inhalt wiedererkannt, nur wirklich neue Jars werden per zipfile untersucht.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path: Optional[Path] = Path(path) if path else None
+        self._files: Dict[str, List] = {}                     # Pfad -> [Größe, mtime_ns, Hash]
+        self._fingerprints: Dict[str, List[Optional[str]]] = {}  # Hash -> [Software, Version]
+        self._lock = threading.Lock()
+        self._dirty: bool = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._files = data.get("files", {})
+                self._fingerprints = data.get("fingerprints", {})
+        except (OSError, ValueError) as e:
+            pWarning(f"Fingerprint-Cache {self.path} nicht lesbar, wird neu aufgebaut: {e}")
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = {"version": CACHE_VERSION, "files": dict(self._files), "fingerprints": dict(self._fingerprints)}
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def content_hash(path: str, size: int) -> str:
+        digest = hashlib.sha256(str(size).encode())
+        with open(path, "rb") as f:
+            f.seek(max(0, size - TAIL_BYTES))
+            digest.update(f.read(TAIL_BYTES))
+        return digest.hexdigest()
+
+    def identify(self, jar_path: Path) -> Tuple[str, Optional[str]]:
+        """(Software-Wert, Version) einer Jar. Unbekannt bzw. nicht lesbar: ('Unknown', None)"""
+        path = os.path.realpath(jar_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return UNKNOWN, None
+
+        known = self._files.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            result = self._fingerprints.get(known[2])
+            if result is not None:
+                return result[0], result[1]
+
+        try:
+            digest = self.content_hash(path, stat.st_size)
+        except OSError:
+            return UNKNOWN, None
+        result = self._fingerprints.get(digest)
+        if result is None:
+            try:
+                result = list(inspect_jar(path))
+            except (OSError, zipfile.BadZipFile) as e:
+                pDebug("Jar %s nicht lesbar: %s", path, e)
+                result = [UNKNOWN, None]
+            pDebug("Jar %s erkannt: %s %s", path, result[0], result[1])
+        with self._lock:
+            self._fingerprints[digest] = result
+            self._files[path] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._dirty = True
+        return result[0], result[1]
@@ -0,0 +1,325 @@
+import heapq
+import json
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import yaml
+
+from core.console import pInfo, pWarning, pError, pDebug
+from core.events import events, SERVER_STATE_CHANGED, SERVER_UNREGISTERED
+from core.memory_budget import ADMITTED, REJECTED
+from core.server_manager import ServerManager, Server, ServerState, Software
+from utils.clone import clone_tree
+
+TEMPLATE_CONFIG = "template.yaml"
+
+
+class PortAllocator:
+    """
+    Vergibt Ports aus einem festen Bereich. Freie Ports liegen in einem Heap (kleinster zuerst),
+    belegte in einem Set, beides O(log n). Vor der Vergabe wird geprüft, ob der Port wirklich frei ist.
+    """
+
+    def __init__(self, start: int, end: int, host: str = "0.0.0.0", probe: bool = True):
+        self.start: int = start
+        self.end: int = end
+        self.host: str = host
+        self.probe: bool = probe
+        self._lock = threading.Lock()
+        self._free: List[int] = list(range(start, end + 1))
+        self._used: Set[int] = set()
+
+    def __contains__(self, port: int) -> bool:
+        return self.start <= port <= self.end
+
+    def reserve(self, port: int):
+        """Markiert einen Port als belegt (z.B. von einem statischen Server)"""
+        with self._lock:
+            self._used.add(port)
+
+    def _is_bindable(self, port: int) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind((self.host, port))
+                return True
+            except OSError:
+                return False
+
+    def allocate(self) -> Optional[int]:
+        with self._lock:
+            busy = []
+            port = None
+            while self._free:
+                candidate = heapq.heappop(self._free)
+                if candidate in self._used:
+                    continue
+                if self.probe and not self._is_bindable(candidate):
+                    busy.append(candidate)  # Fremder Prozess, später erneut versuchen
+                    continue
+                port = candidate
+                self._used.add(port)
+                break
+            for candidate in busy:
+                heapq.heappush(self._free, candidate)
+            return port
+
+    def release(self, port: int):
+        with self._lock:
+            if port in self._used and port in self:
+                self._used.discard(port)
+                heapq.heappush(self._free, port)
+
+
+class Template:
+    """Vorlage eines server_type: Verzeichnis <templates>/<server_type>/ plus optionale template.yaml"""
+
+    def __init__(self, server_type: str, path: Path):
+        self.server_type: str = server_type
+        self.path: Path = path
+        cfg: Dict[str, Any] = {}
+        cfg_path = path / TEMPLATE_CONFIG
+        if cfg_path.exists():
+            with open(cfg_path, "r", encoding="utf-8") as f:
+                cfg = yaml.safe_load(f) or {}
+        self.java_memory: Dict[str, str] = cfg.get("java_memory") or {"Xmx": "1024M", "Xms": "1024M"}
+        self.jar: Optional[str] = cfg.get("jar") or next((p.name for p in sorted(path.glob("*.jar"))), None)
+        self.java_args: str = cfg.get("java_args", "")
+        try:
+            self.software: Software = Software(cfg.get("software", "Unknown"))
+        except ValueError:
+            self.software = Software.UNKNOWN
+        self.software_version: Optional[str] = cfg.get("software_version")
+
+
+class InstanceManager:
+    """
+    Erstellt dynamische Instanzen aus Vorlagen und räumt sie wieder ab.
+
+    Eine Instanz ist ein Klon des Vorlagen-Verzeichnisses (Hardlinks für unveränderliche Dateien wie Jars,
+    sonst Reflink bzw. paralleles Kopieren) mit eigenem Port, generierter run.sh und server.properties.
+    Sie wird nur im Speicher registriert (keine YAML-Config) und nach dem Stoppen gelöscht.
+    """
+
+    def __init__(self, server_manager: ServerManager, config: Optional[Dict[str, Any]] = None,
+                 token_provider: Optional[Callable[[str], Optional[str]]] = None):
+        config = config or {}
+        self.server_manager: ServerManager = server_manager
+        self.template_path: Path = Path(config.get("path", "../Cloud/templates"))
+        self.instance_path: Path = Path(config.get("instance_path", "../Cloud/running/dynamic"))
+        self.hardlink_patterns: List[str] = list(config.get("hardlink") or ["*.jar", "libraries/*", "cache/*"])
+        self.clone_workers: int = int(config.get("clone_workers", 8))
+        self.cleanup_delay: float = float(config.get("cleanup_delay", 10))
+        self.keep_crashed: bool = bool(config.get("keep_crashed", False))
+        self.ip: str = config.get("ip", "127.0.0.1")
+        port_range = config.get("port_range") or [30000, 30999]
+        self.ports: PortAllocator = PortAllocator(int(port_range[0]), int(port_range[1]))
+        self.token_provider: Optional[Callable[[str], Optional[str]]] = token_provider
+        self.instances: Dict[str, Path] = {}  # server_id -> Instanz-Verzeichnis
+        # Letzte vergebene Nummer pro server_type: IDs werden nie wiederverwendet, auch nicht nach einem Neustart
+        self.counter_file: Optional[Path] = Path(config.get("counter_file", "./data/instance_counters.json"))
+        self._counters: Dict[str, int] = self._load_counters()
+        self._templates: Dict[str, Template] = {}
+        self._pending: Set[str] = set()  # IDs, deren Klon gerade erstellt wird
+        self._lock = threading.Lock()
+
+        for server in server_manager.servers:
+            if server.port in self.ports:
+                self.ports.reserve(server.port)
+
+        events.subscribe(SERVER_STATE_CHANGED, self._on_state_changed)
+        events.subscribe(SERVER_UNREGISTERED, self._on_unregistered)
+
+    def is_instance(self, server: Server) -> bool:
+        return server.server_id in self.instances
+
+    def template_for(self, server_type: str) -> Optional[Template]:
+        template = self._templates.get(server_type)
+        if template is None:
+            path = self.template_path / server_type
+            if not path.is_dir():
+                return None
+            template = self._templates[server_type] = Template(server_type, path)
+        return template
+
+    def list_templates(self) -> List[str]:
+        if not self.template_path.is_dir():
+            return []
+        return sorted(p.name for p in self.template_path.iterdir() if p.is_dir())
+
+    def _load_counters(self) -> Dict[str, int]:
+        if not self.counter_file or not self.counter_file.exists():
+            return {}
+        try:
+            with open(self.counter_file, "r", encoding="utf-8") as f:
+                return {str(k): int(v) for k, v in (json.load(f) or {}).items()}
+        except (OSError, ValueError) as e:
+            pWarning(f"Instanz-Zähler {self.counter_file} nicht lesbar: {e}")
+            return {}
+
+    def _save_counters(self):
+        if not self.counter_file:
+            return
+        try:
+            self.counter_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.counter_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._counters, f)
+            os.replace(tmp, self.counter_file)
+        except OSError as e:
+            pWarning(f"Instanz-Zähler {self.counter_file} konnte nicht gespeichert werden: {e}")
+
+    def _next_server_id(self, server_type: str) -> str:
+        """Fortlaufende Nummer pro server_type. Freigewordene IDs werden nicht neu vergeben (Tokens, Metrik-Verlauf)"""
+        index = self._counters.get(server_type, 0) + 1
+        while (f"{server_type}-{index}" in self._pending
+               or self.server_manager.get_server_by_id(f"{server_type}-{index}")
+               or (self.instance_path / server_type / f"{server_type}-{index}").exists()):
+            index += 1
+        self._counters[server_type] = index
+        self._save_counters()
+        return f"{server_type}-{index}"
+
+    def create(self, server_type: str) -> Optional[Server]:
+        """Klont die Vorlage, vergibt einen Port und registriert die Instanz (gestoppt)"""
+        template = self.template_for(server_type)
+        if template is None:
+            pWarning(f"Keine Vorlage für '{server_type}' unter {self.template_path}")
+            return None
+        if not template.jar:
+            pError(f"Vorlage '{server_type}' enthält keine Jar-Datei")
+            return None
+
+        port = self.ports.allocate()
+        if port is None:
+            pError(f"Kein freier Port im Bereich {self.ports.start}-{self.ports.end}")
+            return None
+
+        with self._lock:
+            server_id = self._next_server_id(server_type)
+            self._pending.add(server_id)  # Parallele Aufrufe bekommen eine andere ID
+        target = self.instance_path / server_type / server_id
+
+        started = time.perf_counter()
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            stats = clone_tree(str(template.path), str(target), self.hardlink_patterns, self.clone_workers)
+            (target / TEMPLATE_CONFIG).unlink(missing_ok=True)
+            self._write_properties(target, port)
+            token = self.token_provider(server_id) if self.token_provider else None
+            run_sh = self._write_run_sh(target, server_id, template, token)
+        except Exception as e:
+            pError(f"Instanz {server_id} konnte nicht erstellt werden: {e}")
+            self.ports.release(port)
+            shutil.rmtree(target, ignore_errors=True)
+            self._pending.discard(server_id)
+            return None
+
+        server = Server(
+            server_id=server_id,
+            name=server_id,
+            ip=self.ip,
+            port=port,
+            server_type=server_type,
+            config_path="__DYNAMIC__",
+            java_memory=dict(template.java_memory),
+            server_state=ServerState.OFFLINE,
+            software=template.software,
+            software_version=template.software_version,
+            run_sh_path=str(run_sh.resolve())
+        )
+        self.instances[server_id] = target
+        self._pending.discard(server_id)
+        if not self.server_manager.register_server(server):
+            self._cleanup(server_id, port, target)
+            return None
+
+        pInfo("Instanz %s aus Vorlage %s erstellt (Port %d, %d Dateien: %d Hardlinks, %d Reflinks, %d kopiert, %.2fs)",
+              server_id, server_type, port, stats.files, stats.hardlinked, stats.reflinked, stats.copied,
+              time.perf_counter() - started)
+        return server
+
+    def launch(self, server_type: str) -> Optional[Server]:
+        """Erstellt und startet eine Instanz (Launcher für den Autoscaler)"""
+        server = self.create(server_type)
+        if server is None:
+            return None
+        decision = self.server_manager.start_server(server)
+        if decision == REJECTED or (decision == ADMITTED and server.server_state != ServerState.STARTING):
+            self.server_manager.unregister_server(server)
+            return None
+        return server  # Bei QUEUED startet sie, sobald genug Speicher frei ist
+
+    @staticmethod
+    def _write_properties(target: Path, port: int):
+        """Setzt den Port in server.properties bzw. velocity.toml (bind)"""
+        properties = target / "server.properties"
+        lines = properties.read_text(encoding="utf-8").splitlines() if properties.exists() else []
+        lines = [line for line in lines if not line.startswith("server-port=")]
+        lines.append(f"server-port={port}")
+        properties.unlink(missing_ok=True)  # Falls hart verlinkt: Vorlage nicht verändern
+        properties.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        velocity = target / "velocity.toml"
+        if velocity.exists():
+            content = velocity.read_text(encoding="utf-8")
+            content = re.sub(r'(?m)^bind\s*=\s*"([^":]*):\d+"', lambda m: f'bind = "{m.group(1)}:{port}"', content)
+            velocity.unlink()
+            velocity.write_text(content, encoding="utf-8")
+
+    @staticmethod
+    def _write_run_sh(target: Path, server_id: str, template: Template, token: Optional[str]) -> Path:
+        memory = template.java_memory
+        lines = [
+            "#!/bin/bash",
+            'cd "$(dirname "$0")"',
+            f"export ECHOCLOUD_SERVER_ID={server_id}",
+        ]
+        if token:
+            lines.append(f"export ECHOCLOUD_AUTH_TOKEN={token}")
+        java = f"java -Xms{memory.get('Xms', '1024M')} -Xmx{memory.get('Xmx', '1024M')}"
+        if template.java_args:
+            java += f" {template.java_args}"
+        lines.append(f"screen -dmS {server_id} {java} -jar {template.jar} nogui")
+        run_sh = target / "run.sh"
+        run_sh.unlink(missing_ok=True)
+        run_sh.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        run_sh.chmod(0o755)
+        return run_sh
+
+    def _on_state_changed(self, server: Server, old_state: ServerState, new_state: ServerState):
+        if server.server_id not in self.instances:
+            return
+        if new_state == ServerState.OFFLINE or (new_state == ServerState.CRASHED and not self.keep_crashed):
+            pInfo("Instanz %s ist %s, wird entfernt", server.server_id, new_state.value)
+            self.server_manager.unregister_server(server)
+
+    def _on_unregistered(self, server: Server):
+        target = self.instances.get(server.server_id)
+        if target is not None:
+            self._cleanup(server.server_id, server.port, target)
+
+    def _cleanup(self, server_id: str, port: int, target: Path):
+        """Gibt den Port frei und löscht das Verzeichnis verzögert (JVM schreibt beim Beenden noch)"""
+        self.instances.pop(server_id, None)
+
+        def remove():
+            shutil.rmtree(target, ignore_errors=True)
+            self.ports.release(port)
+            pDebug("Instanz-Verzeichnis %s gelöscht", target)
+
+        timer = threading.Timer(self.cleanup_delay, remove)
+        timer.daemon = True
+        timer.start()
+
+    def shutdown(self, servers: Optional[Iterable[Server]] = None):
+        """Entfernt alle (oder die angegebenen) gestoppten Instanzen sofort"""
+        for server in list(servers or self.server_manager.servers):
+            if server.server_id in self.instances and server.server_state in (ServerState.OFFLINE,
+                                                                                 ServerState.CRASHED):
+                self.server_manager.unregister_server(server)
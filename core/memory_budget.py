@@ -0,0 +1,215 @@
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+MEMINFO_PATH = "/proc/meminfo"
+
+_UNITS_MB = {"": 1 / (1024 * 1024), "K": 1 / 1024, "M": 1, "G": 1024, "T": 1024 * 1024}
+_MEMORY_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*$", re.IGNORECASE)
+
+# Ergebnis von MemoryBudget.admit()
+ADMITTED = "admitted"
+QUEUED = "queued"
+REJECTED = "rejected"
+
+
+def parse_memory_mb(value: Any) -> int:
+    """'2760M', '2G', '512m', '1048576k' -> MB. Reine Zahlen sind Bytes (wie bei -Xmx)"""
+    if isinstance(value, (int, float)):
+        return int(value / (1024 * 1024))
+    match = _MEMORY_RE.match(str(value or ""))
+    if not match:
+        raise ValueError(f"Ungültige Speicherangabe: {value!r}")
+    return int(float(match.group(1)) * _UNITS_MB[match.group(2).upper()])
+
+
+def read_meminfo(path: str = MEMINFO_PATH) -> Dict[str, int]:
+    """MemTotal, MemAvailable, ... in MB"""
+    result = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if parts and parts[0].isdigit():
+                    result[key] = int(parts[0]) // 1024  # Angaben in kB
+    except OSError:
+        pass
+    return result
+
+
+class MemoryBudget:
+    """
+    Zulassung von Serverstarts anhand von java_memory.Xmx.
+
+    Zugesagter Speicher = Summe der Xmx (plus jvm_overhead) aller startenden, laufenden und stoppenden Server,
+    inkrementell über Statuswechsel gepflegt. Ein Start wird zugelassen, wenn er in host_budget passt und
+    MemAvailable aus /proc/meminfo abzüglich reserve reicht. Sonst wartet er (queue) oder wird abgelehnt.
+    Wartende Starts werden nach Priorität abgearbeitet, sobald ein Server Speicher freigibt; mit pack dürfen
+    kleinere Server vorbei, wenn der vorderste noch nicht passt.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, meminfo_path: str = MEMINFO_PATH):
+        config = config or {}
+        self.enabled: bool = bool(config.get("enabled", True))
+        self.meminfo_path: str = meminfo_path
+        self.check_meminfo: bool = bool(config.get("check_meminfo", True))
+        self.reserve_mb: int = parse_memory_mb(config.get("reserve", "1G"))
+        self.jvm_overhead: float = float(config.get("jvm_overhead", 0.15))
+        self.queue_enabled: bool = bool(config.get("queue", True))
+        self.pack: bool = bool(config.get("pack", False))
+        self.priorities: Dict[str, int] = {str(k): int(v) for k, v in (config.get("priorities") or {}).items()}
+
+        budget = parse_memory_mb(config.get("host_budget", 0) or 0)
+        if budget <= 0:  # Standard: 90% des physischen Speichers
+            budget = int(read_meminfo(meminfo_path).get("MemTotal", 0) * 0.9)
+        self.host_budget_mb: int = budget
+
+        self._lock = threading.Lock()
+        self._committed: Dict[str, int] = {}  # server_id -> MB
+        self._committed_total: int = 0
+        self._queue: List[Tuple[int, int, str]] = []  # (-Priorität, Reihenfolge, server_id)
+        self._queued: Dict[str, 'Server'] = {}
+        self._counter = itertools.count()
+        # Gerade zugelassene Starts: die JVM hat ihren Speicher noch nicht belegt, MemAvailable zeigt ihn noch als frei
+        self.startup_grace: float = float(config.get("startup_grace", 60))
+        self._pending: Dict[str, Tuple[int, float]] = {}
+
+    def required_mb(self, server: 'Server') -> int:
+        try:
+            xmx = parse_memory_mb(server.java_memory.get("Xmx", "1024M"))
+        except ValueError:
+            xmx = 1024
+        return int(xmx * (1 + self.jvm_overhead))
+
+    def priority(self, server: 'Server') -> int:
+        from core.server_manager import PROXY_SOFTWARE
+        if server.server_id in self.priorities:
+            return self.priorities[server.server_id]
+        if server.server_type in self.priorities:
+            return self.priorities[server.server_type]
+        return 100 if server.software in PROXY_SOFTWARE else 0
+
+    @property
+    def committed_mb(self) -> int:
+        return self._committed_total
+
+    def queued(self) -> List['Server']:
+        with self._lock:
+            return [self._queued[server_id] for _, _, server_id in sorted(self._queue) if server_id in self._queued]
+
+    def _fits(self, required: int) -> Tuple[bool, str]:
+        if self.host_budget_mb and self._committed_total + required > self.host_budget_mb:
+            return False, (f"Budget: {self._committed_total} + {required} MB > {self.host_budget_mb} MB")
+        if self.check_meminfo:
+            available = read_meminfo(self.meminfo_path).get("MemAvailable")
+            if available is not None:
+                available -= self._pending_mb()
+            if available is not None and required + self.reserve_mb > available:
+                return False, f"MemAvailable: {available} MB, benötigt {required} + {self.reserve_mb} MB Reserve"
+        return True, ""
+
+    def _pending_mb(self) -> int:
+        now = time.monotonic()
+        for server_id in [sid for sid, (_, since) in self._pending.items() if now - since > self.startup_grace]:
+            del self._pending[server_id]
+        return sum(mb for mb, _ in self._pending.values())
+
+    def _commit(self, server: 'Server', required: int, pending: bool = True):
+        self._committed[server.server_id] = required
+        self._committed_total += required
+        if pending:
+            self._pending[server.server_id] = (required, time.monotonic())
+
+    def admit(self, server: 'Server') -> Tuple[str, str]:
+        """Reserviert den Speicher für einen Start. Gibt (ADMITTED|QUEUED|REJECTED, Begründung) zurück"""
+        if not self.enabled:
+            return ADMITTED, ""
+        with self._lock:
+            if server.server_id in self._committed:
+                return ADMITTED, ""
+            required = self.required_mb(server)
+            ok, reason = self._fits(required)
+            self._prune()
+            waiting_first = self._queue and not self.pack and self.priority(server) <= -self._queue[0][0]
+            if ok and not waiting_first:
+                self._commit(server, required)
+                return ADMITTED, ""
+            if not ok and required > self.host_budget_mb > 0:
+                return REJECTED, f"{required} MB übersteigen das gesamte Budget von {self.host_budget_mb} MB"
+            if not self.queue_enabled:
+                return REJECTED, reason
+            if server.server_id not in self._queued:
+                self._queued[server.server_id] = server
+                heapq.heappush(self._queue, (-self.priority(server), next(self._counter), server.server_id))
+            return QUEUED, reason or "Server mit höherer Priorität warten"
+
+    def release(self, server: 'Server') -> List['Server']:
+        """Gibt den Speicher eines gestoppten Servers frei. Gibt die Server zurück, die jetzt starten dürfen"""
+        with self._lock:
+            self._committed_total -= self._committed.pop(server.server_id, 0)
+            self._pending.pop(server.server_id, None)
+            return self._drain()
+
+    def track(self, server: 'Server', active: bool) -> List['Server']:
+        """
+        Bei jedem Statuswechsel: laufende Server (auch ohne admit, z.B. schon vor EchoCloud gestartet) zählen mit,
+        gestoppte geben ihren Speicher frei. Gibt die Server zurück, die jetzt aus der Warteschlange starten dürfen
+        """
+        if not active:
+            return self.release(server)
+        with self._lock:
+            self._queued.pop(server.server_id, None)
+            self._prune()
+            if server.server_id not in self._committed:
+                self._commit(server, self.required_mb(server), pending=False)
+        return []
+
+    def cancel(self, server: 'Server'):
+        with self._lock:
+            self._queued.pop(server.server_id, None)
+            self._prune()
+
+    def _prune(self):
+        """Abgebrochene bzw. inzwischen gestartete Server vom Kopf der Warteschlange entfernen"""
+        while self._queue and self._queue[0][2] not in self._queued:
+            heapq.heappop(self._queue)
+
+    def _drain(self) -> List['Server']:
+        admitted = []
+        skipped = []
+        while self._queue:
+            self._prune()
+            if not self._queue:
+                break
+            entry = self._queue[0]
+            server = self._queued[entry[2]]
+            required = self.required_mb(server)
+            if self._fits(required)[0]:
+                heapq.heappop(self._queue)
+                del self._queued[server.server_id]
+                self._commit(server, required)
+                admitted.append(server)
+                continue
+            if not self.pack:
+                break
+            skipped.append(heapq.heappop(self._queue))  # Kleinere Server dürfen vorbei
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return admitted
+
+    def status(self) -> Dict[str, Any]:
+        meminfo = read_meminfo(self.meminfo_path) if self.check_meminfo else {}
+        return {
+            "committed_mb": self._committed_total,
+            "budget_mb": self.host_budget_mb,
+            "available_mb": meminfo.get("MemAvailable"),
+            "reserve_mb": self.reserve_mb,
+            "queued": [server.server_id for server in self.queued()],
+        }
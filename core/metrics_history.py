@@ -0,0 +1,259 @@
+import base64
+import math
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple, Any
+
+# Metriken, die pro Server aufgezeichnet werden
+METRICS: Tuple[str, ...] = ("tps", "cpu_usage", "ram_usage_mb")
+
+# Auflösung -> (Bucket-Größe in Sekunden, Kapazität). 0 = Rohwerte
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "raw": (0, 720),      # z.B. 2h bei 10s Heartbeat
+    "1m": (60, 1440),     # 24h
+    "10m": (600, 1008),   # 7 Tage
+}
+
+_RANGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_range(value: str) -> int:
+    """Wandelt '30m', '6h', '7d' oder Sekunden in Sekunden um"""
+    value = value.strip().lower()
+    if value.isdigit():
+        seconds = int(value)
+    elif value[:-1].isdigit() and value[-1] in _RANGE_UNITS:
+        seconds = int(value[:-1]) * _RANGE_UNITS[value[-1]]
+    else:
+        raise ValueError(f"Ungültiger Zeitraum '{value}'. Beispiele: 30m, 6h, 7d")
+    if seconds <= 0:
+        raise ValueError("Zeitraum muss größer als 0 sein")
+    return seconds
+
+
+class RingBuffer:
+    """Ringpuffer fester Größe: Zeitstempel als array('d'), Wert-Spalten als array('f')"""
+
+    def __init__(self, capacity: int, columns: List[str]):
+        self.capacity: int = capacity
+        self.columns: List[str] = columns
+        self.timestamps: array = array("d", bytes(8 * capacity))
+        self.values: Dict[str, array] = {c: array("f", bytes(4 * capacity)) for c in columns}
+        self.head: int = 0   # nächste Schreibposition
+        self.count: int = 0
+        self.dirty: bool = False
+
+    def append(self, timestamp: float, row: Dict[str, float]):
+        i = self.head
+        self.timestamps[i] = timestamp
+        for column in self.columns:
+            self.values[column][i] = row[column]
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.dirty = True
+
+    def _ordered(self, data: array) -> array:
+        """Liefert den Inhalt chronologisch sortiert (ältester Eintrag zuerst)"""
+        if self.count < self.capacity:
+            return data[:self.count]
+        return data[self.head:] + data[:self.head]
+
+    def since(self, timestamp: float) -> Tuple[array, Dict[str, array]]:
+        """Alle Einträge ab timestamp als Slices (chronologisch)"""
+        ts = self._ordered(self.timestamps)
+        # Zeitstempel sind monoton steigend -> Binärsuche nach dem ersten passenden Eintrag
+        lo, hi = 0, len(ts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[mid] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return ts[lo:], {c: self._ordered(v)[lo:] for c, v in self.values.items()}
+
+    def oldest(self) -> Optional[float]:
+        if not self.count:
+            return None
+        return self.timestamps[0] if self.count < self.capacity else self.timestamps[self.head]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Kompakte Darstellung für den StorageManager (gepackte Arrays als Base64)"""
+        def pack(data: array) -> str:
+            return base64.b64encode(self._ordered(data).tobytes()).decode("ascii")
+
+        return {
+            "count": self.count,
+            "timestamps": pack(self.timestamps),
+            "values": {c: pack(v) for c, v in self.values.items()},
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        def unpack(typecode: str, raw: Optional[str]) -> array:
+            result = array(typecode)
+            if raw:
+                result.frombytes(base64.b64decode(raw))
+            return result
+
+        timestamps = unpack("d", data.get("timestamps"))
+        values = {c: unpack("f", (data.get("values") or {}).get(c)) for c in self.columns}
+        start = max(0, len(timestamps) - self.capacity)
+        for i in range(start, len(timestamps)):
+            row = {c: values[c][i] if i < len(values[c]) else math.nan for c in self.columns}
+            self.append(timestamps[i], row)
+        self.dirty = False
+
+
+class _Bucket:
+    """Sammelt min/sum/count/max einer Metrik bis der Zeit-Bucket abgeschlossen ist"""
+    __slots__ = ("start", "min", "max", "sum", "count")
+
+    def __init__(self, start: float):
+        self.start: float = start
+        self.min: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+        self.sum: Dict[str, float] = {}
+        self.count: Dict[str, float] = {}
+
+    def add(self, metric: str, lo: float, hi: float, total: float, count: float):
+        if metric in self.count:
+            self.min[metric] = min(self.min[metric], lo)
+            self.max[metric] = max(self.max[metric], hi)
+            self.sum[metric] += total
+            self.count[metric] += count
+        else:
+            self.min[metric] = lo
+            self.max[metric] = hi
+            self.sum[metric] = total
+            self.count[metric] = count
+
+    def row(self) -> Dict[str, float]:
+        row = {}
+        for metric in METRICS:
+            count = self.count.get(metric, 0)
+            row[f"{metric}_min"] = self.min[metric] if count else math.nan
+            row[f"{metric}_avg"] = self.sum[metric] / count if count else math.nan
+            row[f"{metric}_max"] = self.max[metric] if count else math.nan
+            row[f"{metric}_count"] = count
+        return row
+
+
+class MetricsHistory:
+    """
+    Metrik-Verlauf eines Servers in mehreren Auflösungen (roh, 1 Minute, 10 Minuten).
+    Alle Puffer haben eine feste Größe, der Speicherverbrauch bleibt also konstant.
+    """
+
+    def __init__(self):
+        raw_capacity = RESOLUTIONS["raw"][1]
+        self.raw: RingBuffer = RingBuffer(raw_capacity, list(METRICS))
+        aggregate_columns = [f"{m}_{a}" for m in METRICS for a in ("min", "avg", "max", "count")]
+        self.rings: Dict[str, RingBuffer] = {
+            name: RingBuffer(capacity, aggregate_columns)
+            for name, (bucket, capacity) in RESOLUTIONS.items() if bucket
+        }
+        self._buckets: Dict[str, Optional[_Bucket]] = {name: None for name in self.rings}
+
+    def add_sample(self, tps: Optional[float], cpu_usage: Optional[float], ram_usage_mb: Optional[float],
+                   timestamp: Optional[float] = None):
+        now = timestamp if timestamp is not None else time.time()
+        sample = {
+            "tps": math.nan if tps is None else float(tps),
+            "cpu_usage": math.nan if cpu_usage is None else float(cpu_usage),
+            "ram_usage_mb": math.nan if ram_usage_mb is None else float(ram_usage_mb),
+        }
+        self.raw.append(now, sample)
+
+        for name, ring in self.rings.items():
+            bucket_size = RESOLUTIONS[name][0]
+            start = now - (now % bucket_size)
+            bucket = self._buckets[name]
+            if bucket is not None and bucket.start != start:
+                ring.append(bucket.start, bucket.row())
+                bucket = None
+            if bucket is None:
+                bucket = self._buckets[name] = _Bucket(start)
+            for metric, value in sample.items():
+                if not math.isnan(value):
+                    bucket.add(metric, value, value, value, 1)
+
+    def pick_resolution(self, range_seconds: int) -> str:
+        """Feinste Auflösung, deren Puffer den gewünschten Zeitraum noch abdeckt"""
+        for name, (bucket, capacity) in RESOLUTIONS.items():
+            span = capacity * bucket if bucket else None
+            if span is None:
+                oldest = self.raw.oldest()
+                if oldest is None or self.raw.count < self.raw.capacity or time.time() - oldest >= range_seconds:
+                    return name
+            elif span >= range_seconds:
+                return name
+        return "10m"
+
+    def query(self, range_seconds: int, resolution: Optional[str] = None) -> Dict[str, Any]:
+        """Zeitreihe und Aggregate (min/avg/max) der letzten range_seconds"""
+        resolution = resolution or self.pick_resolution(range_seconds)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Ungültige Auflösung '{resolution}'. Erlaubt: {', '.join(RESOLUTIONS)}")
+
+        since = time.time() - range_seconds
+        result: Dict[str, Any] = {"resolution": resolution, "range_seconds": range_seconds}
+
+        if resolution == "raw":
+            timestamps, columns = self.raw.since(since)
+            result["timestamps"] = timestamps.tolist()
+            series = {}
+            aggregates = {}
+            for metric in METRICS:
+                values = columns[metric]
+                series[metric] = [None if math.isnan(v) else round(v, 2) for v in values]
+                present = array("d", (v for v in values if not math.isnan(v)))
+                aggregates[metric] = self._aggregate(present, present, present, None)
+            result["series"] = series
+            result["aggregates"] = aggregates
+            return result
+
+        timestamps, columns = self.rings[resolution].since(since)
+        # Aktuellen (noch offenen) Bucket mit ausgeben, damit die letzten Minuten nicht fehlen
+        bucket = self._buckets[resolution]
+        if bucket is not None and bucket.start >= since:
+            row = bucket.row()
+            timestamps.append(bucket.start)
+            for column in columns:
+                columns[column].append(row[column])
+
+        result["timestamps"] = timestamps.tolist()
+        series = {}
+        aggregates = {}
+        for metric in METRICS:
+            mins, avgs = columns[f"{metric}_min"], columns[f"{metric}_avg"]
+            maxs, counts = columns[f"{metric}_max"], columns[f"{metric}_count"]
+            series[metric] = {
+                "min": [None if math.isnan(v) else round(v, 2) for v in mins],
+                "avg": [None if math.isnan(v) else round(v, 2) for v in avgs],
+                "max": [None if math.isnan(v) else round(v, 2) for v in maxs],
+            }
+            aggregates[metric] = self._aggregate(mins, avgs, maxs, counts)
+        result["series"] = series
+        result["aggregates"] = aggregates
+        return result
+
+    @staticmethod
+    def _aggregate(mins: array, avgs: array, maxs: array, counts: Optional[array]) -> Dict[str, Optional[float]]:
+        if counts is None:
+            if not len(avgs):
+                return {"min": None, "avg": None, "max": None}
+            return {"min": round(min(mins), 2), "avg": round(math.fsum(avgs) / len(avgs), 2),
+                    "max": round(max(maxs), 2)}
+
+        total = math.fsum(counts)
+        if not total:
+            return {"min": None, "avg": None, "max": None}
+        filled = [i for i, c in enumerate(counts) if c]
+        return {
+            "min": round(min(mins[i] for i in filled), 2),
+            "avg": round(math.fsum(avgs[i] * counts[i] for i in filled) / total, 2),
+            "max": round(max(maxs[i] for i in filled), 2),
+        }
+
+    def all_rings(self) -> Dict[str, RingBuffer]:
+        return {"raw": self.raw, **self.rings}
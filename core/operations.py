@@ -0,0 +1,227 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+from core.console import pInfo, pWarning, pError
+from core.events import events, SERVER_STATE_CHANGED
+from core.memory_budget import ADMITTED, QUEUED
+from core.server_manager import ServerManager, ServerState, PROXY_SOFTWARE
+
+if TYPE_CHECKING:
+    from core.instances import InstanceManager
+    from core.server_manager import Server
+
+START = "start"
+STOP = "stop"
+RESTART = "restart"
+
+_DONE_STOPPED = (ServerState.OFFLINE, ServerState.CRASHED)
+
+
+class StateWaiter:
+    """Wartet threadsicher darauf, dass ein Server einen Zielstatus erreicht (Statuswechsel kommen per Heartbeat)"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        events.subscribe(SERVER_STATE_CHANGED, self._on_state_changed)
+
+    def _on_state_changed(self, server: 'Server', old_state: ServerState, new_state: ServerState):
+        with self._condition:
+            self._condition.notify_all()
+
+    def wait_for(self, server: 'Server', states: Iterable[ServerState], timeout: float,
+                 cancelled: Optional[threading.Event] = None) -> bool:
+        states = tuple(states)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while server.server_state not in states:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or (cancelled and cancelled.is_set()):
+                    return False
+                self._condition.wait(min(remaining, 1.0))
+            return True
+
+
+class GroupOperation:
+    """Eine laufende Gruppenoperation (Fortschritt für CLI/Status)"""
+
+    def __init__(self, action: str, label: str, stages: List[List['Server']]):
+        self.action: str = action
+        self.label: str = label
+        self.stages: List[List['Server']] = stages
+        self.total: int = sum(len(stage) for stage in stages)
+        self.done: int = 0
+        self.failed: List[str] = []
+        self.started_at: float = time.monotonic()
+        self.finished: bool = False
+        self.cancelled: threading.Event = threading.Event()
+        self._lock = threading.Lock()
+
+    def record(self, server: 'Server', ok: bool) -> int:
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed.append(server.server_id)
+            return self.done
+
+
+class OperationScheduler:
+    """
+    Startet, stoppt und startet Servergruppen neu, mit höchstens `concurrency` gleichzeitigen Vorgängen.
+
+    Stufen: beim Start zuerst Proxys, dann alle anderen; beim Stoppen und Neustarten erst die Spielserver,
+    Proxys zuletzt. Eine Stufe beginnt erst, wenn alle Server der vorherigen bereit sind (Status aus den Heartbeats)
+    oder ihr Timeout abgelaufen ist. Läuft im Hintergrund, der Prompt bleibt frei.
+    """
+
+    def __init__(self, server_manager: ServerManager, concurrency: int = 4, start_timeout: float = 180.0,
+                 stop_timeout: float = 60.0,
+                 starter: Optional[Callable[['Server'], bool]] = None,
+                 instances: Optional['InstanceManager'] = None):
+        self.server_manager: ServerManager = server_manager
+        self.instances: Optional['InstanceManager'] = instances
+        self.concurrency: int = max(1, concurrency)
+        self.start_timeout: float = start_timeout
+        self.stop_timeout: float = stop_timeout
+        self.starter: Callable[['Server'], bool] = starter or self._start_directly
+        self.waiter: StateWaiter = StateWaiter()
+        self.current: Optional[GroupOperation] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def select(self, scope: str, value: Optional[str] = None) -> List['Server']:
+        """scope = all | group/type <server_type> | server <id>"""
+        if scope == "all":
+            return list(self.server_manager.servers)
+        if scope in ("group", "type") and value:
+            servers, _ = self.server_manager.query_servers(server_types=[value])
+            return servers
+        if scope == "server" and value:
+            server = self.server_manager.get_server_by_id(value)
+            return [server] if server else []
+        raise ValueError("Erlaubt: all | group <typ> | type <typ> | server <id>")
+
+    @staticmethod
+    def stages_for(action: str, servers: List['Server']) -> List[List['Server']]:
+        proxies = [s for s in servers if s.software in PROXY_SOFTWARE]
+        backends = [s for s in servers if s.software not in PROXY_SOFTWARE]
+        stages = [proxies, backends] if action == START else [backends, proxies]
+        return [stage for stage in stages if stage]
+
+    def is_busy(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, action: str, servers: List['Server'], label: str) -> Optional[GroupOperation]:
+        """Startet die Operation im Hintergrund. None, wenn bereits eine läuft"""
+        if self.is_busy():
+            return None
+        if action == START:
+            servers = [s for s in servers if s.server_state in _DONE_STOPPED]
+        else:
+            servers = [s for s in servers if s.server_state not in _DONE_STOPPED]
+
+        operation = GroupOperation(action, label, self.stages_for(action, servers))
+        self.current = operation
+        self._thread = threading.Thread(target=self._run, args=(operation,), name="echocloud-operation",
+                                        daemon=True)
+        self._thread.start()
+        return operation
+
+    def cancel(self) -> bool:
+        """Bricht nach den laufenden Vorgängen ab, offene Server werden nicht mehr angefasst"""
+        if not self.is_busy():
+            return False
+        self.current.cancelled.set()
+        return True
+
+    def _run(self, operation: GroupOperation):
+        pInfo("%s %s: %d Server in %d Stufe(n), max. %d gleichzeitig", operation.action.capitalize(),
+              operation.label, operation.total, len(operation.stages), self.concurrency)
+        handler = {START: self._start_one, STOP: self._stop_one, RESTART: self._restart_one}[operation.action]
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="echocloud-op") as pool:
+                for stage in operation.stages:
+                    if operation.cancelled.is_set():
+                        break
+                    # list() wartet, bis die ganze Stufe fertig ist
+                    list(pool.map(lambda server: self._execute(operation, handler, server), stage))
+        finally:
+            operation.finished = True
+            elapsed = time.monotonic() - operation.started_at
+            if operation.cancelled.is_set():
+                pWarning(f"{operation.action.capitalize()} {operation.label} abgebrochen "
+                         f"({operation.done}/{operation.total} erledigt)")
+            elif operation.failed:
+                pWarning(f"{operation.action.capitalize()} {operation.label} nach {elapsed:.0f}s beendet, "
+                         f"fehlgeschlagen: {', '.join(operation.failed)}")
+            else:
+                pInfo("%s %s abgeschlossen: %d Server in %.0fs", operation.action.capitalize(), operation.label,
+                      operation.total, elapsed)
+
+    def _execute(self, operation: GroupOperation, handler: Callable, server: 'Server'):
+        if operation.cancelled.is_set():
+            return
+        started = time.monotonic()
+        try:
+            ok = handler(server, operation.cancelled)
+        except Exception as e:
+            pError(f"{operation.action} von {server.name} fehlgeschlagen: {e}")
+            ok = False
+        done = operation.record(server, ok)
+        if ok:
+            pInfo("[%d/%d] %s: %s fertig (%.1fs)", done, operation.total, server.name, operation.action,
+                  time.monotonic() - started)
+        else:
+            pWarning(f"[{done}/{operation.total}] {server.name}: {operation.action} fehlgeschlagen "
+                     f"(Status {server.server_state.value})")
+
+    def _start_directly(self, server: 'Server') -> bool:
+        """Start über das Speicherbudget. Ein wartender Start zählt, er kann noch innerhalb des Timeouts loslaufen"""
+        decision = self.server_manager.start_server(server)
+        if decision == QUEUED:
+            return True
+        return decision == ADMITTED and server.server_state == ServerState.STARTING
+
+    def _start_one(self, server: 'Server', cancelled: threading.Event) -> bool:
+        if server.server_state == ServerState.ONLINE:
+            return True
+        if not self.starter(server):
+            return False
+        return self.waiter.wait_for(server, (ServerState.ONLINE,), self.start_timeout, cancelled)
+
+    def _stop_one(self, server: 'Server', cancelled: threading.Event) -> bool:
+        if server.server_state in _DONE_STOPPED:
+            return True
+        server.stop()
+        if server.server_state != ServerState.STOPPING:
+            return False
+        return self.waiter.wait_for(server, _DONE_STOPPED, self.stop_timeout, cancelled)
+
+    def _restart_one(self, server: 'Server', cancelled: threading.Event) -> bool:
+        if self.instances is not None and self.instances.is_instance(server):
+            return self._replace_instance(server, cancelled)
+        return self._stop_one(server, cancelled) and not cancelled.is_set() and self._start_one(server, cancelled)
+
+    def _replace_instance(self, server: 'Server', cancelled: threading.Event) -> bool:
+        """Dynamische Instanzen werden nach dem Stoppen gelöscht: stattdessen neue Instanz derselben Vorlage"""
+        if not self._stop_one(server, cancelled) or cancelled.is_set():
+            return False
+        replacement = self.instances.launch(server.server_type)
+        if replacement is None:
+            return False
+        pInfo("Instanz %s durch %s ersetzt", server.server_id, replacement.server_id)
+        return self.waiter.wait_for(replacement, (ServerState.ONLINE,), self.start_timeout, cancelled)
+
+    def status(self) -> Optional[Dict[str, object]]:
+        operation = self.current
+        if operation is None:
+            return None
+        return {
+            "action": operation.action,
+            "label": operation.label,
+            "done": operation.done,
+            "total": operation.total,
+            "failed": list(operation.failed),
+            "finished": operation.finished,
+            "elapsed": time.monotonic() - operation.started_at,
+        }
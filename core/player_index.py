@@ -0,0 +1,140 @@
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class PlayerEntry:
+    """Wo ein Spieler gerade ist. proxy_id ist der Proxy (Velocity/Bungeecord), server_id der Spielserver"""
+    __slots__ = ("name", "uuid", "server_id", "proxy_id", "joined_at")
+
+    def __init__(self, name: str, uuid: Optional[str] = None):
+        self.name: str = name
+        self.uuid: Optional[str] = uuid
+        self.server_id: Optional[str] = None
+        self.proxy_id: Optional[str] = None
+        self.joined_at: Optional[datetime] = None  # Beitritt auf dem aktuellen Spielserver
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {
+            "name": self.name,
+            "uuid": self.uuid,
+            "server_id": self.server_id,
+            "proxy_id": self.proxy_id,
+            "joined_at": self.joined_at.isoformat() if self.joined_at else None,
+        }
+
+
+class PlayerIndex:
+    """
+    Netzwerkweiter Index Spieler -> Server, inkrementell aus Heartbeats und Join/Leave-Events gepflegt.
+    Lookups über Name (ohne Groß-/Kleinschreibung) oder UUID sind O(1), Zähler werden mitgeführt.
+    Thread-safe, da Heartbeats (API-Loop) und Log-Events (Redis-Worker) parallel eintreffen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, PlayerEntry] = {}
+        self._by_uuid: Dict[str, PlayerEntry] = {}
+        self._on_server: Dict[str, Set[str]] = defaultdict(set)  # server_id -> Namen (lower), auch Proxys
+        self._proxies: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def _entry(self, name: str, uuid: Optional[str]) -> PlayerEntry:
+        key = name.lower()
+        entry = self._by_name.get(key)
+        if entry is None and uuid:
+            entry = self._by_uuid.get(uuid)
+            if entry is not None:  # Namensänderung
+                self._by_name.pop(entry.name.lower(), None)
+                entry.name = name
+        if entry is None:
+            entry = PlayerEntry(name, uuid)
+        self._by_name[key] = entry
+        if uuid and entry.uuid != uuid:
+            if entry.uuid:
+                self._by_uuid.pop(entry.uuid, None)
+            entry.uuid = uuid
+        if entry.uuid:
+            self._by_uuid[entry.uuid] = entry
+        return entry
+
+    def _join(self, server_id: str, name: str, uuid: Optional[str], when: datetime):
+        entry = self._entry(name, uuid)
+        self._on_server[server_id].add(name.lower())
+        if server_id in self._proxies:
+            entry.proxy_id = server_id
+        elif entry.server_id != server_id:
+            # Serverwechsel: Join auf dem neuen Server kann vor dem Leave vom alten eintreffen,
+            # das spätere Leave vom alten Server ändert server_id dann nicht mehr
+            entry.server_id = server_id
+            entry.joined_at = when
+
+    def _leave(self, server_id: str, name: str):
+        key = name.lower()
+        self._on_server[server_id].discard(key)
+        entry = self._by_name.get(key)
+        if entry is None:
+            return
+        if entry.proxy_id == server_id:
+            entry.proxy_id = None
+        if entry.server_id == server_id:
+            entry.server_id = None
+            entry.joined_at = None
+        if entry.server_id is None and entry.proxy_id is None:
+            del self._by_name[key]
+            if entry.uuid:
+                self._by_uuid.pop(entry.uuid, None)
+
+    def set_proxy(self, server_id: str, is_proxy: bool):
+        with self._lock:
+            if is_proxy:
+                self._proxies.add(server_id)
+            else:
+                self._proxies.discard(server_id)
+
+    def join(self, server_id: str, name: str, uuid: Optional[str] = None, when: Optional[datetime] = None):
+        with self._lock:
+            self._join(server_id, name, uuid, when or datetime.now())
+
+    def leave(self, server_id: str, name: str):
+        with self._lock:
+            self._leave(server_id, name)
+
+    def update_server(self, server_id: str, players: Iterable[str]):
+        """Gleicht die Spielerliste eines Heartbeats ab. Kosten nur proportional zur Liste dieses Servers"""
+        now = datetime.now()
+        current = {name.lower(): name for name in players}
+        with self._lock:
+            previous = self._on_server.get(server_id, set())
+            for key in previous - current.keys():
+                self._leave(server_id, key)
+            for key in current.keys() - previous:
+                self._join(server_id, current[key], None, now)
+
+    def clear_server(self, server_id: str):
+        with self._lock:
+            for key in list(self._on_server.pop(server_id, ())):
+                self._leave(server_id, key)
+            self._on_server.pop(server_id, None)
+
+    def find(self, name_or_uuid: str) -> Optional[PlayerEntry]:
+        entry = self._by_uuid.get(name_or_uuid)
+        if entry is None:
+            entry = self._by_name.get(name_or_uuid.lower())
+        return entry
+
+    def players_on(self, server_id: str) -> List[PlayerEntry]:
+        with self._lock:
+            return [self._by_name[key] for key in self._on_server.get(server_id, ()) if key in self._by_name]
+
+    def count(self, server_id: Optional[str] = None) -> int:
+        if server_id is None:
+            return len(self._by_name)
+        return len(self._on_server.get(server_id, ()))
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {server_id: len(names) for server_id, names in self._on_server.items() if names}
@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
+
+from core import telemetry
+from core.console import pInfo, pDebug
+from core.server_manager import ServerManager, ACTIVE_STATES
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+PROC = "/proc"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+JVM_NAMES = {"java"}
+
+
+class ProcStat:
+    """Eine Messung aus /proc/<pid>/stat, statm und io"""
+    __slots__ = ("pid", "start_ticks", "cpu_ticks", "rss_bytes", "threads", "read_bytes", "write_bytes", "time")
+
+    def __init__(self, pid: int, start_ticks: int, cpu_ticks: int, rss_bytes: int, threads: int,
+                 read_bytes: Optional[int], write_bytes: Optional[int], at: float):
+        self.pid: int = pid
+        self.start_ticks: int = start_ticks
+        self.cpu_ticks: int = cpu_ticks
+        self.rss_bytes: int = rss_bytes
+        self.threads: int = threads
+        self.read_bytes: Optional[int] = read_bytes
+        self.write_bytes: Optional[int] = write_bytes
+        self.time: float = at
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except OSError:  # Prozess beendet oder (io) fremder Benutzer
+        return None
+
+
+def read_proc(pid: int, proc: str = PROC, at: Optional[float] = None) -> Optional[ProcStat]:
+    stat = _read(f"{proc}/{pid}/stat")
+    if stat is None:
+        return None
+    # comm steht in Klammern und darf Leerzeichen enthalten: erst ab der letzten ')' trennen
+    fields = stat[stat.rfind(")") + 2:].split()
+    # Ab state (Feld 3) gezählt: utime=14, stime=15, num_threads=20, starttime=22
+    utime, stime, threads, start_ticks = int(fields[11]), int(fields[12]), int(fields[17]), int(fields[19])
+
+    statm = _read(f"{proc}/{pid}/statm")
+    rss_bytes = int(statm.split()[1]) * PAGE_SIZE if statm else 0
+
+    read_bytes = write_bytes = None
+    io = _read(f"{proc}/{pid}/io")
+    if io:
+        for line in io.splitlines():
+            key, _, value = line.partition(":")
+            if key == "read_bytes":
+                read_bytes = int(value)
+            elif key == "write_bytes":
+                write_bytes = int(value)
+    return ProcStat(pid, start_ticks, utime + stime, rss_bytes, threads, read_bytes, write_bytes,
+                    at if at is not None else time.monotonic())
+
+
+class ProcSampler:
+    """
+    Misst CPU, RAM und Platten-I/O aller laufenden Server direkt aus /proc, ohne Plugin und ohne Netzwerk.
+
+    Die JVM eines Servers wird über process_id gefunden (Supervisor) oder über ihr Arbeitsverzeichnis (cwd),
+    das dem Verzeichnis der run.sh entspricht. Den dafür nötigen Durchlauf durch /proc gibt es nur, wenn ein
+    laufender Server noch keine bekannte PID hat, höchstens alle rescan_interval Sekunden. CPU% ergibt sich
+    aus der Differenz zweier Messungen. Werte gehen nur an update_metrics(), wenn das Plugin des Servers
+    gerade keine eigenen Metriken liefert.
+    """
+
+    def __init__(self, server_manager: ServerManager, config: Optional[Dict[str, Any]] = None, proc: str = PROC,
+                 clock: Callable[[], float] = time.monotonic,
+                 on_sample: Optional[Callable[['Server', bool], None]] = None):
+        config = config or {}
+        self.server_manager: ServerManager = server_manager
+        self.proc: str = proc
+        self.enabled: bool = bool(config.get("enabled", True)) and os.path.isdir(proc)
+        self.interval: float = float(config.get("interval", 5))
+        self.rescan_interval: float = float(config.get("rescan_interval", 30))
+        # Plugin-Metriken gelten so lange als aktuell; danach übernimmt /proc
+        self.plugin_stale_after: float = float(config.get("plugin_stale_after", 60))
+        self.normalize_cpu: bool = bool(config.get("normalize_cpu", False))  # 100% = alle Kerne statt einer
+        self._cpus: int = os.cpu_count() or 1
+        self._clock = clock
+        # (server, Metriken übernommen?) nach jeder Messung, z.B. Weitergabe an die API-Worker
+        self.on_sample: Optional[Callable[['Server', bool], None]] = on_sample
+        self._pids: Dict[str, int] = {}            # server_id -> PID der JVM
+        self._last: Dict[str, ProcStat] = {}       # server_id -> vorherige Messung
+        self._last_scan: float = -float("inf")
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="echocloud-procstat", daemon=True)
+        self._thread.start()
+        pInfo("Prozess-Metriken aus /proc aktiv (alle %gs)", self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                pDebug("Fehler beim Lesen von /proc: %s", e)
+
+    @staticmethod
+    def server_dir(server: 'Server') -> Optional[str]:
+        if not server.run_sh_path or server.run_sh_path == "Unknown":
+            return None
+        return os.path.realpath(Path(server.run_sh_path).parent)
+
+    def _scan(self, wanted: Dict[str, str]) -> Dict[str, int]:
+        """Ein Durchlauf durch /proc: JVMs, deren cwd einem der gesuchten Serververzeichnisse entspricht"""
+        found: Dict[str, int] = {}
+        with os.scandir(self.proc) as entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                comm = _read(f"{entry.path}/comm")
+                if comm is None or comm.strip() not in JVM_NAMES:
+                    continue  # screen, bash: gleiches cwd, aber nicht die JVM
+                try:
+                    cwd = os.readlink(f"{entry.path}/cwd")
+                except OSError:
+                    continue
+                server_id = wanted.get(cwd)
+                if server_id is not None and server_id not in found:
+                    found[server_id] = int(entry.name)
+        return found
+
+    def _locate(self, servers: List['Server'], now: float):
+        missing: Dict[str, str] = {}
+        for server in servers:
+            if server.process_id and self._pids.get(server.server_id) != server.process_id:
+                self._pids[server.server_id] = server.process_id
+                self._last.pop(server.server_id, None)
+            if server.server_id not in self._pids:
+                directory = self.server_dir(server)
+                if directory:
+                    missing[directory] = server.server_id
+        if not missing or now - self._last_scan < self.rescan_interval:
+            return
+        self._last_scan = now
+        for server_id, pid in self._scan(missing).items():
+            self._pids[server_id] = pid
+            pDebug("JVM von %s gefunden: PID %d", server_id, pid)
+
+    def tick(self):
+        """Eine Messung für alle laufenden Server"""
+        now = self._clock()
+        servers = [s for s in self.server_manager.servers if s.server_state in ACTIVE_STATES]
+        active: Set[str] = {s.server_id for s in servers}
+        for server_id in [sid for sid in self._pids if sid not in active]:
+            self._pids.pop(server_id, None)
+            self._last.pop(server_id, None)
+            server = self.server_manager.get_server_by_id(server_id)
+            if server is not None:
+                server.process_stats = None  # Gestoppt: keine veralteten Werte behalten bzw. weitergeben
+
+        self._locate(servers, now)
+        for server in servers:
+            pid = self._pids.get(server.server_id)
+            if pid is None:
+                continue
+            sample = read_proc(pid, self.proc, now)
+            previous = self._last.get(server.server_id)
+            if sample is None or (previous and previous.start_ticks != sample.start_ticks):
+                # Prozess beendet bzw. PID neu vergeben: beim nächsten Durchlauf neu suchen
+                self._pids.pop(server.server_id, None)
+                self._last.pop(server.server_id, None)
+                continue
+            self._last[server.server_id] = sample
+            if previous is not None:
+                self._apply(server, previous, sample)
+
+    def _apply(self, server: 'Server', previous: ProcStat, sample: ProcStat):
+        elapsed = sample.time - previous.time
+        if elapsed <= 0:
+            return
+        cpu = (sample.cpu_ticks - previous.cpu_ticks) / CLOCK_TICKS / elapsed * 100
+        if self.normalize_cpu:
+            cpu /= self._cpus
+        ram_mb = sample.rss_bytes / (1024 * 1024)
+        server.process_stats = {
+            "pid": sample.pid,
+            "cpu_usage": round(cpu, 2),
+            "rss_mb": round(ram_mb, 2),
+            "threads": sample.threads,
+            "read_bytes_per_s": self._rate(previous.read_bytes, sample.read_bytes, elapsed),
+            "write_bytes_per_s": self._rate(previous.write_bytes, sample.write_bytes, elapsed),
+        }
+        applied = not self._plugin_reports(server)
+        if applied:
+            server.update_metrics(tps=None, cpu_usage=cpu, ram_usage=ram_mb)  # TPS kennt nur das Plugin
+            telemetry.observe_server(server)
+        if self.on_sample is not None:
+            self.on_sample(server, applied)
+
+    @staticmethod
+    def _rate(before: Optional[int], after: Optional[int], elapsed: float) -> Optional[float]:
+        if before is None or after is None:
+            return None
+        return round(max(0, after - before) / elapsed, 1)
+
+    def _plugin_reports(self, server: 'Server') -> bool:
+        """Liefert das Plugin gerade selbst Metriken (Heartbeat mit TPS)?"""
+        if server.last_seen is None or server.tps is None:
+            return False
+        return (time.time() - server.last_seen.timestamp()) < self.plugin_stale_after
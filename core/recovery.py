@@ -0,0 +1,198 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from core.console import pInfo, pWarning, pError, pDebug
+from core.events import events, SERVER_CRASHED, SERVER_STATE_CHANGED, SERVER_UNREGISTERED
+from core.memory_budget import REJECTED
+from core.server_manager import ServerManager, ServerState
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+NEVER = "never"
+ON_CRASH = "on-crash"
+ALWAYS = "always"
+MODES = (NEVER, ON_CRASH, ALWAYS)
+
+# Berichte pro Server, die im Speicher bleiben
+MAX_REPORTS = 10
+
+
+@dataclass
+class RestartPolicy:
+    """Neustartregeln (settings.yaml -> restart, pro server_type/server_id überschreibbar)"""
+    mode: str = NEVER                 # never | on-crash | always (auch nach Beenden ohne Stop-Befehl)
+    base_delay: float = 5.0           # Wartezeit vor dem ersten Neustart, verdoppelt sich pro Absturz
+    max_delay: float = 300.0
+    jitter: float = 0.2               # +-20% Zufall, damit nicht alle Server gleichzeitig neu starten
+    crash_limit: int = 5              # So viele Abstürze innerhalb von crash_window -> Crash-Loop, Server bleibt aus
+    crash_window: float = 600.0
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], base: Optional['RestartPolicy'] = None) -> 'RestartPolicy':
+        known = {f.name for f in fields(cls)}
+        values = {f.name: getattr(base, f.name) for f in fields(cls)} if base else {}
+        values.update({key: value for key, value in (data or {}).items() if key in known})
+        policy = cls(**values)
+        if policy.mode not in MODES:
+            raise ValueError(f"Ungültiger Neustart-Modus '{policy.mode}'. Erlaubt: {', '.join(MODES)}")
+        return policy
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempt - 1)))
+        return max(0.0, delay * (1 + rng.uniform(-self.jitter, self.jitter)))
+
+
+class CrashReport:
+    __slots__ = ("server_id", "time", "reason", "lines")
+
+    def __init__(self, server_id: str, reason: str, lines: List[str]):
+        self.server_id: str = server_id
+        self.time: datetime = datetime.now()
+        self.reason: str = reason
+        self.lines: List[str] = lines
+
+
+class CrashRecovery:
+    """
+    Startet abgestürzte Server nach ihrer Neustartregel neu.
+
+    Bei jedem Absturz werden die letzten Konsolenzeilen gesichert (Speicher und crash_dir). Der Neustart
+    folgt mit exponentiellem Backoff plus Jitter über einen eigenen Scheduler-Thread, Event-Handler kehren
+    sofort zurück. Stürzt ein Server crash_limit-mal innerhalb von crash_window ab, gilt er als Crash-Loop
+    und bleibt aus, bis er von Hand gestartet wird.
+    """
+
+    def __init__(self, server_manager: ServerManager, config: Optional[Dict[str, Any]] = None,
+                 clock: Callable[[], float] = time.monotonic, rng: Optional[random.Random] = None):
+        config = config or {}
+        self.server_manager: ServerManager = server_manager
+        self.default: RestartPolicy = RestartPolicy.from_dict(config)
+        self.overrides: Dict[str, RestartPolicy] = {
+            str(key): RestartPolicy.from_dict(value, self.default)
+            for key, value in (config.get("overrides") or {}).items()
+        }
+        self.capture_lines: int = int(config.get("capture_lines", 50))
+        crash_dir = config.get("crash_dir", "logs/crashes")
+        self.crash_dir: Optional[Path] = Path(crash_dir) if crash_dir else None
+        self._clock = clock
+        self._rng = rng or random.Random()
+
+        self._crashes: Dict[str, Deque[float]] = defaultdict(deque)
+        self.reports: Dict[str, Deque[CrashReport]] = defaultdict(lambda: deque(maxlen=MAX_REPORTS))
+        self._queue: List[Tuple[float, int, str, Callable[[], None]]] = []  # (fällig, Reihenfolge, server_id, job)
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        events.subscribe(SERVER_CRASHED, self._on_crashed)
+        events.subscribe(SERVER_STATE_CHANGED, self._on_state_changed)
+        events.subscribe(SERVER_UNREGISTERED, self._on_unregistered)
+
+    def policy_for(self, server: 'Server') -> RestartPolicy:
+        return self.overrides.get(server.server_id) or self.overrides.get(server.server_type) or self.default
+
+    def _on_crashed(self, server: 'Server', reason: str):
+        # Ringpuffer sofort kopieren, bevor ein Neustart ihn weiterschreibt; logs/latest.log liest der Scheduler
+        lines = list(server.last_output_lines)[-self.capture_lines:] if self.capture_lines else []
+        self._schedule(0, server.server_id, lambda: self._handle_exit(server, reason, lines, crashed=True))
+
+    def _on_state_changed(self, server: 'Server', old_state: ServerState, new_state: ServerState):
+        if new_state == ServerState.OFFLINE and old_state in (ServerState.STARTING, ServerState.ONLINE):
+            # Beendet ohne Stop-Befehl von EchoCloud (z.B. /stop im Spiel): nur bei mode "always"
+            if self.policy_for(server).mode == ALWAYS:
+                self._schedule(0, server.server_id,
+                               lambda: self._handle_exit(server, "Beendet ohne Stop-Befehl", [], crashed=False))
+
+    def _on_unregistered(self, server: 'Server'):
+        self._crashes.pop(server.server_id, None)
+
+    def _handle_exit(self, server: 'Server', reason: str, lines: List[str], crashed: bool):
+        if crashed:
+            self._record(server, reason, lines)
+        policy = self.policy_for(server)
+        if policy.mode == NEVER or (policy.mode == ON_CRASH and not crashed):
+            return
+        if self.server_manager.get_server_by_id(server.server_id) is not server:
+            return  # Entfernt (z.B. dynamische Instanz)
+
+        now = self._clock()
+        history = self._crashes[server.server_id]
+        history.append(now)
+        while history and now - history[0] > policy.crash_window:
+            history.popleft()
+        if len(history) >= policy.crash_limit:
+            server.crash_looping = True
+            history.clear()
+            pError(f"{server.name} ist {policy.crash_limit}x in {policy.crash_window:.0f}s abgestürzt (Crash-Loop), "
+                   f"kein automatischer Neustart mehr")
+            return
+
+        delay = policy.delay(len(history), self._rng)
+        pWarning(f"{server.name} wird in {delay:.0f}s neu gestartet (Versuch {len(history)}/{policy.crash_limit - 1})")
+        self._schedule(delay, server.server_id, lambda: self._restart(server))
+
+    def _record(self, server: 'Server', reason: str, lines: List[str]):
+        if not lines and self.capture_lines:
+            lines = self.server_manager.console.backlog_for(server, lines=self.capture_lines)
+        report = CrashReport(server.server_id, reason, lines)
+        self.reports[server.server_id].append(report)
+        if self.crash_dir is None:
+            return
+        path = self.crash_dir / f"{server.server_id}-{report.time:%Y%m%d-%H%M%S-%f}.log"
+        try:
+            self.crash_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"# {server.server_id} abgestürzt um {report.time.isoformat(timespec='seconds')}: "
+                            f"{reason}\n" + "\n".join(lines) + "\n", encoding="utf-8")
+            pInfo("Absturzbericht von %s gespeichert: %s", server.server_id, path)
+        except OSError as e:
+            pWarning(f"Absturzbericht {path} konnte nicht geschrieben werden: {e}")
+
+    def _restart(self, server: 'Server'):
+        if self.server_manager.get_server_by_id(server.server_id) is not server or server.crash_looping:
+            return
+        if server.server_state not in (ServerState.OFFLINE, ServerState.CRASHED):
+            pDebug("Neustart von %s übersprungen, Status %s", server.server_id, server.server_state.value)
+            return  # Inzwischen von Hand gestartet
+        pInfo("Automatischer Neustart von %s", server.name)
+        if self.server_manager.start_server(server) == REJECTED:
+            pWarning(f"Automatischer Neustart von {server.name} abgelehnt")
+
+    def reset(self, server: 'Server'):
+        """Crash-Loop aufheben (beim manuellen Start)"""
+        server.crash_looping = False
+        self._crashes.pop(server.server_id, None)
+
+    def _schedule(self, delay: float, server_id: str, job: Callable[[], None]):
+        with self._condition:
+            heapq.heappush(self._queue, (self._clock() + delay, next(self._counter), server_id, job))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="echocloud-recovery", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def pending(self) -> Dict[str, float]:
+        """server_id -> Sekunden bis zum geplanten Neustart"""
+        now = self._clock()
+        with self._condition:
+            return {server_id: max(0.0, due - now) for due, _, server_id, _ in self._queue}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue or self._queue[0][0] > self._clock():
+                    timeout = self._queue[0][0] - self._clock() if self._queue else None
+                    self._condition.wait(timeout)
+                _, _, server_id, job = heapq.heappop(self._queue)
+            try:
+                job()
+            except Exception as e:
+                pError(f"Fehler bei der Absturzbehandlung von {server_id}: {e}")
@@ -0,0 +1,188 @@
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.console import pWarning, pDebug
+
+_XMX_RE = re.compile(r"-Xmx(\d+[MG]?)")
+_XMS_RE = re.compile(r"-Xms(\d+[MG]?)")
+
+# 2: Software-Erkennung über Jar-Manifeste statt Dateinamen, ältere Einträge neu einlesen
+CACHE_VERSION = 2
+
+
+class ScanResult:
+    """Was ein Serververzeichnis hergibt (ohne Server-Objekt, damit es im Cache landen kann)"""
+    __slots__ = ("server_type", "server_id", "run_sh_path", "ip", "port", "java_memory", "software",
+                 "software_version")
+
+    def __init__(self, server_type: str, server_id: str, run_sh_path: str, ip: str = "127.0.0.1", port: int = 25565,
+                 java_memory: Optional[Dict[str, str]] = None, software: str = "Unknown",
+                 software_version: Optional[str] = None):
+        self.server_type: str = server_type
+        self.server_id: str = server_id
+        self.run_sh_path: str = run_sh_path
+        self.ip: str = ip
+        self.port: int = port
+        self.java_memory: Dict[str, str] = java_memory or {"Xmx": "1024M", "Xms": "1024M"}
+        self.software: str = software
+        self.software_version: Optional[str] = software_version
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScanResult':
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+def _stat_key(entry: Optional[os.DirEntry]) -> Optional[Tuple[int, int]]:
+    if entry is None:
+        return None
+    stat = entry.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ServerScanner:
+    """
+    Durchsucht <base>/<server_type>/<server_id>/ nach Servern (run.sh + server.properties).
+
+    Ein os.scandir pro Verzeichnis, die Serververzeichnisse werden parallel untersucht. Ergebnisse landen
+    in einem Cache (JSON) mit Schlüssel aus Inode und mtime des Verzeichnisses sowie mtime/Größe von run.sh,
+    server.properties und den Jars. Bei einem erneuten Scan werden nur geänderte Server neu eingelesen.
+    """
+
+    def __init__(self, detector: Callable[[Path], Tuple[Any, Optional[str]]], cache_path: Optional[str] = None,
+                 workers: int = 16):
+        self.detector: Callable[[Path], Tuple[Any, Optional[str]]] = detector
+        self.cache_path: Optional[Path] = Path(cache_path) if cache_path else None
+        self.workers: int = max(1, workers)
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+        self._load()
+
+    def _load(self):
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._cache = data.get("entries", {})
+        except (OSError, ValueError) as e:
+            pWarning(f"Scan-Cache {self.cache_path} nicht lesbar, wird neu aufgebaut: {e}")
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self._cache}, f)
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def scan(self, base: str) -> List[ScanResult]:
+        self.hits = self.misses = 0
+        with os.scandir(base) as entries:
+            type_dirs = [entry for entry in entries if entry.is_dir()]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="echocloud-scan") as pool:
+            candidates: List[Tuple[str, os.DirEntry]] = []
+            for server_type, server_dirs in pool.map(self._list_type, type_dirs):
+                candidates.extend((server_type, entry) for entry in server_dirs)
+            results = [result for result in pool.map(lambda c: self._inspect(*c), candidates) if result]
+
+        seen = {os.path.abspath(entry.path) for _, entry in candidates}
+        prefix = os.path.abspath(base) + os.sep
+        with self._lock:
+            # Gelöschte Server vergessen
+            for path in [p for p in self._cache if p.startswith(prefix) and p not in seen]:
+                del self._cache[path]
+                self._dirty = True
+        self.save()
+        pDebug("Scan: %d Server, %d aus dem Cache, %d neu eingelesen", len(results), self.hits, self.misses)
+        return sorted(results, key=lambda r: (r.server_type, r.server_id))
+
+    @staticmethod
+    def _list_type(type_dir: os.DirEntry) -> Tuple[str, List[os.DirEntry]]:
+        try:
+            with os.scandir(type_dir.path) as entries:
+                return type_dir.name, [entry for entry in entries if entry.is_dir()]
+        except OSError as e:
+            pWarning(f"Konnte {type_dir.path} nicht lesen: {e}")
+            return type_dir.name, []
+
+    def _inspect(self, server_type: str, server_dir: os.DirEntry) -> Optional[ScanResult]:
+        try:
+            with os.scandir(server_dir.path) as entries:
+                files = {entry.name: entry for entry in entries}
+            run_sh = files.get("run.sh")
+            properties = files.get("server.properties")
+            if run_sh is None or properties is None:
+                return None
+
+            dir_stat = server_dir.stat()
+            key = [dir_stat.st_ino, dir_stat.st_mtime_ns, _stat_key(run_sh), _stat_key(properties),
+                   sorted([name, *_stat_key(entry)] for name, entry in files.items() if name.endswith(".jar"))]
+        except OSError as e:
+            pWarning(f"Konnte {server_dir.path} nicht lesen: {e}")
+            return None
+
+        path = os.path.abspath(server_dir.path)
+        # Über JSON werden Tupel zu Listen: Schlüssel in derselben Form vergleichen
+        key = json.loads(json.dumps(key))
+        cached = self._cache.get(path)
+        if cached is not None and cached.get("key") == key and cached["result"].get("server_type") == server_type:
+            with self._lock:
+                self.hits += 1
+            return ScanResult.from_dict(cached["result"])
+
+        result = self._parse(server_type, Path(server_dir.path), Path(run_sh.path), Path(properties.path))
+        with self._lock:
+            self.misses += 1
+            self._cache[path] = {"key": key, "result": result.to_dict()}
+            self._dirty = True
+        return result
+
+    def _parse(self, server_type: str, server_dir: Path, run_sh: Path, properties: Path) -> ScanResult:
+        result = ScanResult(server_type, server_dir.name, str(run_sh.resolve()))
+
+        software, software_version = self.detector(server_dir)
+        result.software = getattr(software, "value", software)
+        result.software_version = software_version
+
+        try:
+            with open(properties, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("server-ip="):
+                        ip_val = line.split("=", 1)[1].strip()
+                        if ip_val:
+                            result.ip = ip_val
+                    elif line.startswith("server-port="):
+                        port_val = line.split("=", 1)[1].strip()
+                        if port_val.isdigit():
+                            result.port = int(port_val)
+        except Exception as e:
+            pWarning(f"Konnte {properties} nicht lesen: {e}")
+
+        try:
+            with open(run_sh, "r", encoding="utf-8") as f:
+                content = f.read()
+            match_xmx = _XMX_RE.search(content)
+            match_xms = _XMS_RE.search(content)
+            if match_xmx:
+                result.java_memory["Xmx"] = match_xmx.group(1)
+            if match_xms:
+                result.java_memory["Xms"] = match_xms.group(1)
+        except Exception as e:
+            pWarning(f"Konnte {run_sh} nicht lesen: {e}")
+        return result
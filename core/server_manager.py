@@ -1,17 +1,30 @@
+import base64
+import json
 import os
 import re
 import subprocess
 import sys
+import time
+from collections import defaultdict, deque
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Callable, Tuple, Any, Iterable, Deque
 
 import yaml
 from rich.prompt import Prompt
 
-from core import settings, get_section
-from core.console import pError, pWarning, pInfo
+from core import settings, get_section, telemetry
+from core.console import pError, pWarning, pInfo, pDebug
+from core.events import events, SERVER_REGISTERED, SERVER_UNREGISTERED, SERVER_STATE_CHANGED, SERVER_CRASHED
+from core.fingerprint import FingerprintStore
+from core.memory_budget import MemoryBudget, ADMITTED, QUEUED
+from core.console_stream import ConsoleHub
+from core.metrics_history import MetricsHistory
+from core.player_index import PlayerIndex
+from core.scanner import ServerScanner
+from core.server_selector import ServerSelector
+from core.supervisor import ProcessSupervisor
 from utils.storagemanager import StorageManager
 
 
@@ -32,6 +45,37 @@ class Software(Enum):
     UNKNOWN = "Unknown"
 
 
+# screen -S <name> bzw. screen -dmS <name> in der run.sh
+_SCREEN_NAME_RE = re.compile(r"screen\s+(?:-\w+\s+)*-\w*S\s+(\S+)")
+
+# Status, in denen ein Server Speicher belegt
+ACTIVE_STATES: Set['ServerState'] = {ServerState.STARTING, ServerState.ONLINE, ServerState.STOPPING}
+
+# Proxys: Spieler dort sind zusätzlich auf einem Spielserver
+PROXY_SOFTWARE: Set[Software] = {Software.VELOCITY, Software.BUNGEECORD}
+
+# Konsolenzeilen pro Server (Ringpuffer, bei aktivem Supervisor dessen buffer_lines)
+OUTPUT_BUFFER_LINES = 500
+
+
+# Erlaubte Sortierschlüssel für query_servers()
+SORT_KEYS: Dict[str, Callable[['Server'], Any]] = {
+    "server_id": lambda s: s.server_id,
+    "name": lambda s: s.name.lower(),
+    "port": lambda s: s.port,
+    "server_type": lambda s: s.server_type,
+    "software": lambda s: s.software.value,
+    "server_state": lambda s: s.server_state.value,
+    "players": lambda s: len(s.players_online),
+    "tps": lambda s: s.tps,
+    "cpu_usage": lambda s: s.cpu_usage,
+    "ram_usage_mb": lambda s: s.ram_usage_mb,
+}
+
+# Typ des Sortierwerts im Cursor (None wird beim Sortieren zu 0)
+_NUMERIC_SORT_KEYS: Set[str] = {"port", "players", "tps", "cpu_usage", "ram_usage_mb"}
+
+
 class ServerManager:
     def __init__(self, server_config_dir="./data/server_configs", storagemanager: StorageManager = None):
 
@@ -44,7 +88,247 @@ class ServerManager:
         self.server_config_dir: Path = Path(server_config_dir)
         self.servers: List[Server] = []
 
+        # Registry-Indizes, werden bei register_server() und jedem Statuswechsel gepflegt
+        self._servers_by_id: Dict[str, Server] = {}
+        self._index_state: Dict[ServerState, Set[str]] = defaultdict(set)
+        self._index_type: Dict[str, Set[str]] = defaultdict(set)
+        self._index_software: Dict[Software, Set[str]] = defaultdict(set)
+
+        # Netzwerkweiter Spieler-Index (Heartbeats und Join/Leave-Events)
+        self.player_index: PlayerIndex = PlayerIndex()
+        # Zulassung von Starts nach java_memory (settings.yaml -> memory)
+        self.memory_budget: MemoryBudget = MemoryBudget(settings.get("memory", {}) or {})
+
+        # Lastabhängige Serverauswahl pro server_type
+        self.selector: ServerSelector = ServerSelector(get_section("server", "reservation_ttl", 10))
+
+        # Software-Erkennung über den Inhalt der Jars, Ergebnisse pro Jar persistent (settings.yaml -> server.fingerprint_cache)
+        self.fingerprints: FingerprintStore = FingerprintStore(
+            get_section("server", "fingerprint_cache", "./data/jar_fingerprints.json"))
+
+        # Verzeichnis-Scan mit Cache: erneute Scans lesen nur geänderte Server neu ein
+        self.scanner: ServerScanner = ServerScanner(self.detect_server_software,
+                                                    get_section("server", "scan_cache", "./data/scan_cache.json"),
+                                                    get_section("server", "scan_workers", 16))
+
+        # JVMs direkt als Kindprozesse statt über screen (settings.yaml -> supervisor)
+        supervisor = ProcessSupervisor(settings.get("supervisor", {}) or {})
+        self.supervisor: Optional[ProcessSupervisor] = supervisor if supervisor.enabled else None
+        if self.supervisor:
+            self.supervisor.add_exit_listener(self._on_process_exit)
+        # Live-Konsole für API und CLI (ein Leser pro Server)
+        self.console: ConsoleHub = ConsoleHub(self.supervisor, settings.get("console", {}) or {})
+
         self.autoregister()
+        self.load_metrics_history()
+
+    def load_metrics_history(self):
+        """Lädt den gespeicherten Metrik-Verlauf aller Server aus dem StorageManager"""
+        if not self.storagemanager:
+            return
+        for server in self.servers:
+            for resolution, ring in server.metrics_history.all_rings().items():
+                data = self.storagemanager.get_data(f"metrics:{server.server_id}:{resolution}")
+                if data:
+                    ring.load_dict(data)
+
+    def save_metrics_history(self):
+        """Speichert alle seit dem letzten Aufruf geänderten Metrik-Puffer"""
+        if not self.storagemanager:
+            return
+        saved = 0
+        for server in list(self.servers):
+            for resolution, ring in server.metrics_history.all_rings().items():
+                if not ring.dirty:
+                    continue
+                # Vor dem Kopieren zurücksetzen: läuft im Thread, parallel eintreffende Werte bleiben markiert
+                ring.dirty = False
+                if self.storagemanager.store_data(f"metrics:{server.server_id}:{resolution}", ring.to_dict()):
+                    saved += 1
+                else:
+                    ring.dirty = True
+        pDebug("Metrik-Verlauf gespeichert (%d Puffer)", saved)
+
+    def register_server(self, server: 'Server') -> bool:
+        """Nimmt einen Server in die Registry und alle Indizes auf"""
+        if server.server_id in self._servers_by_id:
+            return False
+
+        self.servers.append(server)
+        self._servers_by_id[server.server_id] = server
+        self._index_state[server.server_state].add(server.server_id)
+        self._index_type[server.server_type].add(server.server_id)
+        self._index_software[server.software].add(server.server_id)
+        server.add_state_listener(self._on_server_state_change)
+        server.add_state_listener(telemetry.observe_state)
+        server.supervisor = self.supervisor
+        self.player_index.set_proxy(server.server_id, server.software in PROXY_SOFTWARE)
+        self.selector.update(server)
+        telemetry.observe_state(server, None, server.server_state)
+        telemetry.observe_server(server)
+        events.emit(SERVER_REGISTERED, server=server)
+        return True
+
+    def unregister_server(self, server: 'Server'):
+        """Entfernt einen Server aus der Registry und allen Indizes"""
+        if self._servers_by_id.pop(server.server_id, None) is None:
+            return
+
+        self.servers.remove(server)
+        self._index_state[server.server_state].discard(server.server_id)
+        self._index_type[server.server_type].discard(server.server_id)
+        self._index_software[server.software].discard(server.server_id)
+        server.remove_state_listener(self._on_server_state_change)
+        server.remove_state_listener(telemetry.observe_state)
+        self.player_index.clear_server(server.server_id)
+        self.player_index.set_proxy(server.server_id, False)
+        self.selector.remove(server.server_id)
+        self.console.forget(server)
+        # Wartenden Start verwerfen und zugesagten Speicher freigeben
+        self.memory_budget.cancel(server)
+        for queued in self.memory_budget.release(server):
+            pInfo(f"Genug Speicher frei, starte wartenden Server '{queued.name}'")
+            self._launch(queued)
+        telemetry.forget_server(server)
+        events.emit(SERVER_UNREGISTERED, server=server)
+
+    def _on_server_state_change(self, server: 'Server', old_state: ServerState, new_state: ServerState):
+        self._index_state[old_state].discard(server.server_id)
+        self._index_state[new_state].add(server.server_id)
+        self.selector.update(server)
+        was_active = old_state in ACTIVE_STATES
+        if was_active != (new_state in ACTIVE_STATES):
+            for queued in self.memory_budget.track(server, not was_active):
+                pInfo(f"Genug Speicher frei, starte wartenden Server '{queued.name}'")
+                self._launch(queued)
+        events.emit(SERVER_STATE_CHANGED, server=server, old_state=old_state, new_state=new_state)
+
+    def start_server(self, server: 'Server') -> str:
+        """
+        Startet einen Server, wenn das Speicherbudget des Hosts reicht. Sonst wartet der Start, bis ein anderer
+        Server Speicher freigibt, oder wird abgelehnt. Gibt ADMITTED, QUEUED oder REJECTED zurück
+        """
+        decision, reason = self.memory_budget.admit(server)
+        if decision == QUEUED:
+            pWarning(f"Start von '{server.name}' wartet auf freien Speicher ({reason})")
+        elif decision != ADMITTED:
+            pError(f"Start von '{server.name}' abgelehnt: {reason}")
+        else:
+            self._launch(server)
+        return decision
+
+    def _launch(self, server: 'Server'):
+        server.start()
+        if server.server_state not in ACTIVE_STATES:
+            # Start fehlgeschlagen (z.B. keine run.sh): Speicher gleich an Wartende weitergeben
+            for queued in self.memory_budget.release(server):
+                self._launch(queued)
+
+    def _on_process_exit(self, server: 'Server', returncode: Optional[int], stopping: bool):
+        """Vom Supervisor: JVM beendet. Nach einem Stop-Befehl oder mit Exit-Code 0 OFFLINE, sonst Absturz"""
+        if server.server_state in (ServerState.OFFLINE, ServerState.CRASHED):
+            return  # Schon über Shutdown-Nachricht bzw. Heartbeat erkannt
+        # Exit-Code 0 ohne Stop-Befehl: regulär beendet, z.B. /stop im Spiel
+        crashed = not stopping and server.server_state != ServerState.STOPPING and returncode != 0
+        server.is_running = False
+        server.start_time = None
+        server.players_online = []
+        server.server_state = ServerState.CRASHED if crashed else ServerState.OFFLINE
+        self.runtime_updated(server)
+        if crashed:
+            reason = f"Prozess beendet (Exit-Code {returncode})"
+            pWarning(f"Server {server.server_id} unerwartet abgestürzt ({reason})")
+            events.emit(SERVER_CRASHED, server=server, reason=reason)
+
+    def is_registered(self, server: 'Server') -> bool:
+        """False, wenn der Server inzwischen entfernt wurde (z.B. dynamische Instanz beim Statuswechsel)"""
+        return self._servers_by_id.get(server.server_id) is server
+
+    def runtime_updated(self, server: 'Server'):
+        """Nach jedem Heartbeat bzw. Zurücksetzen der Laufzeitdaten: Spieler-Index und Serverauswahl nachziehen"""
+        if not self.is_registered(server):
+            return  # Sonst landet ein entfernter Server wieder in Index und Serverauswahl
+        self.player_index.update_server(server.server_id, server.players_online)
+        self.selector.update(server)
+
+    def query_servers(self,
+                      states: Optional[Iterable[ServerState]] = None,
+                      server_types: Optional[Iterable[str]] = None,
+                      softwares: Optional[Iterable[Software]] = None,
+                      sort_by: str = "server_id",
+                      descending: bool = False,
+                      cursor: Optional[str] = None,
+                      limit: Optional[int] = None) -> Tuple[List['Server'], Optional[str]]:
+        """
+        Filtert die Registry über die Indizes, sortiert und paginiert das Ergebnis.
+        Gibt die Server der Seite und den Cursor für die nächste Seite zurück (None = letzte Seite).
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Ungültiger Sortierschlüssel '{sort_by}'")
+
+        candidates: Optional[Set[str]] = None
+        for index, values in ((self._index_state, states),
+                              (self._index_type, server_types),
+                              (self._index_software, softwares)):
+            if values is None:
+                continue
+            matched: Set[str] = set()
+            for value in values:
+                matched |= index.get(value, set())
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return [], None
+
+        if candidates is None:
+            servers = list(self.servers)
+        else:
+            servers = [self._servers_by_id[server_id] for server_id in candidates]
+
+        key_func = SORT_KEYS[sort_by]
+
+        def sort_key(s: 'Server') -> tuple:
+            value = key_func(s)
+            # None-Werte immer ans Ende der aufsteigenden Reihenfolge
+            return (value is None, value if value is not None else 0, s.server_id)
+
+        servers.sort(key=sort_key, reverse=descending)
+
+        if cursor:
+            cursor_key = self._decode_cursor(cursor, sort_by)
+            if descending:
+                servers = [s for s in servers if sort_key(s) < cursor_key]
+            else:
+                servers = [s for s in servers if sort_key(s) > cursor_key]
+
+        next_cursor = None
+        if limit is not None and len(servers) > limit:
+            servers = servers[:limit]
+            next_cursor = self._encode_cursor(sort_key(servers[-1]), sort_by)
+
+        return servers, next_cursor
+
+    @staticmethod
+    def _encode_cursor(key: tuple, sort_by: str) -> str:
+        raw = json.dumps([sort_by, list(key)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str) -> tuple:
+        try:
+            cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception:
+            raise ValueError("Ungültiger Cursor")
+        if cursor_sort != sort_by or not isinstance(key, list) or len(key) != 3:
+            raise ValueError("Cursor passt nicht zur Sortierung")
+        is_none, value, server_id = key
+        if sort_by in _NUMERIC_SORT_KEYS:
+            value_ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            value_ok = isinstance(value, str)
+        # Sonst scheitert der Vergleich mit den Sortierschlüsseln an einem TypeError
+        if not isinstance(is_none, bool) or not value_ok or not isinstance(server_id, str):
+            raise ValueError("Ungültiger Cursor")
+        return tuple(key)
 
     def load_server_config(self, config_path: Path) -> Dict:
         with open(config_path, "r") as f:
@@ -86,185 +370,107 @@ class ServerManager:
                 software_version=software_version,
                 run_sh_path=cfg.get("run_sh_path", "Unknown")
             )
-            self.servers.append(server)
+            if not self.register_server(server):
+                pWarning(f"Server-ID '{server_id}' ist bereits registriert, überspringe {cfg_path}.")
+                continue
             version_info = f" v{software_version}" if software_version else ""
             pInfo(f"Server '{server.name}' registriert ({software.value}{version_info}).")
 
     def get_server_by_id(self, server_id: str) -> Optional['Server']:
-        return next((s for s in self.servers if s.server_id == server_id), None)
+        return self._servers_by_id.get(server_id)
 
     def list_servers(self) -> List[str]:
         return [s.name for s in self.servers]
 
     def detect_server_software(self, server_dir: Path) -> tuple[Software, Optional[str]]:
-        jar_files = list(server_dir.glob("*.jar"))
+        """
+        Software und Version aus dem Inhalt der Jars (MANIFEST.MF, version.json, versions.list), nicht aus
+        dem Dateinamen. Ergebnisse kommen aus dem Fingerprint-Cache, bekannte Jars werden nicht geöffnet.
+        Ohne erkennbare Jar entscheiden typische Dateien im Serververzeichnis
+        """
+        for jar_file in sorted(server_dir.glob("*.jar")):
+            software_str, version = self.fingerprints.identify(jar_file)
+            try:
+                software = Software(software_str)
+            except ValueError:
+                software = Software.UNKNOWN
+            if software != Software.UNKNOWN:
+                return software, version or "Unbekannt"
 
         software = Software.UNKNOWN
-        version = "Unbekannt"
-
-        for jar_file in jar_files:
-            jar_name = jar_file.name.lower()
-
-            if "paper" in jar_name:
-                software = Software.PAPER
-                version_match = re.search(r"paper[.-]?(?:api)?[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif "spigot" in jar_name:
-                software = Software.SPIGOT
-                version_match = re.search(r"spigot[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif "bukkit" in jar_name or "craftbukkit" in jar_name:
-                software = Software.BUKKIT
-                version_match = re.search(r"(?:craft)?bukkit[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif "forge" in jar_name:
-                software = Software.FORGE
-                version_match = re.search(r"forge[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif "velocity" in jar_name:
-                software = Software.VELOCITY
-                version_match = re.search(r"velocity[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif "bungeecord" in jar_name or "bungee" in jar_name:
-                software = Software.BUNGEECORD
-                version_match = re.search(r"(?:bungee)?(?:cord)?[.-]?(\d+(?:\.\d+)*(?:[.-]\d+)?)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-            elif jar_name in ["server.jar", "minecraft_server.jar"] or "minecraft_server" in jar_name:
-                software = Software.VANILLA
-                version_match = re.search(r"minecraft_server\.(\d+(?:\.\d+)*)", jar_name)
-                if version_match:
-                    version = version_match.group(1)
-                break
-
-        if software == Software.UNKNOWN:
-            if (server_dir / "spigot.yml").exists():
-                software = Software.SPIGOT
-
-            elif (server_dir / "bukkit.yml").exists():
-                software = Software.BUKKIT
-
-            elif (server_dir / "mods").exists() and (server_dir / "config").exists():
-                software = Software.FORGE
-
-            elif (server_dir / "velocity.toml").exists():
-                software = Software.VELOCITY
-
-            elif (server_dir / "paper.yml").exists() or (server_dir / "config" / "paper-global.yml").exists():
-                software = Software.PAPER
-
-            elif (server_dir / "config.yml").exists():
-                try:
-                    with open(server_dir / "config.yml", "r", encoding="utf-8") as f:
-                        content = f.read()
-                        if "bungeecord" in content.lower() or "proxy" in content.lower():
-                            software = Software.BUNGEECORD
-                except:
-                    pass
-
-        return software, version
-
-    #TODO Funktioniert Aktuell nur für Linux
-    def scan_servers(self):
+        if (server_dir / "spigot.yml").exists():
+            software = Software.SPIGOT
+        elif (server_dir / "bukkit.yml").exists():
+            software = Software.BUKKIT
+        elif (server_dir / "mods").exists() and (server_dir / "config").exists():
+            software = Software.FORGE
+        elif (server_dir / "velocity.toml").exists():
+            software = Software.VELOCITY
+        elif (server_dir / "paper.yml").exists() or (server_dir / "config" / "paper-global.yml").exists():
+            software = Software.PAPER
+        elif (server_dir / "modules.yml").exists() or (server_dir / "waterfall.yml").exists():
+            software = Software.BUNGEECORD
+        return software, "Unbekannt"
+
+    def scan_servers(self, interactive: bool = True, generate_configs: bool = False) -> List['Server']:
+        """
+        Sucht unter base_path/<server_type>/<server_id>/ nach neuen Servern und registriert sie.
+        interactive=False fragt nichts (z.B. für Skripte), Configs nur mit generate_configs.
+        Gibt die neu registrierten Server zurück
+        """
         base = Path(self.base_path)
         if not base.exists():
             pError(f"Base path {base} existiert nicht.")
-            return
+            return []
 
         pInfo(f"Scanne {base} nach Servern...")
+        started = time.perf_counter()
+        try:
+            results = self.scanner.scan(str(base))
+            self.fingerprints.save()
+        except OSError as e:
+            pError(f"Scan von {base} fehlgeschlagen: {e}")
+            return []
 
         found_servers = []  # merken was wir gefunden haben
-
-        for server_type_dir in base.iterdir():
-            if not server_type_dir.is_dir():
+        for result in results:
+            if result.server_id in self._servers_by_id:
                 continue
+            try:
+                software = Software(result.software)
+            except ValueError:
+                software = Software.UNKNOWN
+            server = Server(
+                server_id=result.server_id,
+                name=result.server_id,
+                ip=result.ip,
+                port=result.port,
+                server_type=result.server_type,
+                config_path="__AUTO__",
+                java_memory=dict(result.java_memory),
+                server_state=ServerState.OFFLINE,
+                software=software,
+                software_version=result.software_version,
+                run_sh_path=result.run_sh_path
+            )
+            if not self.register_server(server):
+                continue
+            found_servers.append(server)
 
-            server_type = server_type_dir.name
-
-            for server_dir in server_type_dir.iterdir():
-                if not server_dir.is_dir():
-                    continue
+            version_info = f" v{result.software_version}" if result.software_version else ""
+            pInfo(
+                f"Gefunden: {result.server_type}/{result.server_id} "
+                f"(IP: {result.ip}, Port: {result.port}, RAM: Xmx={result.java_memory['Xmx']} "
+                f"Xms={result.java_memory['Xms']}, Software: {software.value}{version_info})"
+            )
+        pInfo("Scan: %d Verzeichnisse in %.2fs (%d aus dem Cache, %d neu eingelesen)", len(results),
+              time.perf_counter() - started, self.scanner.hits, self.scanner.misses)
 
-                run_sh = server_dir / "run.sh"
-                server_properties = server_dir / "server.properties"
-
-                if run_sh.exists() and server_properties.exists():
-                    # Defaults
-                    ip = "127.0.0.1"
-                    port = 25565
-                    java_memory = {"Xmx": "1024M", "Xms": "1024M"}
-
-                    # Software und Version erkennen
-                    software, software_version = self.detect_server_software(server_dir)
-
-                    try:
-                        with open(server_properties, "r", encoding="utf-8") as f:
-                            for line in f:
-                                line = line.strip()
-                                if line.startswith("server-ip="):
-                                    ip_val = line.split("=", 1)[1].strip()
-                                    if ip_val:
-                                        ip = ip_val
-                                elif line.startswith("server-port="):
-                                    port_val = line.split("=", 1)[1].strip()
-                                    if port_val.isdigit():
-                                        port = int(port_val)
-                    except Exception as e:
-                        pWarning(f"Konnte {server_properties} nicht lesen: {e}")
-
-                    try:
-                        with open(run_sh, "r", encoding="utf-8") as f:
-                            content = f.read()
-                            match_xmx = re.search(r"-Xmx(\d+[MG]?)", content)
-                            match_xms = re.search(r"-Xms(\d+[MG]?)", content)
-                            if match_xmx:
-                                java_memory["Xmx"] = match_xmx.group(1)
-                            if match_xms:
-                                java_memory["Xms"] = match_xms.group(1)
-                    except Exception as e:
-                        pWarning(f"Konnte {run_sh} nicht lesen: {e}")
-
-                    server_id = server_dir.name
-                    server = Server(
-                        server_id=server_id,
-                        name=server_id,
-                        ip=ip,
-                        port=port,
-                        server_type=server_type,
-                        config_path="__AUTO__",
-                        java_memory=java_memory,
-                        server_state=ServerState.OFFLINE,
-                        software=software,
-                        software_version=software_version
-                    )
-                    server.run_sh_path = str(run_sh.resolve())
-
-                    self.servers.append(server)
-                    found_servers.append(server)
-
-                    version_info = f" v{software_version}" if software_version else ""
-                    pInfo(
-                        f"Gefunden: {server_type}/{server_id} "
-                        f"(IP: {ip}, Port: {port}, RAM: Xmx={java_memory['Xmx']} Xms={java_memory['Xms']}, "
-                        f"Software: {software.value}{version_info})"
-                    )
+        if not interactive:
+            if generate_configs:
+                for server in found_servers:
+                    self.generate_config_for_server(server)
+            return found_servers
 
         if found_servers:
             pInfo(f"[+] Insgesamt {len(found_servers)} Server gefunden.")
@@ -286,7 +492,8 @@ class ServerManager:
                 pInfo("OK.")
 
         else:
-            pInfo("Keine Server gefunden.")
+            pInfo("Keine neuen Server gefunden.")
+        return found_servers
 
     def generate_config_for_server(self, server: 'Server'):
         cfg = {
@@ -321,7 +528,8 @@ class Server:
         software_version: Optional[str] = "Unknown",
         run_sh_path: str = None
     ):
-        self.server_state = server_state
+        self._server_state: ServerState = server_state
+        self._state_listeners: List[Callable[['Server', ServerState, ServerState], None]] = []
         self.server_id: str = server_id
         self.name: str = name
         self.ip: str = ip
@@ -346,6 +554,8 @@ class Server:
         self.ram_usage_mb: Optional[float] = None
         self.players_online: List[str] = []
         self.max_players: int = 0
+        self.last_seen: Optional[datetime] = None  # Letzte Heartbeat-Antwort
+        self.crash_looping: bool = False  # Zu oft abgestürzt, kein automatischer Neustart (core/recovery.py)
 
         #  Plugins
         self.plugins: List[str] = []
@@ -353,7 +563,33 @@ class Server:
 
         # Linux
         self.process_id: Optional[int] = None
-        self.last_output_lines: List[str] = []
+        self.process_stats: Optional[Dict[str, Any]] = None  # Aus /proc (core/proc_sampler.py)
+        self.last_output_lines: Deque[str] = deque(maxlen=OUTPUT_BUFFER_LINES)
+        self.supervisor: Optional[ProcessSupervisor] = None  # Gesetzt von ServerManager.register_server()
+
+        # Metrik-Verlauf (Ringpuffer fester Größe)
+        self.metrics_history: MetricsHistory = MetricsHistory()
+
+    @property
+    def server_state(self) -> ServerState:
+        return self._server_state
+
+    @server_state.setter
+    def server_state(self, new_state: ServerState):
+        old_state = self._server_state
+        self._server_state = new_state
+        if old_state != new_state:
+            for listener in list(self._state_listeners):
+                if listener in self._state_listeners:  # Ein früherer Listener kann ihn entfernt haben (unregister)
+                    listener(self, old_state, new_state)
+
+    def add_state_listener(self, listener: Callable[['Server', ServerState, ServerState], None]):
+        """Registriert einen Callback (server, alter_status, neuer_status) für Statuswechsel"""
+        self._state_listeners.append(listener)
+
+    def remove_state_listener(self, listener: Callable[['Server', ServerState, ServerState], None]):
+        if listener in self._state_listeners:
+            self._state_listeners.remove(listener)
 
     def start(self):
 
@@ -361,19 +597,24 @@ class Server:
             pError(f"Keine run.sh für Server '{self.name}' gefunden.")
             return
 
+        if self.supervisor is not None:
+            pid = self.supervisor.start(self)
+            if pid is None:
+                return
+            self.server_state = ServerState.STARTING
+            self.is_running = True
+            self.start_time = datetime.now()
+            pInfo(f"Server '{self.name}' wurde gestartet (PID {pid}).")
+            return
+
         self.is_running = True
         self.start_time = datetime.now()
         pInfo(f"Server '{self.name}' wurde gestartet.")
 
         try:
             # Screen-Name aus run.sh extrahieren
-            with open(self.run_sh_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                match = re.search(r"-S\s+([^\s]+)", content)
-                if match:
-                    self.screen_name = match.group(1)
-                else:
-                    self.screen_name = f"{self.name}"
+            self.screen_name = None
+            self.resolve_screen_name()
 
             # run.sh ausführen
             subprocess.Popen(
@@ -393,12 +634,36 @@ class Server:
 
 
 
+    def resolve_screen_name(self) -> Optional[str]:
+        """
+        Screen-Name aus der run.sh (screen -S/-dmS <name>), sonst der Servername. Auch für Server, die schon
+        vor dem Start von EchoCloud liefen
+        """
+        if getattr(self, "screen_name", None):
+            return self.screen_name
+        if self.run_sh_path == "Unknown":
+            return None
+        try:
+            with open(self.run_sh_path, "r", encoding="utf-8") as f:
+                match = _SCREEN_NAME_RE.search(f.read())
+        except OSError:
+            match = None
+        self.screen_name = match.group(1) if match else f"{self.name}"
+        return self.screen_name
+
     def stop(self):
         self.is_running = False
         self.start_time = None
         pInfo(f"Server '{self.name}' wurde gestoppt.")
 
-        if not hasattr(self, "screen_name") or not self.screen_name:
+        if self.supervisor is not None and self.supervisor.is_supervised(self.server_id):
+            command = "end" if self.software in PROXY_SOFTWARE else "stop"
+            if self.supervisor.stop(self, command):
+                self.server_state = ServerState.STOPPING
+                pInfo(f"Stop-Befehl an Server '{self.name}' (PID {self.process_id}) gesendet.")
+            return
+
+        if not self.resolve_screen_name():
             pError(f"Kein Screen-Name bekannt für '{self.name}', kann nicht stoppen.")
             return
 
@@ -415,7 +680,12 @@ class Server:
             pError(f"Konnte Server '{self.name}' nicht stoppen: {e}")
 
     def send_command(self, *args: str):
-        if not hasattr(self, "screen_name") or not self.screen_name:
+        if self.supervisor is not None and self.supervisor.is_supervised(self.server_id):
+            if self.supervisor.send(self, " ".join(args)):
+                pInfo(f"Befehl '{' '.join(args)}' an Server '{self.name}' (PID {self.process_id}) gesendet.")
+            return
+
+        if not self.resolve_screen_name():
             pError(f"Kein Screen-Name bekannt für '{self.name}', kann Befehl nicht senden.")
             return
 
@@ -429,10 +699,11 @@ class Server:
             pInfo(f"Befehl '{command.strip()}' an Server '{self.name}' (Screen: {self.screen_name}) gesendet.")
         except Exception as e:
             pError(f"Konnte Befehl nicht senden: {e}")
-    def update_metrics(self, tps: float, cpu_usage: float, ram_usage: float):
-        self.tps = round(tps, 2)
+    def update_metrics(self, tps: Optional[float], cpu_usage: float, ram_usage: float):
+        self.tps = round(tps, 2) if tps is not None else None
         self.cpu_usage = round(cpu_usage, 2)
         self.ram_usage_mb = round(ram_usage, 2)
+        self.metrics_history.add_sample(self.tps, self.cpu_usage, self.ram_usage_mb)
 
     def update_players(self, players: List[str], max_players: int):
         self.players_online = players
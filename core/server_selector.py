@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+
+def _least_players(server: 'Server', load: int) -> tuple:
+    return load, server.server_id
+
+
+def _best_tps(server: 'Server', load: int) -> tuple:
+    return -(server.tps or 0.0), load, server.server_id
+
+
+def _fill_first(server: 'Server', load: int) -> tuple:
+    return -load, server.server_id
+
+
+def _weighted(server: 'Server', load: int) -> tuple:
+    # Auslastung relativ zu max_players -> große Server bekommen anteilig mehr Spieler
+    capacity = server.max_players if server.max_players > 0 else 1
+    return load / capacity, load, server.server_id
+
+
+# Strategie -> Sortierschlüssel(server, belegte Plätze). Kleinster Schlüssel gewinnt
+STRATEGIES: Dict[str, Callable[['Server', int], tuple]] = {
+    "least_players": _least_players,
+    "best_tps": _best_tps,
+    "fill_first": _fill_first,
+    "weighted": _weighted,
+}
+
+
+class ServerSelector:
+    """
+    Wählt pro server_type den passenden Server für neue Spieler (Lobby-Verteilung, Matchmaking).
+
+    Pro Gruppe und Strategie liegt ein Heap, der bei jedem Heartbeat einen neuen Eintrag bekommt.
+    Veraltete Einträge werden nicht gesucht, sondern über die Versionsnummer des Servers erkannt und beim
+    Auswählen verworfen (O(log n)). Reservierungen zählen als belegte Plätze, bis der Spieler im Heartbeat
+    auftaucht oder reservation_ttl abläuft, damit gleichzeitige Joins nicht alle auf demselben Server landen.
+    """
+
+    def __init__(self, reservation_ttl: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.reservation_ttl: float = reservation_ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._servers: Dict[str, 'Server'] = {}
+        self._version: Dict[str, int] = {}
+        self._versions = itertools.count(1)  # Global und nie zurückgesetzt: alte Heap-Einträge bleiben ungültig
+        self._group_of: Dict[str, str] = {}  # Nur auswählbare Server
+        self._group_size: Dict[str, int] = defaultdict(int)
+        self._heaps: Dict[str, Dict[str, List[Tuple[tuple, int, str]]]] = defaultdict(
+            lambda: {strategy: [] for strategy in STRATEGIES})
+        self._players: Dict[str, int] = {}
+        self._reservations: Dict[str, Deque[float]] = defaultdict(deque)
+        self._expiry: List[Tuple[float, str]] = []
+        self._draining: Set[str] = set()  # Laufen aus (Autoscaler), bekommen keine neuen Spieler
+
+    @staticmethod
+    def is_selectable(server: 'Server') -> bool:
+        from core.server_manager import ServerState
+        return server.server_state == ServerState.ONLINE and server.is_running
+
+    def _load(self, server_id: str) -> int:
+        return self._players.get(server_id, 0) + len(self._reservations.get(server_id, ()))
+
+    def _push(self, server: 'Server'):
+        """Neue Version des Servers in alle Heaps seiner Gruppe (alte Einträge werden damit ungültig)"""
+        server_id = server.server_id
+        version = next(self._versions)
+        self._version[server_id] = version
+
+        old_group = self._group_of.pop(server_id, None)
+        if old_group is not None:
+            self._group_size[old_group] -= 1
+        if not self.is_selectable(server) or server_id in self._draining:
+            return
+
+        group = server.server_type
+        self._group_of[server_id] = group
+        self._group_size[group] += 1
+        load = self._load(server_id)
+        heaps = self._heaps[group]
+        for strategy, key in STRATEGIES.items():
+            heapq.heappush(heaps[strategy], (key(server, load), version, server_id))
+        self._compact(group)
+
+    def _compact(self, group: str):
+        """Baut Heaps neu auf, wenn veraltete Einträge überwiegen (amortisiert O(1) pro Update)"""
+        live = self._group_size[group]
+        for strategy, heap in self._heaps[group].items():
+            if len(heap) > 2 * live + 16:
+                heap[:] = [entry for entry in heap if self._is_current(entry, group)]
+                heapq.heapify(heap)
+
+    def _is_current(self, entry: Tuple[tuple, int, str], group: str) -> bool:
+        _, version, server_id = entry
+        return self._version.get(server_id) == version and self._group_of.get(server_id) == group
+
+    def _expire_reservations(self):
+        now = self._clock()
+        changed = set()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, server_id = heapq.heappop(self._expiry)
+            pending = self._reservations.get(server_id)
+            if pending and pending[0] <= now:
+                pending.popleft()
+                changed.add(server_id)
+        for server_id in changed:
+            server = self._servers.get(server_id)
+            if server:
+                self._push(server)
+
+    def update(self, server: 'Server'):
+        """Nach jedem Heartbeat/Statuswechsel aufrufen. Neu aufgetauchte Spieler lösen Reservierungen ein"""
+        with self._lock:
+            server_id = server.server_id
+            self._servers[server_id] = server
+            players = len(server.players_online)
+            joined = players - self._players.get(server_id, 0)
+            self._players[server_id] = players
+            pending = self._reservations.get(server_id)
+            while pending and joined > 0:
+                pending.popleft()
+                joined -= 1
+            if not self.is_selectable(server) and pending:
+                pending.clear()
+            self._push(server)
+
+    def remove(self, server_id: str):
+        with self._lock:
+            self._servers.pop(server_id, None)
+            self._version.pop(server_id, None)
+            self._players.pop(server_id, None)
+            self._reservations.pop(server_id, None)
+            self._draining.discard(server_id)
+            group = self._group_of.pop(server_id, None)
+            if group is not None:
+                self._group_size[group] -= 1
+
+    def set_draining(self, server_id: str, draining: bool):
+        with self._lock:
+            if draining:
+                self._draining.add(server_id)
+            else:
+                self._draining.discard(server_id)
+            server = self._servers.get(server_id)
+            if server:
+                self._push(server)
+
+    def reserve(self, server_id: str):
+        with self._lock:
+            server = self._servers.get(server_id)
+            if server is None:
+                return
+            expires = self._clock() + self.reservation_ttl
+            self._reservations[server_id].append(expires)
+            heapq.heappush(self._expiry, (expires, server_id))
+            self._push(server)
+
+    def reserved(self, server_id: str) -> int:
+        return len(self._reservations.get(server_id, ()))
+
+    def select(self, server_type: str, strategy: str = "least_players", reserve: bool = True) -> Optional['Server']:
+        """Bester nicht voller Server der Gruppe oder None. Wirft ValueError bei unbekannter Strategie"""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unbekannte Strategie '{strategy}'. Erlaubt: {', '.join(STRATEGIES)}")
+
+        with self._lock:
+            self._expire_reservations()
+            heap = self._heaps[server_type][strategy] if server_type in self._heaps else []
+            full = []
+            chosen = None
+            while heap:
+                entry = heap[0]
+                if not self._is_current(entry, server_type):
+                    heapq.heappop(heap)
+                    continue
+                server = self._servers[entry[2]]
+                if server.max_players > 0 and self._load(server.server_id) >= server.max_players:
+                    full.append(heapq.heappop(heap))  # Bleibt gültig, nur für diese Auswahl überspringen
+                    continue
+                chosen = server
+                break
+            for entry in full:
+                heapq.heappush(heap, entry)
+
+            if chosen is not None and reserve:
+                self.reserve(chosen.server_id)
+            return chosen
@@ -0,0 +1,225 @@
+import asyncio
+import os
+import re
+import shlex
+import signal
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from core.console import pInfo, pWarning, pError, pDebug
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+# Längste Konsolenzeile, die am Stück gelesen wird (Stacktraces, JSON-Ausgaben von Plugins)
+MAX_LINE_BYTES = 1024 * 1024
+
+_EXPORT_RE = re.compile(r"^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$")
+_JAVA_RE = re.compile(r"(?:^|\s)((?:\S*/)?java\s.*)$")
+
+
+def parse_run_sh(run_sh_path: str) -> Tuple[Optional[List[str]], Dict[str, str]]:
+    """
+    Liest die Java-Befehlszeile und alle `export`-Variablen aus einer run.sh.
+    Ein vorangestelltes `screen -dmS <name>` o.ä. wird abgeschnitten, die JVM läuft direkt.
+    """
+    command = None
+    env: Dict[str, str] = {}
+    with open(run_sh_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            export = _EXPORT_RE.match(line)
+            if export:
+                value = shlex.split(export.group(2))
+                env[export.group(1)] = os.path.expandvars(value[0]) if value else ""
+                continue
+            match = _JAVA_RE.search(line)
+            if match and command is None:
+                tokens = shlex.split(match.group(1).rstrip("&").strip())
+                command = [os.path.expandvars(token) for token in tokens]
+    return command, env
+
+
+class ProcessSupervisor:
+    """
+    Startet die JVMs direkt als Kindprozesse in einer eigenen asyncio-Schleife (eigener Thread) statt über screen.
+
+    stdin bleibt für Konsolenbefehle offen, stdout und stderr werden zeilenweise in den Ringpuffer
+    server.last_output_lines gelesen. Befehle und Logs kosten dadurch keinen Prozessstart mehr.
+    Endet ein Prozess, werden die Exit-Listener (server, returncode, gestoppt) in einem Worker-Thread aufgerufen.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.enabled: bool = bool(config.get("enabled", False))
+        self.buffer_lines: int = max(1, int(config.get("buffer_lines", 1000)))
+        self.stop_timeout: float = float(config.get("stop_timeout", 120))
+        self.kill_timeout: float = float(config.get("kill_timeout", 15))
+        # Eigene Session: Strg+C im EchoCloud-Terminal erreicht die Server nicht
+        self.detach: bool = bool(config.get("detach", True))
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._stopping: Set[str] = set()
+        self._exit_listeners: List[Callable[['Server', Optional[int], bool], None]] = []
+        self._output_listeners: List[Callable[['Server', str], None]] = []
+
+    def add_exit_listener(self, listener: Callable[['Server', Optional[int], bool], None]):
+        self._exit_listeners.append(listener)
+
+    def add_output_listener(self, listener: Callable[['Server', str], None]):
+        """Wird für jede Konsolenzeile im Loop-Thread aufgerufen und darf nicht blockieren"""
+        self._output_listeners.append(listener)
+
+    def is_supervised(self, server_id: str) -> bool:
+        return server_id in self._processes
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="echocloud-supervisor",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def command_for(self, server: 'Server') -> Tuple[Optional[List[str]], Dict[str, str]]:
+        """Java-Befehl aus der run.sh, sonst aus java_memory und der ersten Jar im Serververzeichnis"""
+        command, env = parse_run_sh(server.run_sh_path)
+        if command:
+            return command, env
+        jars = sorted(Path(server.run_sh_path).parent.glob("*.jar"))
+        if not jars:
+            return None, env
+        return ["java", f"-Xms{server.java_memory.get('Xms', '1024M')}",
+                f"-Xmx{server.java_memory.get('Xmx', '1024M')}", "-jar", jars[0].name, "nogui"], env
+
+    def start(self, server: 'Server') -> Optional[int]:
+        """Startet die JVM des Servers und gibt die PID zurück (None bei Fehlern)"""
+        if self.is_supervised(server.server_id):
+            pWarning(f"Server '{server.name}' läuft bereits (PID {server.process_id})")
+            return None
+        try:
+            command, env = self.command_for(server)
+        except OSError as e:
+            pError(f"run.sh von '{server.name}' nicht lesbar: {e}")
+            return None
+        except ValueError as e:  # shlex: z.B. nicht geschlossene Anführungszeichen
+            pError(f"run.sh von '{server.name}' fehlerhaft: {e}")
+            return None
+        if not command:
+            pError(f"Kein Java-Befehl in {server.run_sh_path} und keine Jar-Datei gefunden")
+            return None
+
+        if server.last_output_lines.maxlen != self.buffer_lines:
+            server.last_output_lines = deque(server.last_output_lines, maxlen=self.buffer_lines)
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._spawn(server, command, {**os.environ, **env}), loop)
+        try:
+            return future.result(timeout=30)
+        except Exception as e:
+            pError(f"Konnte Server '{server.name}' nicht starten: {e}")
+            return None
+
+    async def _spawn(self, server: 'Server', command: List[str], env: Dict[str, str]) -> int:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=str(Path(server.run_sh_path).parent),
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,  # Eine Reihenfolge für beide Ströme
+            limit=MAX_LINE_BYTES,
+            start_new_session=self.detach,
+        )
+        self._processes[server.server_id] = process
+        self._stopping.discard(server.server_id)
+        server.process_id = process.pid
+        asyncio.ensure_future(self._pump(server, process))
+        pDebug("Server %s läuft als PID %d: %s", server.server_id, process.pid, " ".join(command))
+        return process.pid
+
+    async def _pump(self, server: 'Server', process: asyncio.subprocess.Process):
+        """Liest die Konsolenausgabe bis EOF in den Ringpuffer und meldet danach das Prozessende"""
+        stream = process.stdout
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:  # Zeile länger als MAX_LINE_BYTES: abgeschnitten übernehmen
+                line = await stream.read(MAX_LINE_BYTES)
+            if not line:
+                break
+            text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+            server.last_output_lines.append(text)
+            for listener in self._output_listeners:
+                try:
+                    listener(server, text)
+                except Exception as e:
+                    pWarning(f"Fehler beim Weiterreichen der Konsole von '{server.name}': {e}")
+
+        returncode = await process.wait()
+        if self._processes.get(server.server_id) is process:
+            del self._processes[server.server_id]
+            server.process_id = None
+        stopping = server.server_id in self._stopping
+        self._stopping.discard(server.server_id)
+        pInfo("Prozess von '%s' beendet (Exit-Code %s)", server.name, returncode)
+        for listener in list(self._exit_listeners):
+            # Nicht im Loop-Thread: Listener dürfen wieder start() aufrufen
+            asyncio.get_running_loop().run_in_executor(None, self._notify, listener, server, returncode, stopping)
+
+    @staticmethod
+    def _notify(listener: Callable, server: 'Server', returncode: Optional[int], stopping: bool):
+        try:
+            listener(server, returncode, stopping)
+        except Exception as e:
+            pWarning(f"Fehler im Exit-Listener für '{server.name}': {e}")
+
+    def send(self, server: 'Server', command: str) -> bool:
+        """Schreibt eine Zeile auf stdin der JVM (ohne Prozessstart, ohne auf den Schreibvorgang zu warten)"""
+        process = self._processes.get(server.server_id)
+        if process is None or self._loop is None:
+            return False
+        data = (command.rstrip("\n") + "\n").encode("utf-8")
+        self._loop.call_soon_threadsafe(self._write, server, process, data)
+        return True
+
+    @staticmethod
+    def _write(server: 'Server', process: asyncio.subprocess.Process, data: bytes):
+        if process.stdin is None or process.stdin.is_closing():
+            pWarning(f"Konsole von '{server.name}' ist geschlossen")
+            return
+        try:
+            process.stdin.write(data)
+        except (BrokenPipeError, ConnectionResetError) as e:
+            pWarning(f"Befehl an '{server.name}' fehlgeschlagen: {e}")
+
+    def stop(self, server: 'Server', command: str = "stop") -> bool:
+        """Sendet den Stop-Befehl. Läuft die JVM nach stop_timeout noch, folgen SIGTERM und SIGKILL"""
+        process = self._processes.get(server.server_id)
+        if process is None:
+            return False
+        self._stopping.add(server.server_id)
+        if not self.send(server, command):
+            return False
+        asyncio.run_coroutine_threadsafe(self._enforce_stop(server, process), self._loop)
+        return True
+
+    async def _enforce_stop(self, server: 'Server', process: asyncio.subprocess.Process):
+        for sig, timeout in ((signal.SIGTERM, self.stop_timeout), (signal.SIGKILL, self.kill_timeout)):
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), timeout)
+                return
+            except asyncio.TimeoutError:
+                pWarning(f"'{server.name}' reagiert nicht, sende {sig.name} an PID {process.pid}")
+                try:
+                    process.send_signal(sig)
+                except ProcessLookupError:
+                    return
@@ -0,0 +1,73 @@
+from typing import TYPE_CHECKING
+
+from utils.prometheus import Gauge, Counter, Histogram
+
+if TYPE_CHECKING:
+    from core.server_manager import Server
+
+# Flotte (pro Server)
+SERVER_TPS = Gauge("echocloud_server_tps", "Ticks pro Sekunde laut letztem Heartbeat", ["server_id", "server_type"])
+SERVER_CPU = Gauge("echocloud_server_cpu_usage_percent", "CPU-Auslastung des Servers", ["server_id", "server_type"])
+SERVER_RAM = Gauge("echocloud_server_ram_usage_megabytes", "RAM-Verbrauch des Servers", ["server_id", "server_type"])
+SERVER_PLAYERS = Gauge("echocloud_server_players", "Spieler online", ["server_id", "server_type"])
+SERVER_MAX_PLAYERS = Gauge("echocloud_server_max_players", "Maximale Spieleranzahl", ["server_id", "server_type"])
+SERVER_STATE = Gauge("echocloud_server_state", "Aktueller Serverstatus (1 = aktiv)", ["server_id", "server_type", "state"])
+
+# Controller
+HEARTBEAT_TICK_SECONDS = Histogram("echocloud_heartbeat_tick_seconds", "Dauer eines Heartbeat-Durchlaufs")
+CONNECTED_CLIENTS = Gauge("echocloud_connected_clients", "Per WebSocket verbundene Server")
+STORAGE_OP_SECONDS = Histogram("echocloud_storage_operation_seconds", "Dauer von StorageManager-Operationen",
+                               ["operation"])
+STORAGE_ERRORS = Counter("echocloud_storage_errors", "Fehlgeschlagene StorageManager-Operationen", ["operation"])
+REDIS_READER_LAG_SECONDS = Gauge("echocloud_redis_reader_lag_seconds",
+                                 "Abstand zwischen Sende-Zeitstempel und Verarbeitung der letzten Redis-Nachricht")
+EVENT_LOOP_LAG_SECONDS = Histogram("echocloud_event_loop_lag_seconds", "Verzögerung des API Event-Loops",
+                                   buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+OUTBOUND_QUEUE_DEPTH = Gauge("echocloud_outbound_queue_depth", "Wartende Nachrichten pro Client", ["server_id"])
+OUTBOUND_LATENCY_SECONDS = Histogram("echocloud_outbound_latency_seconds",
+                                     "Zeit vom Einreihen bis zum Senden einer Nachricht")
+OUTBOUND_COALESCED = Counter("echocloud_outbound_coalesced", "Durch neuere Nachrichten ersetzte Nachrichten")
+OUTBOUND_EVICTIONS = Counter("echocloud_outbound_evictions", "Wegen Rückstau getrennte Clients")
+RATE_LIMITED = Counter("echocloud_rate_limited_requests", "Wegen Rate-Limit abgelehnte Anfragen",
+                       ["server_id", "endpoint"])
+STORAGE_NAMESPACE_BYTES = Gauge("echocloud_storage_namespace_bytes", "Belegter Speicher pro Server-Namespace",
+                                ["server_id"])
+STORAGE_QUOTA_REJECTED = Counter("echocloud_storage_quota_rejected", "Wegen Speicher-Quota abgelehnte Schreibvorgänge",
+                                 ["server_id"])
+MESSAGES_RECEIVED = Counter("echocloud_messages_received", "Empfangene Nachrichten von Servern",
+                            ["transport", "type"])
+MESSAGES_REJECTED = Counter("echocloud_messages_rejected", "Verworfene fehlerhafte Nachrichten von Servern",
+                            ["transport"])
+REDIS_DATA_REQUESTS = Counter("echocloud_redis_data_requests", "Über Redis beantwortete Storage-/Log-Anfragen",
+                              ["type", "code"])
+REDIS_DATA_BATCH_SIZE = Histogram("echocloud_redis_data_batch_size", "Anfragen pro Storage-/Log-Batch im Redis-Modus",
+                                  buckets=(1, 2, 5, 10, 20, 50, 100))
+
+
+def observe_server(server: 'Server'):
+    """Überträgt die Laufzeitwerte eines Servers in die Gauges (nur geänderte Werte werden neu gerendert)"""
+    labels = {"server_id": server.server_id, "server_type": server.server_type}
+    for gauge, value in ((SERVER_TPS, server.tps), (SERVER_CPU, server.cpu_usage), (SERVER_RAM, server.ram_usage_mb)):
+        # Unbekannt (kein Plugin, gestoppt) ist nicht 0: Serie weglassen, sonst feuert jeder "tps < X"-Alarm
+        if value is None or not server.is_running:
+            gauge.remove(**labels)
+        else:
+            gauge.set(value, **labels)
+    SERVER_PLAYERS.set(len(server.players_online), **labels)
+    SERVER_MAX_PLAYERS.set(server.max_players, **labels)
+
+
+def observe_state(server: 'Server', old_state, new_state):
+    """State-Listener: genau ein Status pro Server hat den Wert 1"""
+    labels = {"server_id": server.server_id, "server_type": server.server_type}
+    if old_state is not None:
+        SERVER_STATE.set(0, state=old_state.value, **labels)
+    SERVER_STATE.set(1, state=new_state.value, **labels)
+
+
+def forget_server(server: 'Server'):
+    labels = {"server_id": server.server_id, "server_type": server.server_type}
+    for gauge in (SERVER_TPS, SERVER_CPU, SERVER_RAM, SERVER_PLAYERS, SERVER_MAX_PLAYERS):
+        gauge.remove(**labels)
+    for state in type(server.server_state):
+        SERVER_STATE.remove(state=state.value, **labels)
@@ -19,11 +19,37 @@ from core import (host,
                   storage_table_name,
                   storage_h2_file_path,
                   heartbeat_delay,
+                  heartbeat_min_delay,
+                  heartbeat_max_delay,
+                  heartbeat_missed_limit,
+                  metrics_persist_interval,
+                  operation_concurrency,
+                  operation_start_timeout,
+                  operation_stop_timeout,
                   cert_days,
                   autocert,
                   use_https,
                   redis_channel,
-                  communication_type, redis_user, redis_password)
+                  communication_type, redis_user, redis_password,
+                  redis_data_workers,
+                  redis_data_batch_size,
+                  redis_host,
+                  redis_port,
+                  api_workers,
+                  rpc_timeout,
+                  outbound_queue_size,
+                  outbound_max_lag,
+                  outbound_send_timeout,
+                  ratelimit_config,
+                  autoscaling_config,
+                  templates_config,
+                  restart_config,
+                  process_metrics_config)
+from core.autoscaler import Autoscaler
+from core.instances import InstanceManager
+from core.operations import OperationScheduler
+from core.proc_sampler import ProcSampler
+from core.recovery import CrashRecovery
 from core.console import showClientInfo, showBanner, pInfo, register_reset_at_shutdown
 from core.server_manager import ServerManager
 from utils.storagemanager import StorageManager
@@ -49,8 +75,6 @@ def main():
         except locale.Error:
             pass
 
-    servermanager = ServerManager()
-
     storagemanager = StorageManager(storage_type,
                                     storage_host,
                                     storage_port,
@@ -60,6 +84,8 @@ def main():
                                     storage_table_name,
                                     storage_h2_file_path)
 
+    servermanager = ServerManager(storagemanager=storagemanager)
+
     apimanager = APIManager(storage_manager=storagemanager,
                             server_manager=servermanager,
                             host=host,
@@ -69,17 +95,49 @@ def main():
                             key_file_path=key_file_path,
                             cert_duration_days=cert_days,
                             heartbeat_delay=heartbeat_delay,
+                            heartbeat_min_delay=heartbeat_min_delay,
+                            heartbeat_max_delay=heartbeat_max_delay,
+                            heartbeat_missed_limit=heartbeat_missed_limit,
+                            metrics_persist_interval=metrics_persist_interval,
                             autocert=autocert,
                             use_https=use_https,
                             communication_type=communication_type,
                             redis_channel=redis_channel,
                             redis_user=redis_user,
-                            redis_password=redis_password)
+                            redis_password=redis_password,
+                            redis_data_workers=redis_data_workers,
+                            redis_data_batch_size=redis_data_batch_size,
+                            redis_host=redis_host,
+                            redis_port=redis_port,
+                            api_workers=api_workers,
+                            rpc_timeout=rpc_timeout,
+                            outbound_queue_size=outbound_queue_size,
+                            outbound_max_lag=outbound_max_lag,
+                            outbound_send_timeout=outbound_send_timeout,
+                            ratelimit_config=ratelimit_config)
 
     if auto_api:
         apimanager.start_in_thread()
 
-    commandmanager = CommandManager(servermanager, apimanager, storagemanager)
+    instances = InstanceManager(servermanager, templates_config, token_provider=apimanager.ensure_auth_token)
+
+    autoscaler = Autoscaler(servermanager, autoscaling_config, launcher=instances.launch)
+    if autoscaler.enabled:
+        autoscaler.start()
+
+    operations = OperationScheduler(servermanager,
+                                    concurrency=operation_concurrency,
+                                    start_timeout=operation_start_timeout,
+                                    stop_timeout=operation_stop_timeout,
+                                    instances=instances)
+
+    recovery = CrashRecovery(servermanager, restart_config)
+
+    sampler = ProcSampler(servermanager, process_metrics_config, on_sample=apimanager.publish_process_stats)
+    sampler.start()
+
+    commandmanager = CommandManager(servermanager, apimanager, storagemanager, autoscaler, instances, operations,
+                                    recovery)
 
     # Setup prompt_toolkit instead of readline
     echo_prompt = setup_prompt_toolkit(commandmanager)
@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_value(value: float) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Sammelt alle Metriken und setzt die Exposition aus den zwischengespeicherten Blöcken zusammen"""
+
+    def __init__(self):
+        self._metrics: List['Metric'] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: 'Metric'):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Metrik '{metric.name}' ist bereits registriert")
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    """
+    Basisklasse. Jede Label-Kombination wird einzeln gerendert und zwischengespeichert;
+    bei einem Scrape werden nur geänderte Kombinationen neu formatiert.
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+        self._rendered: Dict[tuple, str] = {}
+        self._dirty: Set[tuple] = set()
+        self._block: Optional[str] = None
+        self._header = f"# HELP {name} {_escape(documentation)}\n# TYPE {name} {self.type_name}\n"
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} erwartet die Labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_str(self, key: tuple, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def _mark(self, key: tuple):
+        self._dirty.add(key)
+        self._block = None
+
+    def remove(self, **labels):
+        key = self._key(labels)
+        with self._lock:
+            if self._values.pop(key, None) is not None:
+                self._rendered.pop(key, None)
+                self._dirty.discard(key)
+                self._block = None
+
+    def _render_child(self, key: tuple, value) -> str:
+        return f"{self.name}{self._label_str(key)} {_format_value(value)}\n"
+
+    def render(self) -> str:
+        with self._lock:
+            if self._block is None:
+                for key in self._dirty:
+                    if key in self._values:
+                        self._rendered[key] = self._render_child(key, self._values[key])
+                self._dirty.clear()
+                self._block = self._header + "".join(self._rendered.values())
+            return self._block
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            if self._values.get(key) != value:
+                self._values[key] = value
+                self._mark(key)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._mark(key)
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = REGISTRY):
+        if not name.endswith("_total"):
+            name += "_total"
+        super().__init__(name, documentation, labelnames, registry)
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counter können nur erhöht werden")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+            self._mark(key)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self, size: int):
+        self.buckets: List[int] = [0] * size
+        self.sum: float = 0.0
+        self.count: int = 0
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[MetricsRegistry] = REGISTRY):
+        self.upper_bounds: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            child = self._values.get(key)
+            if child is None:
+                child = self._values[key] = _HistogramValue(len(self.upper_bounds))
+            child.buckets[bisect_left(self.upper_bounds, value)] += 1
+            child.sum += value
+            child.count += 1
+            self._mark(key)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_child(self, key: tuple, value: _HistogramValue) -> str:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds, value.buckets):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{self._label_str(key, le)} {cumulative}\n")
+        labels = self._label_str(key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value.sum)}\n")
+        lines.append(f"{self.name}_count{labels} {value.count}\n")
+        return "".join(lines)
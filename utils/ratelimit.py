@@ -0,0 +1,97 @@
+import math
+import time
+from typing import Dict, Tuple, Optional, Any
+
+
+class TokenBucket:
+    """Token-Bucket mit verzögertem Auffüllen: jede Prüfung ist O(1), kein Hintergrund-Task nötig"""
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate: float = rate
+        self.burst: float = burst
+        self.tokens: float = burst
+        self.updated: float = time.monotonic()
+
+    def try_acquire(self, amount: float = 1.0) -> Tuple[bool, float]:
+        """Gibt (erlaubt, Sekunden bis genug Tokens da sind) zurück"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True, 0.0
+        if self.rate <= 0:
+            return False, math.inf
+        return False, (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token-Buckets pro (Server, Endpoint). Konfiguration aus settings.yaml -> ratelimit"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or {}
+        self.enabled: bool = config.get("enabled", True)
+        self.limits: Dict[str, Dict[str, float]] = config.get("endpoints") or {}
+        self.overrides: Dict[str, Dict[str, Dict[str, float]]] = config.get("server_overrides") or {}
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _limit_for(self, server_id: str, endpoint: str) -> Optional[Dict[str, float]]:
+        override = self.overrides.get(server_id, {}).get(endpoint)
+        return override or self.limits.get(endpoint)
+
+    def check(self, server_id: str, endpoint: str, cost: float = 1.0) -> Tuple[bool, float]:
+        if not self.enabled:
+            return True, 0.0
+        key = (server_id, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit = self._limit_for(server_id, endpoint)
+            if not limit:
+                return True, 0.0
+            rate = float(limit.get("rate", 10))
+            bucket = self._buckets[key] = TokenBucket(rate, float(limit.get("burst", rate)))
+        return bucket.try_acquire(cost)
+
+
+class StorageQuota:
+    """
+    Belegter Speicher pro Namespace (z.B. 'server:Lobby-1:'), inkrementell gepflegt.
+    Beim ersten Zugriff auf einen Namespace werden die Größen einmalig aus der Datenbank geladen.
+    """
+
+    def __init__(self, storage_manager, quota_bytes: int = 0):
+        self.storage_manager = storage_manager
+        self.quota_bytes: int = quota_bytes
+        self._sizes: Dict[str, Dict[str, int]] = {}
+        self._totals: Dict[str, int] = {}
+
+    def _load(self, namespace: str) -> Dict[str, int]:
+        sizes = self._sizes.get(namespace)
+        if sizes is None:
+            sizes = self._sizes[namespace] = self.storage_manager.get_key_sizes(namespace)
+            self._totals[namespace] = sum(sizes.values())
+        return sizes
+
+    def usage(self, namespace: str) -> int:
+        self._load(namespace)
+        return self._totals[namespace]
+
+    def would_exceed(self, namespace: str, key: str, new_size: int) -> bool:
+        if not self.quota_bytes:
+            return False
+        sizes = self._load(namespace)
+        return self._totals[namespace] - sizes.get(key, 0) + new_size > self.quota_bytes
+
+    def record(self, namespace: str, key: str, new_size: Optional[int]):
+        """Neue Größe eines Schlüssels übernehmen (None = gelöscht)"""
+        sizes = self._load(namespace)
+        old_size = sizes.pop(key, 0)
+        if new_size is not None:
+            sizes[key] = new_size
+        self._totals[namespace] += (new_size or 0) - old_size
+
+    def invalidate(self, namespace: str):
+        """Verwirft die gecachten Größen, beim nächsten Zugriff wird neu geladen"""
+        self._sizes.pop(namespace, None)
+        self._totals.pop(namespace, None)
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 
 import mysql.connector
 import psycopg2
@@ -7,6 +8,7 @@ import jaydebeapi
 from typing import Dict, Any, Optional, List
 from enum import Enum
 from core.console import pInfo, pWarning, pError, pDebug
+from core.telemetry import STORAGE_OP_SECONDS, STORAGE_ERRORS
 
 
 class DatabaseType(Enum):
@@ -39,6 +41,8 @@ class StorageManager:
         self.table_name: str = table_name
         self.h2_file_path: str = h2_file_path
         self.connection = None
+        # Eine Verbindung für alle Threads (CLI, API, Redis-Worker) -> Zugriffe serialisieren
+        self._lock = threading.RLock()
 
         self._connect()
         self._create_table()
@@ -148,44 +152,81 @@ class StorageManager:
         cursor.close()
 
     def store_data(self, key: str, data: Dict[str, Any]) -> bool:
+        with self._lock, STORAGE_OP_SECONDS.time(operation="store"):
+            return self._store_data(key, data)
+
+    def store_many(self, items: Dict[str, Any]) -> bool:
+        """Speichert mehrere Schlüssel mit einem einzigen Commit"""
+        if not items:
+            return True
+        with self._lock, STORAGE_OP_SECONDS.time(operation="store_many"):
+            try:
+                cursor = self.connection.cursor()
+                for key, data in items.items():
+                    self._execute_store(cursor, key, data)
+                self.connection.commit()
+                cursor.close()
+                return True
+            except Exception as e:
+                STORAGE_ERRORS.inc(operation="store_many")
+                pError(f"❌ Fehler beim Speichern von {len(items)} Schlüsseln: {e}")
+                try:
+                    self.connection.rollback()
+                except Exception:
+                    pass
+                return False
+
+    def _store_data(self, key: str, data: Dict[str, Any]) -> bool:
         try:
             cursor = self.connection.cursor()
-            json_str: str = json.dumps(data, ensure_ascii=False)
-
-            if self.db_type in [DatabaseType.MYSQL, DatabaseType.MARIADB]:
-                query = f"""
-                INSERT INTO {self.table_name} (id, json_data) 
-                VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE 
-                json_data = VALUES(json_data), 
-                updated_at = CURRENT_TIMESTAMP
-                """
-                cursor.execute(query, (key, json_str))
-            elif self.db_type == DatabaseType.POSTGRESQL:
-                query = f"""
-                INSERT INTO {self.table_name} (id, json_data) 
-                VALUES (%s, %s)
-                ON CONFLICT (id) DO UPDATE SET 
-                json_data = EXCLUDED.json_data, 
-                updated_at = CURRENT_TIMESTAMP
-                """
-                cursor.execute(query, (key, json_str))
-            elif self.db_type == DatabaseType.H2:
-                query = f"""
-                MERGE INTO {self.table_name} (id, json_data, updated_at) 
-                KEY(id) VALUES (?, ?, CURRENT_TIMESTAMP)
-                """
-                cursor.execute(query, (key, json_str))
-
+            self._execute_store(cursor, key, data)
             self.connection.commit()
             cursor.close()
             return True
 
         except Exception as e:
+            STORAGE_ERRORS.inc(operation="store")
             pError(f"❌ Fehler beim Speichern: {e}")
             return False
 
+    def _execute_store(self, cursor, key: str, data: Dict[str, Any]) -> None:
+        json_str: str = json.dumps(data, ensure_ascii=False)
+
+        if self.db_type in [DatabaseType.MYSQL, DatabaseType.MARIADB]:
+            query = f"""
+            INSERT INTO {self.table_name} (id, json_data) 
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE 
+            json_data = VALUES(json_data), 
+            updated_at = CURRENT_TIMESTAMP
+            """
+            cursor.execute(query, (key, json_str))
+        elif self.db_type == DatabaseType.POSTGRESQL:
+            query = f"""
+            INSERT INTO {self.table_name} (id, json_data) 
+            VALUES (%s, %s)
+            ON CONFLICT (id) DO UPDATE SET 
+            json_data = EXCLUDED.json_data, 
+            updated_at = CURRENT_TIMESTAMP
+            """
+            cursor.execute(query, (key, json_str))
+        elif self.db_type == DatabaseType.H2:
+            query = f"""
+            MERGE INTO {self.table_name} (id, json_data, updated_at) 
+            KEY(id) VALUES (?, ?, CURRENT_TIMESTAMP)
+            """
+            cursor.execute(query, (key, json_str))
+
     def get_data(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, STORAGE_OP_SECONDS.time(operation="get"):
+            return self._get_data(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Lädt mehrere Schlüssel unter einer einzigen Sperre"""
+        with self._lock, STORAGE_OP_SECONDS.time(operation="get_many"):
+            return {key: self._get_data(key) for key in keys}
+
+    def _get_data(self, key: str) -> Optional[Dict[str, Any]]:
         try:
             cursor = self.connection.cursor()
 
@@ -223,10 +264,12 @@ class StorageManager:
             return None
 
         except json.JSONDecodeError as e:
+            STORAGE_ERRORS.inc(operation="get")
             pError(f"❌ JSON-Parsing-Fehler: {e}")
             pError(f"❌ Rohdaten: {data}")
             return None
         except Exception as e:
+            STORAGE_ERRORS.inc(operation="get")
             pError(f"❌ Fehler beim Laden: {e}")
             return None
 
@@ -234,6 +277,10 @@ class StorageManager:
         return self.store_data(key, new_data)
 
     def delete_data(self, key: str) -> bool:
+        with self._lock, STORAGE_OP_SECONDS.time(operation="delete"):
+            return self._delete_data(key)
+
+    def _delete_data(self, key: str) -> bool:
         try:
             cursor = self.connection.cursor()
 
@@ -251,10 +298,15 @@ class StorageManager:
             return rows_affected > 0
 
         except Exception as e:
+            STORAGE_ERRORS.inc(operation="delete")
             pError(f"❌ Fehler beim Löschen: {e}")
             return False
 
     def get_all_keys(self) -> List[str]:
+        with self._lock:
+            return self._get_all_keys()
+
+    def _get_all_keys(self) -> List[str]:
         try:
             cursor = self.connection.cursor()
             query = f"SELECT id FROM {self.table_name}"
@@ -268,10 +320,36 @@ class StorageManager:
             pError(f"❌ Fehler beim Abrufen der Schlüssel: {e}")
             return []
 
+    def get_key_sizes(self, prefix: str) -> Dict[str, int]:
+        """Größe (Bytes des JSON) aller Schlüssel mit dem Präfix"""
+        with self._lock:
+            return self._get_key_sizes(prefix)
+
+    def _get_key_sizes(self, prefix: str) -> Dict[str, int]:
+        try:
+            cursor = self.connection.cursor()
+            if self.db_type == DatabaseType.POSTGRESQL:
+                query = f"SELECT id, OCTET_LENGTH(json_data::text) FROM {self.table_name} WHERE id LIKE %s"
+            elif self.db_type == DatabaseType.H2:
+                query = f"SELECT id, OCTET_LENGTH(json_data) FROM {self.table_name} WHERE id LIKE ?"
+            else:
+                query = f"SELECT id, LENGTH(CAST(json_data AS CHAR)) FROM {self.table_name} WHERE id LIKE %s"
+            cursor.execute(query, (prefix + "%",))
+            results = cursor.fetchall()
+            cursor.close()
+
+            # LIKE behandelt '_' und '%' als Platzhalter -> exakt nachfiltern
+            return {row[0]: int(row[1] or 0) for row in results if row[0].startswith(prefix)}
+
+        except Exception as e:
+            pError(f"❌ Fehler beim Abrufen der Schlüsselgrößen: {e}")
+            return {}
+
     def close(self) -> None:
-        if self.connection:
-            self.connection.close()
-            pInfo("Datenbankverbindung geschlossen")
+        with self._lock:
+            if self.connection:
+                self.connection.close()
+                pInfo("Datenbankverbindung geschlossen")
 
 def beispiel_speichere_spieler(storage: StorageManager):
     player_data = {
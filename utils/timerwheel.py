@@ -0,0 +1,67 @@
+import math
+from typing import Dict, Hashable, List, Tuple
+
+
+class TimerWheel:
+    """
+    Hashed Timer Wheel für sehr viele, häufig verschobene Deadlines (z.B. Heartbeat-Timeouts).
+
+    schedule() und cancel() sind O(1). Verschobene Deadlines werden nicht aus ihrem alten Slot
+    entfernt, sondern beim Erreichen des Slots als veraltet erkannt und verworfen. advance() besucht
+    nur die Slots der vergangenen Ticks, die Arbeit pro Tick hängt also von den dort fälligen
+    Einträgen ab und nicht von der Gesamtzahl der Timer.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512, start: float = 0.0):
+        self.tick: float = tick
+        self.slots: int = slots
+        self._wheel: List[List[Tuple[Hashable, int]]] = [[] for _ in range(slots)]
+        self._deadlines: Dict[Hashable, int] = {}  # key -> aktueller Deadline-Tick
+        self._current_tick: int = self._to_tick(start)
+
+    def _to_tick(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.tick)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Setzt (oder verschiebt) die Deadline von key"""
+        deadline_tick = max(self._to_tick(deadline), self._current_tick + 1)
+        if self._deadlines.get(key) == deadline_tick:
+            return
+        self._deadlines[key] = deadline_tick
+        self._wheel[deadline_tick % self.slots].append((key, deadline_tick))
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Bewegt das Rad bis now und gibt alle abgelaufenen Keys zurück"""
+        target_tick = self._to_tick(now)
+        expired: List[Hashable] = []
+        if target_tick <= self._current_tick:
+            return expired
+
+        # Bei großen Sprüngen (z.B. Suspend) reicht eine volle Umdrehung
+        first_tick = max(self._current_tick + 1, target_tick - self.slots + 1)
+        for tick in range(first_tick, target_tick + 1):
+            slot = self._wheel[tick % self.slots]
+            if not slot:
+                continue
+            remaining = []
+            for key, deadline_tick in slot:
+                if self._deadlines.get(key) != deadline_tick:
+                    continue  # verschoben oder abgebrochen
+                if deadline_tick <= target_tick:
+                    del self._deadlines[key]
+                    expired.append(key)
+                else:
+                    remaining.append((key, deadline_tick))  # erst in einer späteren Umdrehung fällig
+            self._wheel[tick % self.slots] = remaining
+
+        self._current_tick = target_tick
+        return expired